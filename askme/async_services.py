@@ -0,0 +1,135 @@
+"""
+LLMService for coroutines.
+
+AsyncLLMService sends the same packed prompts through the same provider
+adapters (askme.providers), but over a shared httpx.AsyncClient, so a call
+waiting on a provider holds no thread. Rate limiting, hedging and prompt
+packing and the call policy (askme.resilience) behave as in LLMService. Anthropic still goes through its sync SDK
+in a worker thread.
+"""
+import time
+import logging
+import weakref
+import asyncio
+from asgiref.sync import sync_to_async
+from .file_utils import extract_text_from_file
+from .hedging import hedged_call_async
+from .providers import get_adapter
+from .ratelimit import provider_slot_async
+from .resilience import call_with_policy_async
+from .services import LLMService
+
+logger = logging.getLogger(__name__)
+
+# One client (and connection pool) per event loop; httpx clients can't cross loops
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """The httpx.AsyncClient for the running event loop."""
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        # Concurrency is bounded by askme.ratelimit, not by the pool
+        client = httpx.AsyncClient(limits=httpx.Limits(max_connections=None, max_keepalive_connections=200))
+        _clients[loop] = client
+    return client
+
+
+class AsyncLLMService(LLMService):
+    """LLMService whose generate_response() is a coroutine."""
+
+    async def get_history_async(self, conversation_id, exclude_content=None):
+        questions = [q async for q in self.history_queryset(conversation_id)]
+        return self.format_history(questions, exclude_content)
+
+    async def generate_response(self, provider, model_id, prompt, conversation_id=None, file_path=None,
+                                file_type=None, fallback=None, system=None):
+        """Coroutine version of LLMService.generate_response(), with the same result dict."""
+        start_time = time.time()
+        usage = None
+
+        try:
+            file_content = ""
+            if file_path and file_type:
+                file_content = await sync_to_async(extract_text_from_file, thread_sensitive=False)(file_path, file_type)
+
+            conversation_history = (
+                await self.get_history_async(conversation_id, exclude_content=prompt) if conversation_id else []
+            )
+
+            packed = self.pack_prompt(provider, model_id, prompt, conversation_history, file_content, system)
+            messages = packed.messages
+            usage = packed.usage
+
+            async def call(provider, model_id):
+                return await self._call_provider(provider, model_id, messages, prompt, usage, file_path)
+
+            response, (answered_provider, answered_model_id) = await hedged_call_async(
+                (provider, model_id), self.resolve_fallback(provider, model_id, fallback), call
+            )
+            self.add_reply_usage(usage, response)
+
+            return {
+                'content': str(response),
+                'processing_time': time.time() - start_time,
+                'usage': usage,
+                'provider': answered_provider,
+                'model_id': answered_model_id,
+                'success': True
+            }
+        except Exception as e:
+            logger.error(f"Error generating response: {str(e)}")
+            return {
+                'content': None,
+                'processing_time': time.time() - start_time,
+                'usage': usage,
+                'success': False,
+                'error': str(e)
+            }
+
+    async def _call_provider(self, provider, model_id, messages, prompt, usage, file_path=None):
+        tokens = usage['prompt_tokens'] + self.max_output_tokens(provider, model_id)
+
+        async def attempt(deadline):
+            async with provider_slot_async(provider, tokens, timeout=deadline.remaining()):
+                return await self._dispatch(provider, model_id, messages, prompt, usage, file_path, deadline)
+
+        return await call_with_policy_async(provider, model_id, attempt)
+
+    async def _dispatch(self, provider, model_id, messages, prompt, usage, file_path=None, deadline=None):
+        if get_adapter(provider):
+            return await self._post_chat_async(provider, model_id, messages, deadline)
+        elif provider.lower() == 'anthropic':
+            return await sync_to_async(self._generate_anthropic, thread_sensitive=False)(model_id, messages, deadline)
+        elif provider.lower() == 'mock':
+            return self._generate_mock(prompt, usage, file_path)
+        else:
+            raise ValueError(f"Unsupported provider: {provider}")
+
+    async def _post_chat_async(self, provider, model_id, messages, deadline=None):
+        """POST a chat-completions request with httpx and parse it with the provider's adapter."""
+        import httpx
+
+        adapter = get_adapter(provider)
+        timeout = httpx.Timeout(deadline.attempt_timeout(), connect=deadline.connect_timeout()) if deadline else None
+        logger.info(f"{adapter.label} API call starting for model: {model_id}")
+        try:
+            # httpx times each read; wait_for bounds the whole attempt
+            response = await asyncio.wait_for(
+                get_async_client().post(
+                    adapter.url(),
+                    headers=adapter.headers(model_id),
+                    json=adapter.payload(model_id, messages),
+                    timeout=timeout,
+                ),
+                deadline.attempt_timeout() if deadline else None,
+            )
+        except (httpx.TimeoutException, asyncio.TimeoutError) as e:
+            raise adapter.transport_error(model_id, 'timeout', str(e) or 'attempt took too long')
+        except httpx.HTTPError as e:
+            raise adapter.transport_error(model_id, 'connection', e)
+        logger.info(f"{adapter.label} API call completed with status: {response.status_code}")
+        return adapter.parse(model_id, response.status_code, response.headers, response.text)
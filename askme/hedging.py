@@ -0,0 +1,233 @@
+"""
+Hedged LLM calls.
+
+hedged_call_async() starts the primary model and waits up to its rolling
+p95 latency. If no answer has arrived by then, it sends the same messages
+to the secondary model, returns whichever succeeds first and cancels the
+losing coroutine.
+
+hedged_call() is the synchronous path. A plain thread can't be interrupted
+mid-request, so a losing call would keep running and hold its rate-limiter
+slot; instead it calls the primary in the caller's thread and only tries the
+secondary once the primary has failed.
+
+Latencies and hedge/win counters are kept per process for each
+provider/model pair (see get_hedge_stats()).
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEDGING_SETTINGS = {
+    # Opt-in: a hedge pays for a second call and sends the prompt to another
+    # vendor, so nothing is hedged unless enabled and a fallback is named
+    'ENABLED': False,
+    # Primary provider -> the model to hedge with, e.g.
+    # {'openai': {'provider': 'deepseek', 'model_id': 'deepseek-chat'}}. The
+    # secondary is only used when its provider has an API key configured.
+    'FALLBACKS': {},
+    'QUANTILE': 0.95,
+    'WINDOW': 200,           # latencies kept per model
+    'MIN_SAMPLES': 20,       # below this, DEFAULT_DELAY is used
+    'DEFAULT_DELAY': 20.0,   # seconds
+    'MIN_DELAY': 2.0,
+    'MAX_DELAY': 90.0,
+}
+
+
+def get_hedging_settings():
+    config = DEFAULT_HEDGING_SETTINGS.copy()
+    config.update(getattr(settings, 'LLM_HEDGING', {}))
+    return config
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies for one provider/model."""
+
+    def __init__(self, window=200):
+        self._lock = threading.Lock()
+        self.latencies = deque(maxlen=window)
+
+    def add(self, seconds):
+        with self._lock:
+            self.latencies.append(seconds)
+
+    def quantile(self, q):
+        with self._lock:
+            values = sorted(self.latencies)
+        if not values:
+            return None
+        return values[min(int(q * len(values)), len(values) - 1)]
+
+    def __len__(self):
+        return len(self.latencies)
+
+
+class HedgeStats:
+    """Per-process counters and latency windows, keyed by 'provider/model_id'."""
+
+    COUNTERS = ('calls', 'hedged', 'primary_wins', 'secondary_wins', 'failed')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.trackers = {}
+        self.counters = {}
+
+    def tracker(self, key):
+        with self._lock:
+            if key not in self.trackers:
+                self.trackers[key] = LatencyTracker(get_hedging_settings()['WINDOW'])
+            return self.trackers[key]
+
+    def increment(self, key, name):
+        with self._lock:
+            counters = self.counters.setdefault(key, dict.fromkeys(self.COUNTERS, 0))
+            counters[name] += 1
+
+    def hedge_delay(self, key, config=None):
+        """Seconds to wait for `key` before hedging: its clamped p95 latency."""
+        config = config or get_hedging_settings()
+        tracker = self.tracker(key)
+        if len(tracker) < config['MIN_SAMPLES']:
+            return config['DEFAULT_DELAY']
+        delay = tracker.quantile(config['QUANTILE'])
+        return min(max(delay, config['MIN_DELAY']), config['MAX_DELAY'])
+
+    def snapshot(self):
+        config = get_hedging_settings()
+        with self._lock:
+            keys = sorted(set(self.counters) | set(self.trackers))
+            counters = {key: dict(self.counters.get(key, dict.fromkeys(self.COUNTERS, 0))) for key in keys}
+
+        result = {}
+        for key in keys:
+            entry = counters[key]
+            calls = entry['calls'] or 1
+            entry['hedge_rate'] = round(entry['hedged'] / calls, 4)
+            entry['secondary_win_rate'] = round(entry['secondary_wins'] / entry['hedged'], 4) if entry['hedged'] else None
+            tracker = self.trackers.get(key)
+            entry['samples'] = len(tracker) if tracker else 0
+            entry['p95_latency'] = tracker.quantile(config['QUANTILE']) if tracker else None
+            entry['hedge_delay'] = self.hedge_delay(key, config)
+            result[key] = entry
+        return result
+
+
+hedge_stats = HedgeStats()
+
+
+def get_hedge_stats():
+    """Counters and latency percentiles for every provider/model seen by this process."""
+    return hedge_stats.snapshot()
+
+
+def model_key(provider, model_id):
+    return f"{provider.lower()}/{model_id}"
+
+
+def no_failures(result):
+    return False
+
+
+def hedged_call(primary, secondary, call, is_failure=no_failures):
+    """
+    Run call(provider, model_id) for `primary`, falling back to `secondary`.
+
+    `primary`/`secondary` are (provider, model_id) pairs; secondary may be
+    None to just record latency. An attempt fails when call raises; an
+    optional is_failure(result) also marks results that shouldn't win. The
+    secondary only runs after the primary fails, so no call is ever left
+    running. Returns (result, (provider, model_id) that answered); if both
+    attempts fail, the primary's exception (or result) is used.
+    """
+    primary_key = model_key(*primary)
+    hedge_stats.increment(primary_key, 'calls')
+
+    targets = [('primary', primary)]
+    if secondary is not None:
+        targets.append(('secondary', secondary))
+
+    failures = {}
+    for label, target in targets:
+        if label == 'secondary':
+            logger.info(f"{primary_key} failed, falling back to {model_key(*target)}")
+            hedge_stats.increment(primary_key, 'hedged')
+        started = time.monotonic()
+        try:
+            result, error = call(*target), None
+        except Exception as e:
+            result, error = None, e
+        if error is None and not is_failure(result):
+            hedge_stats.tracker(model_key(*target)).add(time.monotonic() - started)
+            hedge_stats.increment(primary_key, f'{label}_wins')
+            return result, target
+        failures[label] = (result, error)
+
+    hedge_stats.increment(primary_key, 'failed')
+    result, error = failures['primary']
+    if error is not None:
+        raise error
+    return result, primary
+
+
+async def hedged_call_async(primary, secondary, call, is_failure=no_failures, delay=None):
+    """hedged_call() for coroutines: `call` is async and the loser is cancelled."""
+    primary_key = model_key(*primary)
+    hedge_stats.increment(primary_key, 'calls')
+    if delay is None:
+        delay = hedge_stats.hedge_delay(primary_key)
+
+    async def attempt(target):
+        started = time.monotonic()
+        result = await call(*target)
+        if not is_failure(result):
+            hedge_stats.tracker(model_key(*target)).add(time.monotonic() - started)
+        return result
+
+    def start(target, label):
+        tasks[asyncio.ensure_future(attempt(target))] = (label, target)
+
+    tasks = {}
+    start(primary, 'primary')
+    hedged = False
+    failures = {}
+
+    try:
+        while tasks:
+            timeout = None if hedged or secondary is None else delay
+            done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                logger.info(f"{primary_key} slower than {delay:.1f}s, hedging with {model_key(*secondary)}")
+                hedge_stats.increment(primary_key, 'hedged')
+                start(secondary, 'secondary')
+                hedged = True
+                continue
+
+            for task in done:
+                label, target = tasks.pop(task)
+                error = task.exception()
+                result = None if error else task.result()
+                if error is None and not is_failure(result):
+                    hedge_stats.increment(primary_key, f'{label}_wins')
+                    return result, target
+                failures[label] = (result, error)
+
+                if label == 'primary' and secondary is not None and not hedged:
+                    # Primary failed outright: fall back immediately
+                    hedge_stats.increment(primary_key, 'hedged')
+                    start(secondary, 'secondary')
+                    hedged = True
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    hedge_stats.increment(primary_key, 'failed')
+    result, error = failures.get('primary') or failures.get('secondary')
+    if error is not None:
+        raise error
+    return result, primary
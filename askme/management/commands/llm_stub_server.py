@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from loadtest.stub_server import StubConfig, make_server
+
+
+class Command(BaseCommand):
+    help = 'Run a local OpenAI/DeepSeek-compatible chat-completions stub for offline load tests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument(
+            '--latency',
+            default='lognormal:0.8,0.5',
+            help='Time to first token: fixed:S, uniform:LOW,HIGH, exp:MEAN or lognormal:MEDIAN,SIGMA',
+        )
+        parser.add_argument('--tokens-per-second', type=float, default=60.0)
+        parser.add_argument('--completion-tokens', type=int, default=200)
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 500')
+        parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fraction answered with 429')
+        parser.add_argument('--max-concurrent', type=int, help='Answer 429 above this many requests in flight')
+        parser.add_argument('--retry-after', type=int, default=1, help='Retry-After header on 429s (seconds)')
+
+    def handle(self, *args, **options):
+        try:
+            config = StubConfig(
+                latency=options['latency'],
+                tokens_per_second=options['tokens_per_second'],
+                completion_tokens=options['completion_tokens'],
+                error_rate=options['error_rate'],
+                rate_limit_rate=options['rate_limit_rate'],
+                max_concurrent=options['max_concurrent'],
+                retry_after=options['retry_after'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        server, stats = make_server(options['host'], options['port'], config)
+        base_url = f"http://{options['host']}:{server.server_address[1]}/v1"
+
+        self.stdout.write(self.style.SUCCESS(f'LLM stub listening on {base_url}'))
+        self.stdout.write(f'Point the app at it with OPENAI_API_BASE={base_url} DEEPSEEK_API_BASE={base_url}')
+        self.stdout.write(f'Counters: http://{options["host"]}:{server.server_address[1]}/stats')
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f'Final counters: {stats.snapshot()}')
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.8 on 2026-10-19 02:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('askme', '0003_alter_question_conversation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['user', 'is_active', '-updated_at'], name='askme_conve_user_id_a5fe1b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['conversation', 'sequence'], name='askme_quest_convers_15c2fb_idx'),
+        ),
+    ]
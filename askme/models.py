@@ -31,6 +31,10 @@ class Conversation(BaseModel):
     
     class Meta:
         ordering = ['-updated_at']
+        indexes = [
+            # conversation_list / askme home
+            models.Index(fields=['user', 'is_active', '-updated_at']),
+        ]
     
     def __str__(self):
         return self.title
@@ -57,6 +61,10 @@ class Question(BaseModel):
     
     class Meta:
         ordering = ['sequence']
+        indexes = [
+            # Conversation history and next-sequence lookups
+            models.Index(fields=['conversation', 'sequence']),
+        ]
     
     def __str__(self):
         return f"{self.content[:50]}..."
@@ -0,0 +1,261 @@
+"""
+Token budgeting for Ask Me prompts.
+
+pack_messages() fits a conversation into a model's context budget: the
+reply's max_tokens is reserved first, the current question always goes in,
+an attached file is trimmed to its share of what is left, and earlier turns
+are added newest-first until the budget runs out. Older turns are elided
+behind a one-line note; the turn that straddles the limit is cut to fit.
+The same input always packs to the same output.
+
+Tokens are counted with tiktoken when it is installed and its encodings are
+available locally, otherwise with a conservative offline estimate.
+"""
+import logging
+import math
+import re
+from functools import lru_cache
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROMPT_BUDGET = {
+    # Input budget when no CONTEXT_WINDOWS prefix matches the model id
+    'DEFAULT_CONTEXT': 8192,
+    # Model id prefix -> context window (longest matching prefix wins)
+    'CONTEXT_WINDOWS': {
+        'gpt-5': 272000,
+        'gpt-4o': 128000,
+        'gpt-4.1': 1000000,
+        'gpt-4-turbo': 128000,
+        'gpt-4': 8192,
+        'gpt-3.5-turbo': 16385,
+        'deepseek': 64000,
+        'claude': 200000,
+    },
+    # Cap on prompt tokens whatever the window, to bound latency and cost
+    'MAX_PROMPT_TOKENS': 32000,
+    # Largest share of the prompt budget an attached file may take
+    'ATTACHMENT_SHARE': 0.6,
+    # Don't keep a trimmed history turn smaller than this
+    'MIN_TURN_TOKENS': 64,
+}
+
+# Chat formats add a few tokens per message and to prime the reply
+MESSAGE_OVERHEAD = 4
+REPLY_PRIMING = 3
+
+ELIDED_NOTE = "[{count} earlier messages omitted to fit the model's context window]"
+TRIMMED_NOTE = "[... {count} tokens omitted ...]"
+
+# Words, numbers, single punctuation marks and runs of whitespace
+_TOKEN_PATTERN = re.compile(r"[^\W\d_]+|\d+|[^\w\s]|\s+", re.UNICODE)
+
+
+def get_prompt_budget_settings():
+    config = DEFAULT_PROMPT_BUDGET.copy()
+    config.update(getattr(settings, 'ASKME_PROMPT_BUDGET', {}))
+    return config
+
+
+def get_context_window(model_id, config=None):
+    """Context window for a model id, matched by the longest known prefix."""
+    config = config or get_prompt_budget_settings()
+    model_id = (model_id or '').lower()
+    matches = [prefix for prefix in config['CONTEXT_WINDOWS'] if model_id.startswith(prefix)]
+    if not matches:
+        return config['DEFAULT_CONTEXT']
+    return config['CONTEXT_WINDOWS'][max(matches, key=len)]
+
+
+@lru_cache(maxsize=8)
+def _tiktoken_encoding(model_id):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model_id)
+        except KeyError:
+            return tiktoken.get_encoding('o200k_base' if model_id.startswith(('gpt-4o', 'gpt-5')) else 'cl100k_base')
+    except Exception as e:
+        # Encodings are downloaded on first use; offline hosts fall back to the estimate
+        logger.warning(f"tiktoken encoding unavailable for {model_id}, estimating tokens: {e}")
+        return None
+
+
+def _estimate_tokens(text):
+    """
+    Offline token estimate, tuned to over-count slightly.
+
+    BPE vocabularies hold about four Latin characters per token but far
+    fewer for Arabic, so non-ASCII words count one token per two characters.
+    """
+    count = 0
+    for piece in _TOKEN_PATTERN.findall(text):
+        if piece.isspace():
+            count += 1 if '\n' in piece or len(piece) > 1 else 0
+        elif piece.isascii():
+            count += math.ceil(len(piece) / 4)
+        else:
+            count += math.ceil(len(piece) / 2)
+    return count
+
+
+class TokenCounter:
+    """Counts and trims text in tokens for one model."""
+
+    def __init__(self, model_id=''):
+        self.encoding = _tiktoken_encoding(model_id or '')
+        self.name = self.encoding.name if self.encoding else 'estimate'
+
+    def count(self, text):
+        if not text:
+            return 0
+        if self.encoding:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return _estimate_tokens(text)
+
+    def count_message(self, message):
+        return self.count(message['content']) + MESSAGE_OVERHEAD
+
+    def truncate(self, text, limit, keep_tail=0.25):
+        """
+        Shorten text to at most `limit` tokens, keeping its start and its end.
+
+        The cut is marked in the text. Returns (text, tokens_removed).
+        """
+        total = self.count(text)
+        if total <= limit:
+            return text, 0
+
+        marker_tokens = self.count(TRIMMED_NOTE.format(count=total)) + 2
+        room = max(limit - marker_tokens, 0)
+        tail_tokens = int(room * keep_tail)
+        head_tokens = room - tail_tokens
+
+        if self.encoding:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            head = self.encoding.decode(tokens[:head_tokens])
+            tail = self.encoding.decode(tokens[len(tokens) - tail_tokens:]) if tail_tokens else ''
+        else:
+            pieces = _TOKEN_PATTERN.findall(text)
+            head = self._take(pieces, head_tokens)
+            tail = self._take(pieces[::-1], tail_tokens, reverse=True)
+
+        removed = total - self.count(head) - self.count(tail)
+        return f"{head}\n{TRIMMED_NOTE.format(count=removed)}\n{tail}".strip(), removed
+
+    def _take(self, pieces, limit, reverse=False):
+        taken = []
+        used = 0
+        for piece in pieces:
+            cost = _estimate_tokens(piece)
+            if used + cost > limit:
+                break
+            taken.append(piece)
+            used += cost
+        if reverse:
+            taken.reverse()
+        return ''.join(taken)
+
+
+class PackedPrompt:
+    """Messages chosen by pack_messages() and the token counts behind them."""
+
+    def __init__(self, messages, usage):
+        self.messages = messages
+        self.usage = usage
+
+
+def pack_messages(model_id, prompt, history=(), attachment=None, reply_tokens=1000, config=None, system=None):
+    """
+    Build the message list for one Ask Me request within the token budget.
+
+    `history` is a list of earlier turns, oldest first, each a list of
+    {'role', 'content'} messages (a question and its answer). `attachment`
+    is the extracted text of a file sent with this question. `system` goes
+    first, unchanged, so a prompt's fixed instructions stay a cacheable
+    prefix; it is never trimmed.
+    """
+    config = config or get_prompt_budget_settings()
+    counter = TokenCounter(model_id)
+
+    context_window = get_context_window(model_id, config)
+    budget = max(min(context_window - reply_tokens, config['MAX_PROMPT_TOKENS']) - REPLY_PRIMING, 0)
+    usage = {
+        'tokenizer': counter.name,
+        'context_window': context_window,
+        'reply_reserved': reply_tokens,
+        'budget': budget,
+        'attachment_tokens': 0,
+        'attachment_trimmed_tokens': 0,
+        'history_turns': 0,
+        'history_turns_elided': 0,
+        'history_tokens': 0,
+        'system_tokens': 0,
+    }
+
+    if system:
+        system_message = {'role': 'system', 'content': system}
+        usage['system_tokens'] = counter.count_message(system_message)
+        budget = max(budget - usage['system_tokens'], 0)
+
+    # The question itself always goes in (cut only if it alone busts the budget)
+    question, _ = counter.truncate(prompt, max(budget - MESSAGE_OVERHEAD - 1, 1))
+    remaining = budget - counter.count(question) - MESSAGE_OVERHEAD
+
+    if attachment:
+        wrapper = "Here is a file I'm attaching:\n\n{file}\n\nMy question about this content: {question}"
+        wrapper_tokens = counter.count(wrapper.format(file='', question=''))
+        limit = max(int(min(remaining, budget * config['ATTACHMENT_SHARE'])) - wrapper_tokens, 0)
+        text, trimmed = counter.truncate(attachment, limit)
+        question = wrapper.format(file=text, question=question)
+        usage['attachment_tokens'] = counter.count(text)
+        usage['attachment_trimmed_tokens'] = trimmed
+        remaining -= usage['attachment_tokens'] + wrapper_tokens
+
+    # Newest turns first until one doesn't fit, keeping room for the elision note
+    remaining -= counter.count(ELIDED_NOTE.format(count=10 ** 6)) + 1
+    packed = []
+    history = list(history)
+    for index in range(len(history) - 1, -1, -1):
+        turn = history[index]
+        cost = sum(counter.count_message(message) for message in turn)
+        if cost <= remaining:
+            packed.insert(0, [dict(message) for message in turn])
+            remaining -= cost
+            continue
+
+        # Cut the straddling turn's longest message if enough room is left
+        if remaining >= config['MIN_TURN_TOKENS'] + MESSAGE_OVERHEAD * len(turn):
+            turn = [dict(message) for message in turn]
+            longest = max(turn, key=lambda message: counter.count(message['content']))
+            others = sum(counter.count_message(message) for message in turn if message is not longest)
+            longest['content'], _ = counter.truncate(longest['content'], remaining - others - MESSAGE_OVERHEAD)
+            cost = sum(counter.count_message(message) for message in turn)
+            if cost <= remaining:
+                packed.insert(0, turn)
+                remaining -= cost
+                index -= 1
+        usage['history_turns_elided'] = index + 1
+        break
+
+    messages = [message for turn in packed for message in turn]
+    elided = sum(len(turn) for turn in history[:usage['history_turns_elided']])
+    if elided and messages:
+        # Folded into the first message so roles still alternate
+        note = ELIDED_NOTE.format(count=elided)
+        messages[0]['content'] = f"{note}\n\n{messages[0]['content']}"
+    elif elided:
+        question = f"{ELIDED_NOTE.format(count=elided)}\n\n{question}"
+
+    messages.append({'role': 'user', 'content': question})
+
+    usage['history_turns'] = len(packed)
+    usage['history_tokens'] = sum(counter.count_message(message) for message in messages[:-1])
+    if system:
+        messages.insert(0, system_message)
+    usage['prompt_tokens'] = sum(counter.count_message(message) for message in messages) + REPLY_PRIMING
+    return PackedPrompt(messages, usage)
@@ -0,0 +1,286 @@
+"""
+Provider adapters shared by LLMService (requests) and AsyncLLMService (httpx).
+
+An adapter knows how to build a chat-completions request for its provider
+and how to turn the HTTP reply into reply text; the services only move
+bytes. Failures raise a ProviderError subclass rather than returning
+placeholder text, so nothing that isn't a real answer is ever stored as
+one; askme.resilience decides which of them are worth retrying.
+
+Replies come back as ProviderReply, the text plus the token usage the
+provider reported, including how much of the prompt it served from its
+prompt cache (see get_prompt_cache_stats()).
+"""
+import json
+import logging
+import threading
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderError(Exception):
+    """A provider call failed. `retryable` errors may succeed if sent again."""
+    retryable = False
+
+    def __init__(self, provider, model_id, message):
+        self.provider = provider
+        self.model_id = model_id
+        super().__init__(f"{provider}/{model_id}: {message}")
+
+
+class ProviderTimeout(ProviderError):
+    """No reply within the attempt's timeout."""
+    retryable = True
+
+
+class ProviderUnavailable(ProviderError):
+    """Connection failure, or a 5xx/408 answer."""
+    retryable = True
+
+
+class ProviderBadResponse(ProviderError):
+    """A 200 answer without usable content."""
+    retryable = True
+
+
+class ProviderRejected(ProviderError):
+    """The provider refused the request (4xx, content filter, token limit)."""
+
+
+class ProviderRateLimited(ProviderError):
+    """The provider answered 429; `retry_after` is in seconds."""
+    retryable = True
+
+    def __init__(self, provider, retry_after=None, model_id=None):
+        try:
+            self.retry_after = min(max(float(retry_after), 0.5), 60.0)
+        except (TypeError, ValueError):
+            self.retry_after = 2.0
+        super().__init__(provider, model_id, f"rate limited (retry after {self.retry_after:.1f}s)")
+
+
+class ProviderReply(str):
+    """Reply text; `usage` is the provider's token counts, or None if it sent none."""
+
+    def __new__(cls, text, usage=None):
+        reply = super().__new__(cls, text)
+        reply.usage = usage
+        return reply
+
+
+class PromptCacheStats:
+    """Per-process prompt and cached-prompt token totals, keyed by 'provider/model_id'."""
+
+    COUNTERS = ('replies', 'reported', 'prompt_tokens', 'cached_tokens')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+
+    def record(self, key, usage):
+        with self._lock:
+            counters = self.counters.setdefault(key, dict.fromkeys(self.COUNTERS, 0))
+            counters['replies'] += 1
+            if usage:
+                counters['reported'] += 1
+                counters['prompt_tokens'] += usage['prompt_tokens']
+                counters['cached_tokens'] += usage['cached_tokens']
+
+    def snapshot(self):
+        with self._lock:
+            result = {key: dict(counters) for key, counters in sorted(self.counters.items())}
+        for entry in result.values():
+            entry['hit_rate'] = round(entry['cached_tokens'] / entry['prompt_tokens'], 4) if entry['prompt_tokens'] else None
+        return result
+
+
+prompt_cache_stats = PromptCacheStats()
+
+
+def get_prompt_cache_stats():
+    """Prompt tokens sent and served from provider prompt caches, per provider/model."""
+    return prompt_cache_stats.snapshot()
+
+
+def provider_reply(provider, model_id, text, usage=None):
+    """A ProviderReply, with its usage logged and counted in the prompt-cache stats."""
+    if usage:
+        logger.info(f"{provider}/{model_id} usage: {usage['prompt_tokens']} prompt tokens, "
+                    f"{usage['cached_tokens']} cached, {usage['completion_tokens']} completion")
+    prompt_cache_stats.record(f"{provider.lower()}/{model_id}", usage)
+    return ProviderReply(text, usage)
+
+
+def max_output_tokens(provider, model_id):
+    """Reply max_tokens sent to the provider (reserved by the prompt budget)."""
+    provider = provider.lower()
+    if provider == 'openai':
+        return 8000 if model_id.startswith('gpt-5') else 4000
+    if provider == 'mock':
+        return 0
+    return 1000
+
+
+class ChatCompletionsAdapter:
+    """An OpenAI-compatible POST {base}/chat/completions API."""
+
+    provider = None
+    label = None
+    base_setting = None
+    key_setting = None
+
+    def url(self):
+        return f"{getattr(settings, self.base_setting)}/chat/completions"
+
+    def headers(self, model_id):
+        api_key = getattr(settings, self.key_setting, '')
+        if not api_key or not api_key.strip():
+            # "Bearer " is an invalid header: fail once, without retrying or opening the breaker
+            raise ProviderRejected(self.provider, model_id, "API key not configured")
+        return {
+            "Authorization": f"Bearer {api_key.strip()}",
+            "Content-Type": "application/json",
+        }
+
+    def payload(self, model_id, messages):
+        return {
+            "model": model_id,
+            "messages": messages,
+            "max_tokens": max_output_tokens(self.provider, model_id),
+            "temperature": 0.7,
+        }
+
+    def parse(self, model_id, status_code, headers, body):
+        """Reply text from an HTTP status, headers and body text; raises ProviderError."""
+        if status_code == 429:
+            raise ProviderRateLimited(self.provider, headers.get('Retry-After'), model_id)
+        if status_code != 200:
+            logger.error(f"{self.label} API error: {status_code} - {body[:500]}")
+            error = ProviderUnavailable if status_code >= 500 or status_code == 408 else ProviderRejected
+            raise error(self.provider, model_id, f"HTTP {status_code}: {body[:100]}")
+        try:
+            data = json.loads(body)
+        except ValueError as e:
+            raise ProviderBadResponse(self.provider, model_id, f"invalid JSON ({e})")
+        if not data.get('choices'):
+            logger.error(f"{self.label} API returned invalid response: {str(data)[:500]}")
+            raise ProviderBadResponse(self.provider, model_id, "no choices in response")
+        return self.extract(model_id, data)
+
+    def extract(self, model_id, data):
+        try:
+            response_content = data["choices"][0]["message"]["content"]
+            finish_reason = data["choices"][0].get("finish_reason", "unknown")
+        except (KeyError, IndexError, TypeError) as e:
+            raise ProviderBadResponse(self.provider, model_id, f"could not extract response content ({e})")
+
+        logger.info(f"{model_id} reply: {len(response_content) if response_content else 0} characters, "
+                    f"finish reason {finish_reason}")
+
+        # Handle different finish reasons
+        if not response_content or not response_content.strip():
+            if finish_reason == "length":
+                raise ProviderRejected(self.provider, model_id, "Response requires more tokens than the model's maximum capacity. Consider breaking this into smaller, more specific requests.")
+            elif finish_reason == "content_filter":
+                raise ProviderRejected(self.provider, model_id, "The model refused to respond due to content policy. Try rephrasing your request.")
+            raise ProviderBadResponse(self.provider, model_id, f"empty response (finish reason: {finish_reason})")
+
+        # Check if response was cut off due to length
+        if finish_reason == "length":
+            logger.warning(f"{model_id} response was cut off at maximum token limit")
+            response_content += f"\n\n[Response was cut off due to token limit. To get the complete response, please ask for the remaining suggestions separately.]"
+
+        return provider_reply(self.provider, model_id, response_content, self.usage(data))
+
+    def usage(self, data):
+        """{'prompt_tokens', 'cached_tokens', 'completion_tokens'} from a reply, or None."""
+        usage = data.get('usage')
+        if not isinstance(usage, dict):
+            return None
+        details = usage.get('prompt_tokens_details') or {}
+        return {
+            'prompt_tokens': usage.get('prompt_tokens') or 0,
+            'cached_tokens': details.get('cached_tokens') or 0,
+            'completion_tokens': usage.get('completion_tokens') or 0,
+        }
+
+    def transport_error(self, model_id, kind, error):
+        """The ProviderError for a failed request; `kind` is 'timeout' or 'connection'."""
+        logger.warning(f"{self.label} API {kind} error for {model_id}: {error}")
+        if kind == 'timeout':
+            return ProviderTimeout(self.provider, model_id, f"timed out ({error})")
+        return ProviderUnavailable(self.provider, model_id, f"connection failed ({error})")
+
+
+class OpenAIAdapter(ChatCompletionsAdapter):
+    provider = 'openai'
+    label = 'OpenAI'
+    base_setting = 'OPENAI_API_BASE'
+    key_setting = 'OPENAI_API_KEY'
+
+    def payload(self, model_id, messages):
+        data = {
+            "model": model_id,
+            "messages": messages,
+        }
+        # GPT-5 takes max_completion_tokens and no temperature
+        if model_id.startswith('gpt-5'):
+            data["max_completion_tokens"] = max_output_tokens('openai', model_id)
+        else:
+            data["max_tokens"] = max_output_tokens('openai', model_id)
+            data["temperature"] = 0.7
+        return data
+
+class DeepSeekAdapter(ChatCompletionsAdapter):
+    provider = 'deepseek'
+    label = 'DeepSeek'
+    base_setting = 'DEEPSEEK_API_BASE'
+    key_setting = 'DEEPSEEK_API_KEY'
+
+    def usage(self, data):
+        # DeepSeek reports its context cache as prompt_cache_hit_tokens
+        usage = super().usage(data)
+        if usage and not usage['cached_tokens']:
+            usage['cached_tokens'] = data['usage'].get('prompt_cache_hit_tokens') or 0
+        return usage
+
+
+def anthropic_usage(usage):
+    """Usage dict for an anthropic SDK Usage object; input_tokens excludes cache reads and writes."""
+    if usage is None:
+        return None
+    cached = getattr(usage, 'cache_read_input_tokens', None) or 0
+    written = getattr(usage, 'cache_creation_input_tokens', None) or 0
+    return {
+        'prompt_tokens': (usage.input_tokens or 0) + cached + written,
+        'cached_tokens': cached,
+        'completion_tokens': usage.output_tokens or 0,
+    }
+
+
+def anthropic_error(model_id, error):
+    """The ProviderError for an exception from the anthropic SDK."""
+    import anthropic
+    if isinstance(error, anthropic.RateLimitError):
+        return ProviderRateLimited('anthropic', error.response.headers.get('Retry-After'), model_id)
+    if isinstance(error, anthropic.APITimeoutError):
+        return ProviderTimeout('anthropic', model_id, f"timed out ({error})")
+    if isinstance(error, anthropic.APIConnectionError):
+        return ProviderUnavailable('anthropic', model_id, f"connection failed ({error})")
+    if isinstance(error, anthropic.APIStatusError):
+        status_code = error.status_code
+        # 529 is Anthropic's "overloaded"
+        retryable = status_code >= 500 or status_code == 408
+        return (ProviderUnavailable if retryable else ProviderRejected)('anthropic', model_id, f"HTTP {status_code}: {error}")
+    return ProviderBadResponse('anthropic', model_id, str(error))
+
+
+ADAPTERS = {
+    'openai': OpenAIAdapter(),
+    'deepseek': DeepSeekAdapter(),
+}
+
+
+def get_adapter(provider):
+    return ADAPTERS.get(provider.lower())
@@ -0,0 +1,302 @@
+"""
+Per-provider rate limiting for LLM calls.
+
+Each provider gets a ProviderLimiter with a requests/min and a tokens/min
+token bucket and a cap on calls in flight. Callers queue first-in,
+first-out: only the head of the queue may take capacity, so a large
+ideation fan-out can't starve Ask Me questions that arrived earlier, and
+bursts wait instead of turning into 429s. A 429 that gets through anyway
+pauses the provider for its Retry-After.
+
+Limits are per process. LLM_RATE_LIMITS holds the account-wide figures,
+which are divided by LLM_RATE_LIMIT_PROCESSES (default WEB_CONCURRENCY)
+so a full set of gunicorn workers stays within them.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from django.conf import settings
+from .hedging import LatencyTracker
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATE_LIMITS = {
+    'openai': {'RPM': 500, 'TPM': 200000, 'MAX_CONCURRENT': 16},
+    'deepseek': {'RPM': 300, 'TPM': 300000, 'MAX_CONCURRENT': 16},
+    'anthropic': {'RPM': 50, 'TPM': 40000, 'MAX_CONCURRENT': 8},
+}
+# Providers not listed above (e.g. mock) are unlimited
+DEFAULT_MAX_WAIT = 300.0
+# How often a coroutine waiting for a free slot checks again
+ASYNC_POLL_INTERVAL = 0.05
+
+
+class RateLimitTimeout(Exception):
+    """A call waited longer than MAX_WAIT for provider capacity."""
+
+
+def get_rate_limit_settings():
+    limits = {provider: dict(values) for provider, values in DEFAULT_RATE_LIMITS.items()}
+    for provider, values in getattr(settings, 'LLM_RATE_LIMITS', {}).items():
+        limits.setdefault(provider.lower(), {}).update(values)
+    return limits
+
+
+def get_process_count():
+    value = getattr(settings, 'LLM_RATE_LIMIT_PROCESSES', None) or os.environ.get('WEB_CONCURRENCY') or 1
+    return max(int(value), 1)
+
+
+class TokenBucket:
+    """Refills at `per_minute / 60` units per second up to one minute's worth."""
+
+    def __init__(self, per_minute):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount):
+        """Seconds until `amount` units are available (0 if they are now)."""
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount):
+        self.level -= min(amount, self.capacity)
+
+
+class ProviderLimiter:
+    """Request/token buckets, a concurrency cap and a FIFO wait queue for one provider."""
+
+    def __init__(self, name, rpm=None, tpm=None, max_concurrent=None, max_wait=DEFAULT_MAX_WAIT):
+        self.name = name
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.max_concurrent = max_concurrent
+        self.max_wait = max_wait
+
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self.in_flight = 0
+        self.paused_until = 0.0
+
+        self.waits = LatencyTracker(window=500)
+        self.counters = {'calls': 0, 'queued': 0, 'timeouts': 0, 'rate_limited': 0, 'peak_queue_depth': 0}
+
+    def _wait_time(self, tokens, now):
+        """Seconds the head of the queue must still wait, or None to wait for a release."""
+        if self.max_concurrent and self.in_flight >= self.max_concurrent:
+            return None
+        wait = max(self.paused_until - now, 0.0)
+        if self.requests:
+            self.requests.refill(now)
+            wait = max(wait, self.requests.time_until(1))
+        if self.tokens:
+            self.tokens.refill(now)
+            wait = max(wait, self.tokens.time_until(tokens))
+        return wait
+
+    def _enter(self):
+        """Join the back of the queue (caller holds the lock)."""
+        ticket = object()
+        self._queue.append(ticket)
+        self.counters['calls'] += 1
+        self.counters['peak_queue_depth'] = max(self.counters['peak_queue_depth'], len(self._queue))
+        return ticket
+
+    def _leave(self, ticket):
+        """Give up a place in the queue after a timeout or cancellation."""
+        with self._cond:
+            self._queue.remove(ticket)
+            self._cond.notify_all()
+
+    def _poll(self, ticket, tokens, deadline, timeout):
+        """
+        Take capacity for `ticket` if it is its turn (caller holds the lock).
+
+        Returns 0.0 once taken, otherwise the seconds to wait (None to wait
+        for a release). Raises RateLimitTimeout after the deadline.
+        """
+        now = time.monotonic()
+        wait = self._wait_time(tokens, now) if self._queue[0] is ticket else None
+        if wait == 0.0:
+            self._queue.popleft()
+            if self.requests:
+                self.requests.take(1)
+            if self.tokens:
+                self.tokens.take(tokens)
+            self.in_flight += 1
+            # The next caller may be able to go right away too
+            self._cond.notify_all()
+            return 0.0
+        if deadline - now <= 0:
+            self.counters['timeouts'] += 1
+            raise RateLimitTimeout(
+                f"Waited {timeout:.0f}s for {self.name} capacity "
+                f"({len(self._queue)} queued, {self.in_flight} in flight)"
+            )
+        return wait
+
+    def _acquired(self, started):
+        waited = time.monotonic() - started
+        self.waits.add(waited)
+        if waited > 1:
+            logger.info(f"{self.name} call waited {waited:.1f}s for rate limit capacity")
+
+    def _release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def acquire(self, tokens=0, timeout=None):
+        """Hold one call slot for a request of about `tokens` prompt+reply tokens."""
+        timeout = self.max_wait if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        with self._cond:
+            ticket = self._enter()
+            queued = False
+            try:
+                while True:
+                    wait = self._poll(ticket, tokens, deadline, timeout)
+                    if wait == 0.0:
+                        break
+                    if not queued:
+                        self.counters['queued'] += 1
+                        queued = True
+                    remaining = deadline - time.monotonic()
+                    self._cond.wait(remaining if wait is None else min(wait, remaining))
+            except BaseException:
+                self._queue.remove(ticket)
+                self._cond.notify_all()
+                raise
+
+        self._acquired(started)
+        try:
+            yield
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def acquire_async(self, tokens=0, timeout=None):
+        """
+        acquire() for coroutines.
+
+        Shares the FIFO queue with threaded callers, but waits with
+        asyncio.sleep so thousands of queued calls hold no threads. Waiting
+        on a release is polled every ASYNC_POLL_INTERVAL seconds.
+        """
+        timeout = self.max_wait if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        with self._cond:
+            ticket = self._enter()
+        queued = False
+        try:
+            while True:
+                with self._cond:
+                    wait = self._poll(ticket, tokens, deadline, timeout)
+                    if wait == 0.0:
+                        break
+                    if not queued:
+                        self.counters['queued'] += 1
+                        queued = True
+                remaining = deadline - time.monotonic()
+                await asyncio.sleep(max(min(ASYNC_POLL_INTERVAL if wait is None else wait, remaining), 0))
+        except BaseException:
+            self._leave(ticket)
+            raise
+
+        self._acquired(started)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def pause(self, seconds):
+        """Hold back every call for `seconds` after the provider answered 429."""
+        with self._cond:
+            self.counters['rate_limited'] += 1
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+        logger.warning(f"{self.name} rate limited, pausing calls for {seconds:.1f}s")
+
+    def snapshot(self):
+        with self._cond:
+            data = dict(self.counters)
+            data['queue_depth'] = len(self._queue)
+            data['in_flight'] = self.in_flight
+            data['paused_for'] = round(max(self.paused_until - time.monotonic(), 0.0), 2)
+            data['max_concurrent'] = self.max_concurrent
+            data['rpm'] = self.requests.capacity if self.requests else None
+            data['tpm'] = self.tokens.capacity if self.tokens else None
+        data['wait_p50'] = self.waits.quantile(0.50)
+        data['wait_p95'] = self.waits.quantile(0.95)
+        data['wait_max'] = self.waits.quantile(1.0)
+        return data
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider):
+    """The process-wide limiter for a provider, or None if it is unlimited."""
+    provider = provider.lower()
+    with _limiters_lock:
+        if provider not in _limiters:
+            config = get_rate_limit_settings().get(provider)
+            limiter = None
+            if config:
+                processes = get_process_count()
+                limiter = ProviderLimiter(
+                    provider,
+                    rpm=config.get('RPM') and max(config['RPM'] / processes, 1),
+                    tpm=config.get('TPM') and max(config['TPM'] / processes, 1),
+                    max_concurrent=config.get('MAX_CONCURRENT') and max(config['MAX_CONCURRENT'] // processes, 1),
+                    max_wait=config.get('MAX_WAIT', DEFAULT_MAX_WAIT),
+                )
+            _limiters[provider] = limiter
+        return _limiters[provider]
+
+
+@contextmanager
+def provider_slot(provider, tokens=0, timeout=None):
+    """Wait for capacity at `provider` (FIFO) and hold it for the call."""
+    limiter = get_limiter(provider)
+    if limiter is None:
+        yield
+        return
+    with limiter.acquire(tokens, timeout):
+        yield
+
+
+@asynccontextmanager
+async def provider_slot_async(provider, tokens=0, timeout=None):
+    """provider_slot() for coroutines."""
+    limiter = get_limiter(provider)
+    if limiter is None:
+        yield
+        return
+    async with limiter.acquire_async(tokens, timeout):
+        yield
+
+
+def get_limiter_stats():
+    """Queue depth, wait times and counters for every limiter in this process."""
+    with _limiters_lock:
+        limiters = [limiter for limiter in _limiters.values() if limiter]
+    return {limiter.name: limiter.snapshot() for limiter in limiters}
@@ -0,0 +1,243 @@
+"""
+Deadlines, retries and circuit breakers for provider calls.
+
+call_with_policy() runs one provider/model call until it succeeds, runs
+out of attempts or passes its deadline. Each attempt is given the
+seconds it may take (never more than what is left of the deadline), and
+retryable failures (timeouts, connection errors, 5xx, malformed replies)
+are retried after an exponential backoff with full jitter. A 429 pauses
+the provider's limiter and queues again without counting as a failure.
+
+Every provider/model has a CircuitBreaker: after BREAKER_THRESHOLD
+failures in a row it opens and calls fail at once with CircuitOpen for
+BREAKER_COOLDOWN seconds, then a single probe call decides whether it
+closes again. Failures surface as askme.providers.ProviderError, so
+hedging falls straight through to the fallback model.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from django.conf import settings
+from .providers import ProviderError, ProviderRateLimited, ProviderTimeout
+from .ratelimit import get_limiter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CALL_POLICY = {
+    'ATTEMPT_TIMEOUT': 120.0,    # seconds one attempt may take
+    'CONNECT_TIMEOUT': 10.0,
+    'DEADLINE': 300.0,           # whole call, queueing and retries included
+    'MAX_ATTEMPTS': 3,
+    'BACKOFF_BASE': 1.0,         # first retry waits up to this, doubling after
+    'BACKOFF_MAX': 20.0,
+    'BREAKER_THRESHOLD': 5,      # failures in a row that open the breaker
+    'BREAKER_COOLDOWN': 30.0,    # seconds open before a probe call
+    # Per-provider overrides of the values above
+    'PROVIDERS': {
+        'openai': {'ATTEMPT_TIMEOUT': 180.0},  # long gpt-5 replies
+        'deepseek': {'ATTEMPT_TIMEOUT': 60.0, 'DEADLINE': 150.0},
+    },
+}
+# An attempt is not started with less time than this left
+MIN_ATTEMPT_TIME = 1.0
+
+
+class CircuitOpen(ProviderError):
+    """The provider/model failed repeatedly and is not being called for now."""
+
+
+def get_call_policy(provider):
+    """DEFAULT_CALL_POLICY merged with LLM_CALL_POLICY, for one provider."""
+    overrides = getattr(settings, 'LLM_CALL_POLICY', {})
+    policy = {key: value for key, value in DEFAULT_CALL_POLICY.items() if key != 'PROVIDERS'}
+    policy.update({key: value for key, value in overrides.items() if key != 'PROVIDERS'})
+    provider = provider.lower()
+    policy.update(DEFAULT_CALL_POLICY['PROVIDERS'].get(provider, {}))
+    policy.update(overrides.get('PROVIDERS', {}).get(provider, {}))
+    return policy
+
+
+class CircuitBreaker:
+    """Closed, open or half-open state for one provider/model."""
+
+    def __init__(self, name, threshold, cooldown):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.counters = {'opened': 0, 'short_circuited': 0, 'failures': 0, 'successes': 0}
+
+    def before_call(self, provider, model_id):
+        """Raise CircuitOpen unless a call may go through now."""
+        with self._lock:
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = 'half_open'
+                self.probing = False
+            if self.state == 'closed':
+                return
+            if self.state == 'half_open' and not self.probing:
+                self.probing = True
+                return
+            self.counters['short_circuited'] += 1
+            retry_in = max(self.cooldown - (time.monotonic() - self.opened_at), 0.0)
+        raise CircuitOpen(provider, model_id, f"circuit open after repeated failures (retry in {retry_in:.0f}s)")
+
+    def record_success(self):
+        with self._lock:
+            if self.state != 'closed':
+                logger.info(f"Circuit for {self.name} closed")
+            self.state = 'closed'
+            self.failures = 0
+            self.probing = False
+            self.counters['successes'] += 1
+
+    def record_failure(self):
+        """Count a failure; True if it opened the circuit."""
+        with self._lock:
+            self.failures += 1
+            self.counters['failures'] += 1
+            if self.state == 'half_open' or (self.state == 'closed' and self.failures >= self.threshold):
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+                self.probing = False
+                self.counters['opened'] += 1
+                logger.warning(f"Circuit for {self.name} opened after {self.failures} failures")
+                return True
+        return False
+
+    def release(self):
+        """End a call that neither succeeded nor failed the provider (429, bad request)."""
+        with self._lock:
+            self.probing = False
+
+    def snapshot(self):
+        with self._lock:
+            data = dict(self.counters)
+            data['state'] = self.state
+            data['consecutive_failures'] = self.failures
+        return data
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(provider, model_id):
+    """The process-wide breaker for a provider/model."""
+    key = f"{provider.lower()}/{model_id}"
+    with _breakers_lock:
+        if key not in _breakers:
+            policy = get_call_policy(provider)
+            _breakers[key] = CircuitBreaker(key, policy['BREAKER_THRESHOLD'], policy['BREAKER_COOLDOWN'])
+        return _breakers[key]
+
+
+def get_breaker_stats():
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
+
+
+class CallDeadline:
+    """Time left for one call under its policy; handed to each attempt."""
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.expires = time.monotonic() + policy['DEADLINE']
+
+    def remaining(self):
+        return max(self.expires - time.monotonic(), 0.0)
+
+    def attempt_timeout(self):
+        """Seconds the next attempt may take: ATTEMPT_TIMEOUT, capped by the deadline."""
+        return min(self.policy['ATTEMPT_TIMEOUT'], self.remaining())
+
+    def connect_timeout(self):
+        return min(self.policy['CONNECT_TIMEOUT'], self.attempt_timeout())
+
+
+def _before_attempt(breaker, deadline, provider, model_id, number):
+    if number > 1 and deadline.remaining() < MIN_ATTEMPT_TIME:
+        raise ProviderTimeout(provider, model_id, f"deadline of {deadline.policy['DEADLINE']:.0f}s passed")
+    breaker.before_call(provider, model_id)
+
+
+def _after_failure(breaker, deadline, provider, error, number):
+    """Record a failed attempt; the seconds to wait before retrying, or None to give up."""
+    policy = deadline.policy
+    if isinstance(error, ProviderRateLimited):
+        breaker.release()
+        limiter = get_limiter(provider)
+        if limiter:
+            limiter.pause(error.retry_after)
+            delay = 0.0  # the limiter holds the next attempt back
+        else:
+            delay = error.retry_after
+    elif isinstance(error, ProviderError) and error.retryable:
+        if breaker.record_failure():
+            return None  # this failure opened the circuit
+        delay = random.uniform(0, min(policy['BACKOFF_MAX'], policy['BACKOFF_BASE'] * 2 ** (number - 1)))
+    else:
+        breaker.release()
+        return None
+
+    if number >= policy['MAX_ATTEMPTS'] or delay + MIN_ATTEMPT_TIME > deadline.remaining():
+        logger.error(f"Giving up on {breaker.name} after {number} attempts: {error}")
+        return None
+    logger.warning(f"Attempt {number} at {breaker.name} failed ({error}), retrying in {delay:.1f}s")
+    return delay
+
+
+def call_with_policy(provider, model_id, attempt):
+    """
+    Run attempt(deadline) under the provider's call policy and return its result.
+
+    `attempt` gets the CallDeadline, must keep within
+    deadline.attempt_timeout() and raises ProviderError on failure.
+    """
+    deadline = CallDeadline(get_call_policy(provider))
+    breaker = get_breaker(provider, model_id)
+    number = 0
+    while True:
+        number += 1
+        _before_attempt(breaker, deadline, provider, model_id, number)
+        try:
+            result = attempt(deadline)
+        except Exception as e:
+            delay = _after_failure(breaker, deadline, provider, e, number)
+            if delay is None:
+                raise
+            time.sleep(delay)
+            continue
+        breaker.record_success()
+        return result
+
+
+async def call_with_policy_async(provider, model_id, attempt):
+    """call_with_policy() for coroutines; `attempt` is an async function."""
+    deadline = CallDeadline(get_call_policy(provider))
+    breaker = get_breaker(provider, model_id)
+    number = 0
+    while True:
+        number += 1
+        _before_attempt(breaker, deadline, provider, model_id, number)
+        try:
+            result = await attempt(deadline)
+        except asyncio.CancelledError:
+            # A hedged call that lost the race: no verdict on the provider
+            breaker.release()
+            raise
+        except Exception as e:
+            delay = _after_failure(breaker, deadline, provider, e, number)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+            continue
+        breaker.record_success()
+        return result
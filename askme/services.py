@@ -1,10 +1,20 @@
+import json
 import time
 import logging
 from django.conf import settings
 from .file_utils import extract_text_from_file
+from .hedging import get_hedging_settings, hedged_call
+from .prompt_budget import pack_messages
+from .providers import (
+    ProviderBadResponse, ProviderRejected, anthropic_error, anthropic_usage, get_adapter, max_output_tokens,
+    provider_reply,
+)
+from .ratelimit import provider_slot
+from .resilience import call_with_policy
 
 logger = logging.getLogger(__name__)
 
+
 class ContentFilterService:
     """Service to check for sensitive content."""
     
@@ -29,61 +39,110 @@ class LLMService:
     def __init__(self):
         pass
     
-    def generate_response(self, provider, model_id, prompt, conversation_id=None, file_path=None, file_type=None):
-        """Generate response using the appropriate LLM provider."""
+    max_output_tokens = staticmethod(max_output_tokens)
+    
+    def history_queryset(self, conversation_id):
+        from askme.models import Question
+        return (
+            Question.objects.filter(conversation_id=conversation_id)
+            .select_related('response')
+            .order_by('sequence')
+        )
+    
+    def format_history(self, questions, exclude_content=None):
+        """Turn Question rows into turns, oldest first, as lists of messages."""
+        turns = []
+        for q in questions:
+            if q.content == exclude_content:  # Skip the current question
+                continue
+            
+            # Don't re-process files for history, just mention they were there
+            q_content = q.content
+            if q.file and q.file_type:
+                q_content = f"[Question with {q.file_type.upper()} file attachment]: {q.content}"
+            
+            turn = [{"role": "user", "content": q_content}]
+            if hasattr(q, 'response'):
+                turn.append({"role": "assistant", "content": q.response.content})
+            turns.append(turn)
+        return turns
+    
+    def get_history(self, conversation_id, exclude_content=None):
+        """Earlier turns of a conversation, oldest first, as lists of messages."""
+        return self.format_history(self.history_queryset(conversation_id), exclude_content)
+    
+    def pack_prompt(self, provider, model_id, prompt, history, file_content, system=None):
+        """Pack history and attachment text into the model's budget and log the counts."""
+        packed = pack_messages(
+            model_id,
+            prompt,
+            history=history,
+            attachment=file_content or None,
+            reply_tokens=self.max_output_tokens(provider, model_id),
+            system=system,
+        )
+        usage = packed.usage
+        logger.info(
+            f"Prompt for {model_id}: {usage['prompt_tokens']}/{usage['budget']} tokens "
+            f"({usage['history_turns']} turns kept, {usage['history_turns_elided']} elided, "
+            f"{usage['attachment_trimmed_tokens']} attachment tokens trimmed, {usage['tokenizer']})"
+        )
+        return packed
+    
+    def resolve_fallback(self, provider, model_id, fallback):
+        if fallback is None:
+            fallback = self.get_fallback(provider)
+        if fallback and tuple(fallback) == (provider, model_id):
+            fallback = None
+        return fallback or None
+    
+    def generate_response(self, provider, model_id, prompt, conversation_id=None, file_path=None, file_type=None,
+                          fallback=None, system=None):
+        """
+        Generate response using the appropriate LLM provider.
+        
+        History and attachment text are packed into the model's token budget
+        (see askme.prompt_budget); the counts used are returned as 'usage'.
+        `system` is sent first as a system message; keep it identical across
+        calls so providers can serve it from their prompt cache, whose hits
+        come back in usage as 'cached_tokens'. Failing calls are retried
+        on `fallback` (a (provider, model_id) pair, default from
+        LLM_HEDGING; False disables it); AsyncLLMService also hedges slow
+        ones. The model that answered is returned as 'provider'/'model_id'.
+        """
         start_time = time.time()
+        usage = None
         
         try:
             # Process file if provided
             file_content = ""
             if file_path and file_type:
                 file_content = extract_text_from_file(file_path, file_type)
-                if file_content:
-                    prompt = f"Here is a file I'm attaching:\n\n{file_content}\n\nMy question about this content: {prompt}"
             
             # Get conversation history if provided
-            conversation_history = []
-            if conversation_id:
-                from askme.models import Question
-                questions = Question.objects.filter(conversation_id=conversation_id).order_by('sequence')
-                
-                for q in questions:
-                    if q.content == prompt:  # Skip the current question
-                        continue
-                    
-                    # Include file content from previous questions if available
-                    q_content = q.content
-                    if q.file and q.file_type:
-                        # Don't re-process files for history, just mention they were there
-                        q_content = f"[Question with {q.file_type.upper()} file attachment]: {q.content}"
-                    
-                    conversation_history.append({"role": "user", "content": q_content})
-                    if hasattr(q, 'response'):
-                        conversation_history.append({"role": "assistant", "content": q.response.content})
-            
-            # Add current prompt
-            messages = conversation_history + [{"role": "user", "content": prompt}]
-            
-            # Choose provider
-            if provider.lower() == 'anthropic':
-                response = self._generate_anthropic(model_id, messages)
-            elif provider.lower() == 'openai':
-                response = self._generate_openai(model_id, messages)
-            elif provider.lower() == 'deepseek':
-                response = self._generate_deepseek(model_id, messages)
-            elif provider.lower() == 'mock':
-                # Mock provider for development/testing
-                history_summary = f" (with {len(conversation_history)//2} previous exchanges)" if conversation_history else ""
-                file_summary = " with file attachment" if file_path else ""
-                response = f"This is a mock response to: '{prompt[:30]}...'{history_summary}{file_summary}"
-            else:
-                raise ValueError(f"Unsupported provider: {provider}")
-                
+            conversation_history = self.get_history(conversation_id, exclude_content=prompt) if conversation_id else []
+            
+            packed = self.pack_prompt(provider, model_id, prompt, conversation_history, file_content, system)
+            messages = packed.messages
+            usage = packed.usage
+            
+            def call(provider, model_id):
+                return self._call_provider(provider, model_id, messages, prompt, usage, file_path)
+            
+            # Failures are raised as ProviderError, never returned as reply text
+            response, (answered_provider, answered_model_id) = hedged_call(
+                (provider, model_id), self.resolve_fallback(provider, model_id, fallback), call
+            )
+            self.add_reply_usage(usage, response)
+            
             processing_time = time.time() - start_time
                 
             return {
-                'content': response,
+                'content': str(response),
                 'processing_time': processing_time,
+                'usage': usage,
+                'provider': answered_provider,
+                'model_id': answered_model_id,
                 'success': True
             }
         except Exception as e:
@@ -91,30 +150,97 @@ class LLMService:
             return {
                 'content': None,
                 'processing_time': time.time() - start_time,
+                'usage': usage,
                 'success': False,
                 'error': str(e)
             }
     
-    def _generate_anthropic(self, model_id, messages):
+    def add_reply_usage(self, usage, response):
+        """Add the provider's own prompt and cached-token counts, if it sent them, to `usage`."""
+        reply_usage = getattr(response, 'usage', None)
+        if reply_usage:
+            usage['provider_prompt_tokens'] = reply_usage['prompt_tokens']
+            usage['cached_tokens'] = reply_usage['cached_tokens']
+            usage['completion_tokens'] = reply_usage['completion_tokens']
+    
+    def get_fallback(self, provider):
+        """(provider, model_id) to hedge `provider` with, or None (see askme.hedging)."""
+        config = get_hedging_settings()
+        fallback = config['FALLBACKS'].get(provider.lower()) if config['ENABLED'] else None
+        if not fallback:
+            return None
+        api_key = getattr(settings, f"{fallback['provider'].upper()}_API_KEY", '')
+        if not api_key and fallback['provider'].lower() != 'mock':
+            return None
+        return fallback['provider'], fallback['model_id']
+    
+    def _call_provider(self, provider, model_id, messages, prompt, usage, file_path=None):
+        """
+        Send packed messages to one provider and return the reply text.
+        
+        Calls run under the provider's call policy (askme.resilience):
+        each attempt queues for the provider's rate limits
+        (askme.ratelimit) and gets its share of the call's deadline, and
+        failures raise ProviderError.
+        """
+        tokens = usage['prompt_tokens'] + self.max_output_tokens(provider, model_id)
+        
+        def attempt(deadline):
+            with provider_slot(provider, tokens, timeout=deadline.remaining()):
+                return self._dispatch(provider, model_id, messages, prompt, usage, file_path, deadline)
+        
+        return call_with_policy(provider, model_id, attempt)
+    
+    def _dispatch(self, provider, model_id, messages, prompt, usage, file_path=None, deadline=None):
+        if provider.lower() == 'anthropic':
+            return self._generate_anthropic(model_id, messages, deadline)
+        elif provider.lower() == 'openai':
+            return self._generate_openai(model_id, messages, deadline)
+        elif provider.lower() == 'deepseek':
+            return self._generate_deepseek(model_id, messages, deadline)
+        elif provider.lower() == 'mock':
+            return self._generate_mock(prompt, usage, file_path)
+        else:
+            raise ValueError(f"Unsupported provider: {provider}")
+    
+    def _generate_mock(self, prompt, usage, file_path=None):
+        """Mock provider for development/testing."""
+        history_summary = f" (with {usage['history_turns']} previous exchanges)" if usage['history_turns'] else ""
+        file_summary = " with file attachment" if file_path else ""
+        return f"This is a mock response to: '{prompt[:30]}...'{history_summary}{file_summary}"
+    
+    def _generate_anthropic(self, model_id, messages, deadline=None):
         """Generate response using Anthropic Claude."""
         try:
             import anthropic
-            client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-            
-            # Convert to Anthropic format
+        except ImportError:
+            raise ProviderRejected('anthropic', model_id, "Anthropic SDK not installed")
+        
+        # Retries are left to the call policy
+        client = anthropic.Anthropic(
+            api_key=settings.ANTHROPIC_API_KEY,
+            timeout=deadline.attempt_timeout() if deadline else None,
+            max_retries=0,
+        )
+        # Anthropic takes the system prompt separately; marking it lets repeats hit the prompt cache
+        options = {}
+        system = [message['content'] for message in messages if message['role'] == 'system']
+        if system:
+            options['system'] = [{"type": "text", "text": system[0], "cache_control": {"type": "ephemeral"}}]
+        try:
             response = client.messages.create(
                 model=model_id,
-                max_tokens=1000,
-                messages=messages
+                max_tokens=self.max_output_tokens('anthropic', model_id),
+                messages=[message for message in messages if message['role'] != 'system'],
+                **options
             )
-            
-            return response.content[0].text
-        except ImportError:
-            logger.warning("Anthropic SDK not installed. Using mock response.")
-            return f"[Mock Anthropic Response] Would respond to conversation with {len(messages)} messages"
-        except Exception as e:
+        except anthropic.APIError as e:
             logger.error(f"Error with Anthropic API: {str(e)}")
-            raise
+            raise anthropic_error(model_id, e)
+        
+        if not response.content or not response.content[0].text:
+            raise ProviderBadResponse('anthropic', model_id, "empty response")
+        return provider_reply('anthropic', model_id, response.content[0].text, anthropic_usage(response.usage))
     
     # def _generate_openai(self, model_id, messages):
     #     """Generate response using OpenAI."""
@@ -232,107 +358,9 @@ class LLMService:
 
     # Update your _generate_openai method with maximum token limits:
 
-    def _generate_openai(self, model_id, messages):
-        """Generate response using OpenAI with maximum token limits."""
-        try:
-            import requests
-            import json
-            
-            api_key = settings.OPENAI_API_KEY
-            
-            # Prepare headers with authentication
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            # Prepare request payload
-            data = {
-                "model": model_id,
-                "messages": messages
-            }
-            
-            # Configure parameters based on model type
-            if model_id.startswith('gpt-5'):
-                data["max_completion_tokens"] = 8000  # Maximum possible for GPT-5
-                timeout_seconds = None  # No timeout on requests call
-                logger.info(f"OpenAI API call starting for GPT-5 model: {model_id} (UNLIMITED timeout, 8000 tokens)")
-            else:
-                data["max_tokens"] = 4000  # High limit for GPT-4
-                data["temperature"] = 0.7
-                timeout_seconds = None  # No timeout on requests call
-                logger.info(f"OpenAI API call starting for model: {model_id} (UNLIMITED timeout, 4000 tokens)")
-            
-            logger.info(f"Making request with NO TIMEOUT...")
-            logger.info(f"Request data: {json.dumps(data, indent=2)}")
-            
-            # Make API request with NO timeout
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                data=json.dumps(data),
-                timeout=timeout_seconds  # None = no timeout
-            )
-            
-            logger.info(f"API call completed with status: {response.status_code}")
-            
-            # Check for errors
-            if response.status_code != 200:
-                error_text = response.text
-                logger.error(f"OpenAI API error: {response.status_code} - {error_text}")
-                return f"[OpenAI API Error {response.status_code}] {error_text[:100]}..."
-            
-            # Parse response
-            try:
-                response_data = response.json()
-                logger.info("Successfully parsed JSON response")
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse JSON response: {str(e)}")
-                return f"[{model_id} JSON Error] Invalid response format"
-            
-            if 'choices' not in response_data or not response_data['choices']:
-                logger.error(f"Invalid response structure: {response_data}")
-                return f"[{model_id} Invalid Response] No choices in response"
-            
-            # Extract the actual response content
-            try:
-                response_content = response_data["choices"][0]["message"]["content"]
-                finish_reason = response_data["choices"][0].get("finish_reason", "unknown")
-                
-                logger.info(f"Response content extracted successfully")
-                logger.info(f"Response length: {len(response_content) if response_content else 0} characters")
-                logger.info(f"Finish reason: {finish_reason}")
-                logger.info(f"Response preview: {response_content[:200] if response_content else 'EMPTY'}...")
-                
-                # Handle different finish reasons
-                if not response_content:
-                    if finish_reason == "length":
-                        logger.error(f"{model_id} hit maximum token limit")
-                        return f"[{model_id} Maximum Token Limit] Response requires more tokens than the model's maximum capacity. Consider breaking this into smaller, more specific requests."
-                    elif finish_reason == "content_filter":
-                        logger.error(f"{model_id} content filtered")
-                        return f"[{model_id} Content Filter] The model refused to respond due to content policy. Try rephrasing your request."
-                    else:
-                        logger.error(f"{model_id} returned empty content, reason: {finish_reason}")
-                        return f"[{model_id} Empty Response] Model completed but returned no content (reason: {finish_reason})"
-                
-                # Check if response was cut off due to length
-                if finish_reason == "length":
-                    logger.warning(f"{model_id} response was cut off at maximum token limit")
-                    # Return the partial response with a note
-                    response_content += f"\n\n[Response was cut off due to token limit. To get the complete response, please ask for the remaining suggestions separately.]"
-                
-                return response_content
-                
-            except (KeyError, IndexError) as e:
-                logger.error(f"Error extracting response content: {str(e)}")
-                return f"[{model_id} Extraction Error] Could not extract response content"
-        
-        except Exception as e:
-            logger.error(f"Unexpected error in _generate_openai: {str(e)}")
-            import traceback
-            logger.error(f"Full traceback: {traceback.format_exc()}")
-            return f"[{model_id} Unexpected Error] {str(e)}"
+    def _generate_openai(self, model_id, messages, deadline=None):
+        """Generate response using OpenAI (see askme.providers.OpenAIAdapter)."""
+        return self._post_chat('openai', model_id, messages, deadline)
     
     # Step 1: Update your askme/services.py - Enhanced OpenAI method with GPT-5 support
 
@@ -426,73 +454,30 @@ class LLMService:
 
     # Replace your _generate_deepseek method in askme/services.py with this:
 
-    def _generate_deepseek(self, model_id, messages):
-        """Generate response using DeepSeek with strict timeout handling."""
+    def _generate_deepseek(self, model_id, messages, deadline=None):
+        """Generate response using DeepSeek (see askme.providers.DeepSeekAdapter)."""
+        return self._post_chat('deepseek', model_id, messages, deadline)
+    
+    def _post_chat(self, provider, model_id, messages, deadline=None):
+        """POST a chat-completions request with requests and parse it with the provider's adapter."""
+        import requests
+        
+        adapter = get_adapter(provider)
+        timeout = (deadline.connect_timeout(), deadline.attempt_timeout()) if deadline else None
+        logger.info(f"{adapter.label} API call starting for model: {model_id}")
         try:
-            import requests
-            import json
-            
-            api_key = settings.DEEPSEEK_API_KEY
-            
-            # Prepare headers with authentication
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            # Prepare request payload
-            data = {
-                "model": model_id,
-                "messages": messages,
-                "max_tokens": 1000,
-                "temperature": 0.7
-            }
-            
-            logger.info(f"🔍 DeepSeek API call starting for model: {model_id}")
-            
-            # Make API request with STRICT 30-second timeout
             response = requests.post(
-                "https://api.deepseek.com/v1/chat/completions",
-                headers=headers,
-                data=json.dumps(data),
-                timeout=30  # STRICT 30-second timeout
+                adapter.url(),
+                headers=adapter.headers(model_id),
+                data=json.dumps(adapter.payload(model_id, messages)),
+                timeout=timeout,
             )
-            
-            logger.info(f"✅ DeepSeek API call completed with status: {response.status_code}")
-            
-            # Check for errors
-            if response.status_code != 200:
-                logger.error(f"DeepSeek API error: {response.status_code} - {response.text}")
-                return f"[DeepSeek API Error {response.status_code}] Mock response for {len(messages)} messages"
-            
-            # Parse response
-            response_data = response.json()
-            
-            if 'choices' not in response_data or not response_data['choices']:
-                logger.error(f"DeepSeek API returned invalid response: {response_data}")
-                return f"[DeepSeek Invalid Response] Mock response for {len(messages)} messages"
-                
-            return response_data["choices"][0]["message"]["content"]
-        
-        except requests.exceptions.Timeout:
-            logger.warning("⏰ DeepSeek API timeout (30s) - using mock response")
-            return f"[DeepSeek Timeout] This is a mock response for your Program Ideation request. DeepSeek API took too long to respond."
-        
-        except requests.exceptions.ConnectionError:
-            logger.warning("🌐 DeepSeek API connection error - using mock response")
-            return f"[DeepSeek Connection Error] Mock response for {len(messages)} messages"
-            
+        except requests.exceptions.Timeout as e:
+            raise adapter.transport_error(model_id, 'timeout', e)
         except requests.exceptions.RequestException as e:
-            logger.error(f"🚨 DeepSeek API request error: {str(e)}")
-            return f"[DeepSeek Request Error] Mock response for {len(messages)} messages"
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"🚨 DeepSeek API JSON decode error: {str(e)}")
-            return f"[DeepSeek JSON Error] Mock response for {len(messages)} messages"
-            
-        except Exception as e:
-            logger.error(f"🚨 DeepSeek API unexpected error: {str(e)}")
-            return f"[DeepSeek Unexpected Error] Mock response for {len(messages)} messages"
+            raise adapter.transport_error(model_id, 'connection', e)
+        logger.info(f"{adapter.label} API call completed with status: {response.status_code}")
+        return adapter.parse(model_id, response.status_code, response.headers, response.text)
 
     # def _generate_deepseek(self, model_id, messages):
     #     """Generate response using DeepSeek with proper timeout handling."""
@@ -1,115 +1,112 @@
 import os
-import threading
-import time
 import logging
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.db import close_old_connections
+from core.aio import run_in_background
 
 logger = logging.getLogger(__name__)
 
-def process_llm_request(question_id):
-    """Process LLM request in a separate thread."""
+
+async def aprocess_llm_request(question_id):
+    """Answer a question with AsyncLLMService and store its Response."""
     # Import here to avoid circular imports
-    from askme.models import Question, Response, Conversation
-    from askme.services import LLMService, ContentFilterService
-    
-    def _process():
-        logger.info(f"Starting LLM processing for question ID: {question_id}")
-        try:
-            # Get the question
-            question = Question.objects.get(id=question_id)
-            question.status = 'processing'
-            question.save()
-            
-            # Check for sensitive content
-            is_sensitive, sensitive_details = ContentFilterService.check_sensitive_content(question.content)
-            
-            # Prepare file path if a file was uploaded
-            file_path = None
-            file_type = None
-            if question.file and question.file.name:
-                file_path = os.path.join(settings.MEDIA_ROOT, question.file.name)
-                file_type = question.file_type
-                logger.info(f"Processing file: {file_path} of type {file_type}")
-            
-            # Create service and generate response
-            service = LLMService()
-            
-            # Get conversation ID for context
-            conversation_id = question.conversation_id
-            
-            # Update conversation title if it's the first question
-            if question.sequence == 1:
-                conversation = question.conversation
-                # Generate title from first question
-                title = question.content[:50] + ('...' if len(question.content) > 50 else '')
-                conversation.title = title
-                conversation.save()
-            
-            # Generate response with file content if available
-            result = service.generate_response(
-                provider=question.llm_model.provider,
-                model_id=question.llm_model.model_id,
-                prompt=question.content,
-                conversation_id=conversation_id,
-                file_path=file_path,
-                file_type=file_type
+    from askme.models import Question, Response
+    from askme.services import ContentFilterService
+    from askme.async_services import AsyncLLMService
+
+    logger.info(f"Starting LLM processing for question ID: {question_id}")
+    try:
+        # Get the question
+        question = await Question.objects.select_related('llm_model', 'conversation').aget(id=question_id)
+        question.status = 'processing'
+        await question.asave()
+
+        # Check for sensitive content
+        is_sensitive, sensitive_details = ContentFilterService.check_sensitive_content(question.content)
+
+        # Prepare file path if a file was uploaded
+        file_path = None
+        file_type = None
+        if question.file and question.file.name:
+            file_path = os.path.join(settings.MEDIA_ROOT, question.file.name)
+            file_type = question.file_type
+            logger.info(f"Processing file: {file_path} of type {file_type}")
+
+        service = AsyncLLMService()
+
+        # Update conversation title if it's the first question
+        if question.sequence == 1:
+            conversation = question.conversation
+            # Generate title from first question
+            conversation.title = question.content[:50] + ('...' if len(question.content) > 50 else '')
+            await conversation.asave()
+
+        # Generate response with file content if available
+        result = await service.generate_response(
+            provider=question.llm_model.provider,
+            model_id=question.llm_model.model_id,
+            prompt=question.content,
+            conversation_id=question.conversation_id,
+            file_path=file_path,
+            file_type=file_type
+        )
+
+        if result['success']:
+            response = await Response.objects.acreate(
+                question=question,
+                content=result['content'],
+                processing_time=result['processing_time'],
+                sensitive_content_detected=is_sensitive
             )
-            
-            if result['success']:
-                # Create response
-                response = Response.objects.create(
-                    question=question,
-                    content=result['content'],
-                    processing_time=result['processing_time'],
-                    sensitive_content_detected=is_sensitive
-                )
-                
-                # Update question status
-                question.status = 'completed'
-                question.save()
-                
-                logger.info(f"LLM processing completed for question ID: {question_id}")
-                
-                return {
-                    'success': True,
-                    'question_id': question.id,
-                    'response_id': response.id
-                }
-            else:
-                # Update question status to failed
-                question.status = 'failed'
-                question.error_message = result.get('error', 'Unknown error')
-                question.save()
-                
-                logger.error(f"LLM processing failed for question ID: {question_id}")
-                
-                return {
-                    'success': False,
-                    'error': result.get('error', 'Unknown error')
-                }
-        
-        except Exception as e:
-            logger.error(f"Error processing question ID {question_id}: {str(e)}")
-            # Update question status to failed
-            try:
-                question = Question.objects.get(id=question_id)
-                question.status = 'failed'
-                question.error_message = str(e)
-                question.save()
-            except:
-                pass
-            
+
+            question.status = 'completed'
+            await question.asave()
+
+            logger.info(f"LLM processing completed for question ID: {question_id}")
+
+            return {
+                'success': True,
+                'question_id': question.id,
+                'response_id': response.id
+            }
+        else:
+            question.status = 'failed'
+            question.error_message = result.get('error', 'Unknown error')
+            await question.asave()
+
+            logger.error(f"LLM processing failed for question ID: {question_id}")
+
             return {
                 'success': False,
-                'error': str(e)
+                'error': result.get('error', 'Unknown error')
             }
-    
-    # Start processing in a separate thread
-    thread = threading.Thread(target=_process)
-    thread.daemon = True
-    thread.start()
-    
+
+    except Exception as e:
+        logger.error(f"Error processing question ID {question_id}: {str(e)}")
+        # Update question status to failed
+        try:
+            question = await Question.objects.aget(id=question_id)
+            question.status = 'failed'
+            question.error_message = str(e)
+            await question.asave()
+        except Exception:
+            pass
+
+        return {
+            'success': False,
+            'error': str(e)
+        }
+    finally:
+        # ORM calls ran on asgiref's shared sync thread; don't let its connection go stale
+        await sync_to_async(close_old_connections)()
+
+
+def process_llm_request(question_id):
+    """Process LLM request on the background event loop (see core.aio)."""
+    run_in_background(aprocess_llm_request(question_id))
+
     return {
         'success': True,
         'message': f'Processing started for question ID: {question_id}'
-    }
\ No newline at end of file
+    }
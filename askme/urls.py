@@ -10,4 +10,5 @@ urlpatterns = [
     path('questions/<int:question_id>/', views.question_detail, name='detail'),
     path('questions/<int:question_id>/status/', views.check_status, name='check_status'),
     path('debug-api-keys/', views.debug_api_keys, name='debug-api-keys'),
+    path('api/metrics/providers/', views.provider_metrics, name='provider_metrics'),
 ]
\ No newline at end of file
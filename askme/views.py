@@ -1,21 +1,43 @@
+import asyncio
+import time
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.views.decorators.http import require_POST
 from django.conf import settings
 from .models import Question, Response, LLMModel, Conversation
 from .forms import QuestionForm, FollowUpQuestionForm
 from .tasks import process_llm_request
-from core.utils import log_user_activity
+from .hedging import get_hedge_stats
+from .ratelimit import get_limiter_stats
+from .providers import get_prompt_cache_stats
+from .resilience import get_breaker_stats
+from core.aio import get_background_stats
+from core.utils import async_login_required, log_user_activity
 import logging
 
 logger = logging.getLogger(__name__)
 
+# check_status(?wait=N) holds a request open for at most this many seconds
+STATUS_MAX_WAIT = 30
+STATUS_POLL_INTERVAL = 0.5
 
-@login_required
-def home(request):
+
+@async_login_required
+async def home(request):
     """Ask Me tool home page."""
+    response, question_id = await sync_to_async(_home)(request)
+    if question_id:
+        # Start processing
+        process_llm_request(question_id)
+    return response
+
+
+def _home(request):
+    """Form handling for home(); returns (response, id of a new question or None)."""
     # Get available LLM models
     models = LLMModel.objects.filter(is_active=True)
     
@@ -57,16 +79,13 @@ def home(request):
                     request=request
                 )
                 
-                # Start processing
-                process_llm_request(question.id)
-                
                 messages.success(request, 'Question submitted. Processing your request...')
-                return redirect('askme:conversation', conversation_id=conversation.id)
+                return redirect('askme:conversation', conversation_id=conversation.id), question.id
             
             except Exception as e:
                 logger.error(f"Error submitting question: {str(e)}")
                 messages.error(request, f'Error submitting question: {str(e)}')
-                return redirect('askme:home')
+                return redirect('askme:home'), None
     else:
         form = QuestionForm()
     
@@ -77,12 +96,21 @@ def home(request):
         'recent_conversations': recent_conversations,
     }
     
-    return render(request, 'askme/home.html', context)
+    return render(request, 'askme/home.html', context), None
 
 
-@login_required
-def conversation_detail(request, conversation_id):
+@async_login_required
+async def conversation_detail(request, conversation_id):
     """Show conversation details with all questions and responses."""
+    response, question_id = await sync_to_async(_conversation_detail)(request, conversation_id)
+    if question_id:
+        # Start processing
+        process_llm_request(question_id)
+    return response
+
+
+def _conversation_detail(request, conversation_id):
+    """Form handling for conversation_detail(); returns (response, id of a new question or None)."""
     conversation = get_object_or_404(Conversation, id=conversation_id, user=request.user)
     questions = conversation.questions.all().order_by('sequence')
     
@@ -119,16 +147,13 @@ def conversation_detail(request, conversation_id):
                     request=request
                 )
                 
-                # Start processing
-                process_llm_request(question.id)
-                
                 messages.success(request, 'Follow-up question submitted. Processing your request...')
-                return redirect('askme:conversation', conversation_id=conversation.id)
+                return redirect('askme:conversation', conversation_id=conversation.id), question.id
                 
             except Exception as e:
                 logger.error(f"Error submitting follow-up: {str(e)}")
                 messages.error(request, f'Error submitting follow-up: {str(e)}')
-                return redirect('askme:conversation', conversation_id=conversation.id)
+                return redirect('askme:conversation', conversation_id=conversation.id), None
     else:
         form = FollowUpQuestionForm()
     
@@ -139,7 +164,7 @@ def conversation_detail(request, conversation_id):
         'form': form
     }
     
-    return render(request, 'askme/conversation.html', context)
+    return render(request, 'askme/conversation.html', context), None
 
 
 @login_required
@@ -170,10 +195,30 @@ def conversation_list(request):
     return render(request, 'askme/conversation_list.html', context)
 
 
-@login_required
-def check_status(request, question_id):
-    """Check question status (for AJAX polling)."""
-    question = get_object_or_404(Question, id=question_id, user=request.user)
+@async_login_required
+async def check_status(request, question_id):
+    """
+    Check question status (for AJAX polling).
+    
+    With ?wait=N the request is held open until the question completes or
+    fails, or N seconds (at most STATUS_MAX_WAIT) pass, so the page can
+    long-poll instead of asking every few seconds. Waiting holds no thread.
+    """
+    try:
+        wait = float(request.GET.get('wait', 0))
+    except ValueError:
+        wait = 0
+    wait = min(wait, STATUS_MAX_WAIT) if wait > 0 else 0
+    deadline = time.monotonic() + wait
+    
+    questions = Question.objects.select_related('response').filter(id=question_id, user=request.user)
+    while True:
+        question = await questions.afirst()
+        if question is None:
+            raise Http404("No Question matches the given query.")
+        if question.status in ('completed', 'failed') or time.monotonic() >= deadline:
+            break
+        await asyncio.sleep(STATUS_POLL_INTERVAL)
     
     data = {
         'status': question.status,
@@ -194,4 +239,16 @@ def debug_api_keys(request):
     return JsonResponse({
         'openai_key_set': bool(settings.OPENAI_API_KEY),
         'anthropic_key_set': bool(settings.ANTHROPIC_API_KEY)
-    })
\ No newline at end of file
+    })
+
+
+@staff_member_required
+def provider_metrics(request):
+    """JSON hedging, rate-limit, circuit-breaker, prompt-cache and background-loop metrics (this process only)."""
+    return JsonResponse({
+        'hedging': get_hedge_stats(),
+        'limits': get_limiter_stats(),
+        'breakers': get_breaker_stats(),
+        'prompt_cache': get_prompt_cache_stats(),
+        'background': get_background_stats(),
+    })
@@ -0,0 +1,6 @@
+"""
+Micro-benchmarks for the subtitle hot paths.
+
+Run with `python manage.py bench`; see benchmarks.runner for the JSON format
+used to compare results across commits.
+"""
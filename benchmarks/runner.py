@@ -0,0 +1,125 @@
+"""
+Timing, JSON output and regression comparison for the benchmark suite.
+
+Result files look like:
+
+    {
+        "meta": {"commit": "...", "python": "3.11.7", "created_at": "..."},
+        "results": {
+            "render.srt@10000": {"min": 0.012, "median": 0.013, "mean": 0.013,
+                                 "repeat": 5, "per_item_us": 1.2},
+            "docx.build@200000": {"skipped": "above max_size 20000"},
+            "pdf.build@1000": {"failed": "ValueError: ..."}
+        }
+    }
+
+Comparisons use the `min` of each run, which is the least noisy estimate on
+a shared machine.
+"""
+import gc
+import platform
+import statistics
+import subprocess
+import time
+from django.utils import timezone
+
+
+def get_commit():
+    """Return the current git commit hash, or None outside a checkout."""
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True, timeout=5
+        )
+        return result.stdout.strip()
+    except Exception:
+        return None
+
+
+def time_callable(func, repeat):
+    """Run func `repeat` times (after one warm-up) and return the timings in seconds."""
+    func()
+    timings = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return timings
+
+
+def run_benchmarks(benchmarks, sizes, repeat=5, log=None):
+    """Run every benchmark at every size and return the result document."""
+    results = {}
+
+    for benchmark in benchmarks:
+        for size in sizes:
+            key = f"{benchmark.name}@{size}"
+
+            if benchmark.max_size and size > benchmark.max_size:
+                results[key] = {'skipped': f"above max_size {benchmark.max_size}"}
+                continue
+
+            # One broken suite is recorded as failed; the rest still run
+            try:
+                func = benchmark.setup(size)
+                timings = time_callable(func, repeat)
+            except ImportError as e:
+                results[key] = {'skipped': f"missing dependency: {e}"}
+                continue
+            except Exception as e:
+                results[key] = {'failed': f"{type(e).__name__}: {e}"}
+                if log:
+                    log(f"{key:<36} failed ({results[key]['failed']})")
+                continue
+
+            best = min(timings)
+            results[key] = {
+                'min': best,
+                'median': statistics.median(timings),
+                'mean': statistics.mean(timings),
+                'repeat': repeat,
+                'per_item_us': best / size * 1e6,
+            }
+            if log:
+                log(f"{key:<36} min {best * 1000:10.2f} ms  ({results[key]['per_item_us']:.2f} us/item)")
+
+    return {
+        'meta': {
+            'commit': get_commit(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'created_at': timezone.now().isoformat(),
+            'sizes': list(sizes),
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare_results(baseline, current, threshold=0.10):
+    """
+    Compare two result documents.
+
+    Returns a list of (key, baseline_min, current_min, change) for every
+    benchmark present in both, and the subset whose slowdown exceeds
+    `threshold` (0.10 = 10% slower).
+    """
+    rows = []
+    regressions = []
+
+    for key, result in current['results'].items():
+        previous = baseline.get('results', {}).get(key)
+        if not previous or 'min' not in previous or 'min' not in result:
+            continue
+        change = (result['min'] - previous['min']) / previous['min']
+        row = (key, previous['min'], result['min'], change)
+        rows.append(row)
+        if change > threshold:
+            regressions.append(row)
+
+    return rows, regressions
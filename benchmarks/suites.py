@@ -0,0 +1,139 @@
+"""
+Benchmark definitions.
+
+Each benchmark's setup(size) imports the code under test, builds its input
+and returns a zero-argument callable; only the callable is timed. Imports
+happen inside setup so a missing optional dependency (whisper, torch,
+python-docx) skips that benchmark instead of the whole suite.
+"""
+from .synthetic import generate_whisper_segments, segments_to_cues, segments_to_rows
+
+
+class Benchmark:
+    def __init__(self, name, setup, max_size=None, description=''):
+        self.name = name
+        self.setup = setup
+        self.max_size = max_size
+        self.description = description
+
+
+def _enhanced_service():
+    from transcription.subtitle_services import EnhancedSubtitleService
+    return EnhancedSubtitleService()
+
+
+def _translation_service():
+    from translation.services import TranslationService
+    # __init__ loads the project from the database; the timed methods don't need it
+    return TranslationService.__new__(TranslationService)
+
+
+def _export_service():
+    from translation.services import VideoExportService
+    return VideoExportService.__new__(VideoExportService)
+
+
+def _timestamps(size):
+    segments = generate_whisper_segments(size)
+    return [value for segment in segments for value in (segment['start'], segment['end'])]
+
+
+def setup_segmentation_engine(size):
+    from core.segmentation import segment_words
+    segments = generate_whisper_segments(size)
+    return lambda: segment_words(segments)
+
+
+def setup_segmentation_enhanced(size):
+    service = _enhanced_service()
+    segments = generate_whisper_segments(size)
+    return lambda: service.create_subtitle_segments(segments)
+
+
+def setup_segmentation_translation(size):
+    service = _translation_service()
+    segments = generate_whisper_segments(size)
+    return lambda: service.create_subtitle_segments(segments)
+
+
+def setup_srt_render(size):
+    service = _enhanced_service()
+    cues = segments_to_cues(generate_whisper_segments(size))
+    return lambda: service.create_srt_content(cues)
+
+
+def setup_vtt_render(size):
+    service = _enhanced_service()
+    cues = segments_to_cues(generate_whisper_segments(size))
+    return lambda: service.create_vtt_content(cues, use_translated=True)
+
+
+def setup_ass_render(size):
+    service = _export_service()
+    rows = segments_to_rows(generate_whisper_segments(size))
+    return lambda: service._create_ass_content(rows, 'original', 24, '#FFFFFF')
+
+
+def setup_timecode_srt_enhanced(size):
+    service = _enhanced_service()
+    values = _timestamps(size)
+    return lambda: [service.format_time_srt(value) for value in values]
+
+
+def setup_timecode_srt_translation(size):
+    service = _translation_service()
+    values = _timestamps(size)
+    return lambda: [service.format_time_srt(value) for value in values]
+
+
+def setup_timecode_srt_export(size):
+    service = _export_service()
+    values = _timestamps(size)
+    return lambda: [service._format_time_srt(value) for value in values]
+
+
+def setup_timecode_vtt_translation(size):
+    service = _translation_service()
+    values = _timestamps(size)
+    return lambda: [service.format_time_vtt(value) for value in values]
+
+
+def setup_timecode_ass(size):
+    service = _export_service()
+    values = _timestamps(size)
+    return lambda: [service._seconds_to_ass_time(value) for value in values]
+
+
+def setup_docx_build(size):
+    from transcription.subtitle_services import create_subtitle_document
+    cues = segments_to_cues(generate_whisper_segments(size))
+    return lambda: create_subtitle_document(cues, 'benchmark.mp4', 'ar', is_rtl=True)
+
+
+BENCHMARKS = [
+    Benchmark('segmentation.engine', setup_segmentation_engine,
+              description='core.segmentation.segment_words on the word stream'),
+    Benchmark('segmentation.enhanced', setup_segmentation_enhanced,
+              description='EnhancedSubtitleService.create_subtitle_segments'),
+    Benchmark('segmentation.translation', setup_segmentation_translation,
+              description='TranslationService.create_subtitle_segments'),
+    Benchmark('render.srt', setup_srt_render,
+              description='EnhancedSubtitleService.create_srt_content'),
+    Benchmark('render.vtt', setup_vtt_render,
+              description='EnhancedSubtitleService.create_vtt_content (translated)'),
+    Benchmark('render.ass', setup_ass_render,
+              description='VideoExportService._create_ass_content'),
+    Benchmark('timecode.srt.enhanced', setup_timecode_srt_enhanced,
+              description='EnhancedSubtitleService.format_time_srt, two calls per segment'),
+    Benchmark('timecode.srt.translation', setup_timecode_srt_translation,
+              description='TranslationService.format_time_srt, two calls per segment'),
+    Benchmark('timecode.srt.export', setup_timecode_srt_export,
+              description='VideoExportService._format_time_srt, two calls per segment'),
+    Benchmark('timecode.vtt.translation', setup_timecode_vtt_translation,
+              description='TranslationService.format_time_vtt, two calls per segment'),
+    Benchmark('timecode.ass', setup_timecode_ass,
+              description='VideoExportService._seconds_to_ass_time, two calls per segment'),
+    # python-docx is slow enough that 200k cues would take minutes per repeat
+    Benchmark('docx.build', setup_docx_build, max_size=20000,
+              description='create_subtitle_document (Arabic, RTL)'),
+]
@@ -0,0 +1,78 @@
+import random
+from types import SimpleNamespace
+
+ARABIC_WORDS = [
+    'مرحبا', 'بكم', 'في', 'هذا', 'البرنامج', 'الذي', 'يتحدث', 'عن', 'تاريخ', 'المملكة',
+    'العربية', 'السعودية', 'والثقافة', 'المحلية', 'مع', 'ضيوف', 'من', 'مختلف', 'المناطق', 'اليوم',
+]
+ENGLISH_WORDS = [
+    'welcome', 'to', 'this', 'programme', 'about', 'the', 'history', 'of', 'the', 'kingdom',
+    'and', 'its', 'local', 'culture', 'with', 'guests', 'from', 'different', 'regions', 'today',
+]
+
+
+def generate_whisper_segments(count, seed=0, language='ar'):
+    """
+    Return `count` segments shaped like Whisper's transcribe() output.
+
+    Segment lengths, word durations and pauses are drawn from fixed-seed
+    distributions so every run (and every commit) sees the same stream.
+    Short segments are mixed in on purpose, since those drive the merge passes.
+    """
+    rng = random.Random(seed)
+    vocabulary = ARABIC_WORDS if language == 'ar' else ENGLISH_WORDS
+
+    segments = []
+    clock = 0.0
+    for index in range(count):
+        word_count = rng.choice([1, 2, 3, 5, 8, 12, 16])
+        words = []
+        start = clock
+        for _ in range(word_count):
+            word_start = clock
+            clock += rng.uniform(0.15, 0.6)
+            words.append({
+                'word': ' ' + rng.choice(vocabulary),
+                'start': round(word_start, 3),
+                'end': round(clock, 3),
+                'probability': round(rng.uniform(0.6, 1.0), 3),
+            })
+        segments.append({
+            'id': index,
+            'start': round(start, 3),
+            'end': round(clock, 3),
+            'text': ''.join(word['word'] for word in words),
+            'words': words,
+        })
+        # Mostly short gaps, occasionally a long pause
+        clock += rng.choice([0.05, 0.1, 0.3, 0.6, 1.5, 3.0])
+
+    return segments
+
+
+def segments_to_cues(segments):
+    """Convert raw segments to the dicts used by create_srt_content() and the DOCX builder."""
+    return [
+        {
+            'start': segment['start'],
+            'end': segment['end'],
+            'original_text': segment['text'].strip(),
+            'translated_text': segment['text'].strip().upper(),
+        }
+        for segment in segments
+    ]
+
+
+def segments_to_rows(segments):
+    """Convert raw segments to objects shaped like translation.Subtitle rows."""
+    return [
+        SimpleNamespace(
+            sequence=index,
+            start_time=segment['start'],
+            end_time=segment['end'],
+            original_text=segment['text'].strip(),
+            translated_text=segment['text'].strip().upper(),
+            speaker=None,
+        )
+        for index, segment in enumerate(segments, 1)
+    ]
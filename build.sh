@@ -13,6 +13,12 @@ pip install --upgrade pip
 echo "📋 Installing Python packages..."
 pip install --timeout=1000 --no-cache-dir -r requirements.txt
 
+# Optional faster-whisper ASR backend (see core.asr)
+if [ "$INSTALL_FASTER_WHISPER" = "true" ] || [ "$ASR_BACKEND" = "faster_whisper" ]; then
+    echo "🎙️ Installing faster-whisper..."
+    pip install --timeout=1000 --no-cache-dir -r requirements/faster_whisper.txt
+fi
+
 # Set Django settings for build
 export DJANGO_SETTINGS_MODULE=config.settings.production
 export BUILD_PHASE=true
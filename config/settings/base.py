@@ -32,11 +32,12 @@ INSTALLED_APPS = [
     'askme',
     'program_ideation',
     'translation',
+    'search',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.StaticFilesMiddleware',  # WhiteNoise, async-capable
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -126,4 +127,160 @@ OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY', '')
 ANTHROPIC_API_KEY = os.environ.get('ANTHROPIC_API_KEY', '')
 DEEPSEEK_API_KEY = os.environ.get('DEEPSEEK_API_KEY', '')
 
+# Provider endpoints; point these at `manage.py llm_stub_server` for offline load tests
+OPENAI_API_BASE = os.environ.get('OPENAI_API_BASE', 'https://api.openai.com/v1').rstrip('/')
+DEEPSEEK_API_BASE = os.environ.get('DEEPSEEK_API_BASE', 'https://api.deepseek.com/v1').rstrip('/')
 
+# User activity logging
+# Events are buffered in-process and written with bulk_create by a background
+# flusher (see core.activity).
+USER_ACTIVITY_BUFFER = {
+    'ENABLED': True,
+    'MAX_SIZE': int(os.environ.get('USER_ACTIVITY_BUFFER_SIZE', 10000)),
+    'BATCH_SIZE': int(os.environ.get('USER_ACTIVITY_BATCH_SIZE', 200)),
+    'FLUSH_INTERVAL': float(os.environ.get('USER_ACTIVITY_FLUSH_INTERVAL', 5.0)),
+}
+
+# Local inference server (manage.py inference_server). When enabled, subtitle and
+# translation services send Whisper/NLLB calls to it instead of loading models.
+# The socket is a local file, so the server must run in the same container as
+# web (see core.inference); it is not a Procfile process of its own.
+INFERENCE_SERVER = {
+    'ENABLED': os.environ.get('INFERENCE_SERVER_ENABLED', 'False').lower() == 'true',
+    'SOCKET_PATH': os.environ.get('INFERENCE_SERVER_SOCKET', '/tmp/ai-sba-inference.sock'),
+    'TIMEOUT': int(os.environ.get('INFERENCE_SERVER_TIMEOUT', 3600)),
+    'MAX_QUEUE': int(os.environ.get('INFERENCE_SERVER_MAX_QUEUE', 16)),
+    'PRELOAD': True,
+    'TRANSLATE_BATCH_SIZE': int(os.environ.get('INFERENCE_SERVER_TRANSLATE_BATCH_SIZE', 32)),
+}
+
+# Speech recognition engine for subtitles, transcription and translation (see
+# core.asr): 'whisper' (openai-whisper) or 'faster_whisper' (CTranslate2, int8 on
+# CPU). SubtitleProject/TranslationProject.asr_backend overrides BACKEND.
+ASR = {
+    'BACKEND': os.environ.get('ASR_BACKEND', 'whisper'),
+    'MODEL': os.environ.get('ASR_MODEL', 'large-v2'),
+    'COMPUTE_TYPE': os.environ.get('ASR_COMPUTE_TYPE', 'int8'),
+    'CPU_THREADS': int(os.environ.get('ASR_CPU_THREADS', 0)),
+}
+
+# Ask Me prompt packing (see askme.prompt_budget for CONTEXT_WINDOWS and the other keys)
+ASKME_PROMPT_BUDGET = {
+    'MAX_PROMPT_TOKENS': int(os.environ.get('ASKME_MAX_PROMPT_TOKENS', 32000)),
+}
+
+# Hedged LLM calls (see askme.hedging for the other keys): a call slower than the
+# primary model's p95 latency is also sent to its fallback, first answer wins.
+# Off by default since it sends prompts to a second vendor; to opt in set
+# LLM_HEDGING_ENABLED=true and LLM_HEDGING_FALLBACKS=openai=deepseek/deepseek-chat
+# (comma-separated primary=provider/model pairs).
+LLM_HEDGING = {
+    'ENABLED': os.environ.get('LLM_HEDGING_ENABLED', 'False').lower() == 'true',
+    'FALLBACKS': {
+        primary.strip().lower(): dict(zip(('provider', 'model_id'), target.strip().split('/', 1)))
+        for primary, target in (
+            pair.split('=', 1) for pair in os.environ.get('LLM_HEDGING_FALLBACKS', '').split(',') if '=' in pair
+        )
+        if '/' in target
+    },
+}
+
+# Provider rate limits for the whole account (see askme.ratelimit). Each process
+# takes 1/LLM_RATE_LIMIT_PROCESSES of them; callers queue FIFO instead of failing.
+LLM_RATE_LIMITS = {
+    'openai': {
+        'RPM': int(os.environ.get('OPENAI_RPM', 500)),
+        'TPM': int(os.environ.get('OPENAI_TPM', 200000)),
+        'MAX_CONCURRENT': int(os.environ.get('OPENAI_MAX_CONCURRENT', 16)),
+    },
+    'deepseek': {
+        'RPM': int(os.environ.get('DEEPSEEK_RPM', 300)),
+        'TPM': int(os.environ.get('DEEPSEEK_TPM', 300000)),
+        'MAX_CONCURRENT': int(os.environ.get('DEEPSEEK_MAX_CONCURRENT', 16)),
+    },
+}
+LLM_RATE_LIMIT_PROCESSES = int(os.environ.get('WEB_CONCURRENCY', 1))
+
+# Per-call deadlines, retries and circuit breakers (see askme.resilience)
+LLM_CALL_POLICY = {
+    'MAX_ATTEMPTS': int(os.environ.get('LLM_MAX_ATTEMPTS', 3)),
+    'BREAKER_THRESHOLD': int(os.environ.get('LLM_BREAKER_THRESHOLD', 5)),
+    'BREAKER_COOLDOWN': float(os.environ.get('LLM_BREAKER_COOLDOWN', 30)),
+}
+
+# Full-text search index (search app)
+SEARCH_INDEX = {
+    'ASYNC': os.environ.get('SEARCH_INDEX_ASYNC', 'True').lower() == 'true',
+    'DELAY': float(os.environ.get('SEARCH_INDEX_DELAY', 2.0)),
+}
+
+# Cache
+# CACHE_URL (or REDIS_URL) selects the cache shared by every worker process:
+#   redis://host:6379/0     Redis, or `manage.py redis_stub_server` locally
+#   file:///path/to/dir     a directory shared by the workers on one machine
+#   locmem://               per-process memory (the default outside production)
+# core.caching builds versioned, stampede-protected namespaces on top of it.
+CACHE_URL = os.environ.get('CACHE_URL') or os.environ.get('REDIS_URL', '')
+CACHE_KEY_PREFIX = os.environ.get('CACHE_KEY_PREFIX', 'ai-sba')
+
+
+def cache_backend(url, key_prefix=CACHE_KEY_PREFIX):
+    """Return a CACHES entry for a cache URL."""
+    scheme, _, location = url.partition('://')
+    if scheme in ('redis', 'rediss'):
+        return {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': url,
+            'KEY_PREFIX': key_prefix,
+            'OPTIONS': {
+                'socket_connect_timeout': 2,
+                'socket_timeout': 2,
+                'health_check_interval': 30,
+            },
+        }
+    if scheme == 'file':
+        return {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': location,
+            'KEY_PREFIX': key_prefix,
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    if scheme in ('', 'locmem'):
+        return {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': location or 'default',
+            'KEY_PREFIX': key_prefix,
+        }
+    raise ValueError(f"Unsupported CACHE_URL scheme: {scheme}")
+
+
+CACHES = {
+    'default': cache_backend(CACHE_URL),
+}
+
+# Extra URL names / namespaces tracked by core.middleware.UserActivityMiddleware
+USER_ACTIVITY_TRACKED_URL_NAMES = []
+USER_ACTIVITY_TRACKED_NAMESPACES = []
+
+# Tool registry / dashboard caching (see tool_registry.services and signals)
+TOOL_REGISTRY_CACHE_TIMEOUT = 3600          # Shared cache, cleared on AITool save/delete
+TOOL_REGISTRY_LOCAL_CACHE_TIMEOUT = 30      # Per-process copy in front of the shared cache
+DASHBOARD_ACTIVITY_CACHE_TIMEOUT = 300      # Recent activity fragment, cleared on new activity
+
+# Models program ideation tries, best first (see program_ideation.model_choice)
+PROGRAM_IDEATION_MODEL_PREFERENCES = [
+    {'provider': 'openai', 'model_prefix': 'gpt-5'},
+    {'provider': 'openai', 'model_prefix': 'gpt-4'},
+    {'provider': 'openai'},
+    {'provider': 'deepseek'},
+]
+PROGRAM_IDEATION_MODEL_CACHE_TIMEOUT = 60   # Per process, cleared on LLMModel save/delete
+
+# Stored PDF/Word exports of program ideas, named by a hash of their content
+# and rebuilt in the background after changes (see program_ideation.exports)
+PROGRAM_IDEATION_EXPORTS = {
+    'PATH': 'exports/program_ideation',
+    'PREBUILD': os.environ.get('PROGRAM_IDEATION_EXPORT_PREBUILD', 'True').lower() == 'true',
+    'FORMATS': ['pdf', 'word'],
+    'REBUILD_DELAY': float(os.environ.get('PROGRAM_IDEATION_EXPORT_DELAY', 10.0)),
+}
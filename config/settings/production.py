@@ -81,11 +81,10 @@ LOGGING = {
     },
 }
 
-# Cache (optional - add Redis later if needed)
+# Cache: Redis when CACHE_URL/REDIS_URL is set, otherwise a directory shared by
+# the gunicorn workers so they don't each start cold
 CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+    'default': cache_backend(CACHE_URL or f"file://{BASE_DIR / '.cache'}"),
 }
 
 # File Upload Settings
@@ -0,0 +1,176 @@
+import os
+import atexit
+import logging
+import threading
+from collections import deque
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from core.signals import activity_flushed
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_BUFFER_SETTINGS = {
+    'ENABLED': True,
+    'MAX_SIZE': 10000,        # Events held in memory before new ones are dropped
+    'BATCH_SIZE': 200,        # Flush as soon as this many events are waiting
+    'FLUSH_INTERVAL': 5.0,    # ...or at least this often (seconds)
+}
+
+
+def get_buffer_settings():
+    """Return the activity buffer settings merged over the defaults."""
+    config = DEFAULT_BUFFER_SETTINGS.copy()
+    config.update(getattr(settings, 'USER_ACTIVITY_BUFFER', {}))
+    return config
+
+
+class ActivityBuffer:
+    """
+    In-process bounded buffer for UserActivity rows.
+
+    Views and middleware only append to a deque; a daemon thread writes the
+    rows with a single bulk_create every BATCH_SIZE events or FLUSH_INTERVAL
+    seconds. When the buffer is full new events are dropped and counted
+    rather than blocking the request.
+    """
+
+    def __init__(self, max_size=10000, batch_size=200, flush_interval=5.0):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped_count = 0
+        self.flushed_count = 0
+        self._events = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def add(self, activity):
+        """Queue an unsaved UserActivity instance. Returns False if dropped."""
+        # The row records when the event happened, not when the batch is written
+        activity.created_at = timezone.now()
+        with self._lock:
+            if len(self._events) >= self.max_size:
+                self.dropped_count += 1
+                return False
+            self._events.append(activity)
+            pending = len(self._events)
+
+        self._ensure_flusher()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def flush(self):
+        """Write all queued events to the database. Returns the number written."""
+        from core.models import UserActivity
+
+        # Serialise flushes so the timer thread and atexit never double-write
+        with self._flush_lock:
+            with self._lock:
+                batch = list(self._events)
+                self._events.clear()
+
+            if not batch:
+                return 0
+
+            try:
+                close_old_connections()
+                UserActivity.objects.bulk_create(batch, batch_size=self.batch_size)
+                self.flushed_count += len(batch)
+            except Exception as e:
+                with self._lock:
+                    self.dropped_count += len(batch)
+                logger.error(f"Error flushing {len(batch)} user activity events: {str(e)}")
+                return 0
+            finally:
+                close_old_connections()
+
+            # bulk_create skips post_save, so tell cache owners explicitly
+            try:
+                activity_flushed.send(
+                    sender=UserActivity,
+                    user_ids={activity.user_id for activity in batch},
+                )
+            except Exception as e:
+                logger.error(f"Error in activity_flushed receivers: {str(e)}")
+
+            return len(batch)
+
+    def stats(self):
+        """Return counters for monitoring."""
+        with self._lock:
+            pending = len(self._events)
+        return {
+            'pending': pending,
+            'flushed': self.flushed_count,
+            'dropped': self.dropped_count,
+            'max_size': self.max_size,
+        }
+
+    def _ensure_flusher(self):
+        """Start the flusher thread lazily, once per process.
+
+        Gunicorn forks workers after --preload, and threads do not survive a
+        fork, so the pid is checked rather than just the thread handle.
+        """
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='user-activity-flusher')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _run(self):
+        """Flusher loop: wake up on a full batch or after the flush interval."""
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"User activity flusher error: {str(e)}")
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_activity_buffer():
+    """Return the process-wide activity buffer, creating it on first use."""
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                config = get_buffer_settings()
+                _buffer = ActivityBuffer(
+                    max_size=config['MAX_SIZE'],
+                    batch_size=config['BATCH_SIZE'],
+                    flush_interval=config['FLUSH_INTERVAL'],
+                )
+                # Workers are recycled often; write whatever is left on exit
+                atexit.register(_buffer.flush)
+    return _buffer
+
+
+def record_activity(activity):
+    """Queue an activity for batched writing, or save it directly if buffering is disabled."""
+    if not get_buffer_settings()['ENABLED']:
+        activity.save()
+        return True
+    return get_activity_buffer().add(activity)
+
+
+def flush_activity():
+    """Flush any queued activity events immediately."""
+    if _buffer is None:
+        return 0
+    return _buffer.flush()
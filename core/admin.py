@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import UserActivity
+from .models import UserActivity, JobStageMetric
 
 @admin.register(UserActivity)
 class UserActivityAdmin(admin.ModelAdmin):
@@ -12,4 +12,18 @@ class UserActivityAdmin(admin.ModelAdmin):
         return False
     
     def has_change_permission(self, request, obj=None):
-        return False
\ No newline at end of file
+        return False
+
+
+@admin.register(JobStageMetric)
+class JobStageMetricAdmin(admin.ModelAdmin):
+    list_display = ('job_type', 'job_id', 'stage', 'calls', 'wall_time', 'cpu_time', 'peak_rss_mb',
+                    'real_time_factor', 'success', 'created_at')
+    list_filter = ('job_type', 'stage', 'success', 'created_at')
+    search_fields = ('job_id', 'stage')
+    date_hierarchy = 'created_at'
+    readonly_fields = ('job_type', 'job_id', 'stage', 'calls', 'wall_time', 'cpu_time', 'peak_rss_mb',
+                       'audio_duration', 'real_time_factor', 'success', 'created_at', 'updated_at')
+    
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,78 @@
+"""
+A per-process asyncio event loop on a daemon thread.
+
+Work that outlives a request (LLM calls for submitted questions) is
+scheduled here with run_in_background(), from sync or async views alike.
+Thousands of coroutines can wait on providers in this one thread, where
+the old approach needed a thread per request.
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundLoop:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._pid = None
+        self._tasks = set()
+
+    def get_loop(self):
+        """Start the loop thread lazily, once per process.
+
+        Gunicorn forks workers after --preload, and threads do not survive a
+        fork, so the pid is checked rather than just the thread handle.
+        """
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return self._loop
+
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return self._loop
+            self._pid = os.getpid()
+            self._loop = asyncio.new_event_loop()
+            self._tasks = set()
+            self._thread = threading.Thread(target=self._run, args=(self._loop,), name='background-event-loop')
+            self._thread.daemon = True
+            self._thread.start()
+            return self._loop
+
+    def _run(self, loop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    def submit(self, coro):
+        """Schedule a coroutine; returns a concurrent.futures.Future for its result."""
+        loop = self.get_loop()
+        # Start from an empty context: a copy of the request's would carry
+        # asgiref's per-request executor, which is gone once the view returns
+        future = contextvars.Context().run(asyncio.run_coroutine_threadsafe, coro, loop)
+        self._tasks.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        self._tasks.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Background task failed: {future.exception()}")
+
+    def stats(self):
+        return {'running': len(self._tasks), 'alive': bool(self._thread and self._thread.is_alive())}
+
+
+_background = BackgroundLoop()
+
+
+def run_in_background(coro):
+    """Run a coroutine on this process's background event loop."""
+    return _background.submit(coro)
+
+
+def get_background_stats():
+    return _background.stats()
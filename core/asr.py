@@ -0,0 +1,238 @@
+"""
+Speech recognition backends for the subtitle, transcription and
+translation pipelines.
+
+Every backend decodes media to 16 kHz mono audio and returns the same
+result dict, which is what core.segmentation and the pipelines read:
+
+    {'language': 'ar', 'text': '...', 'segments': [
+        {'start': 0.0, 'end': 2.4, 'text': '...',
+         'words': [{'word': '...', 'start': 0.0, 'end': 0.5, 'probability': 0.9}]},
+    ]}
+
+'whisper' is openai-whisper on PyTorch, as before. 'faster_whisper' runs the
+same Whisper weights on CTranslate2 with int8 weights by default, which is
+several times faster on CPU for the same output structure. ASR['BACKEND']
+picks the deployment default; SubtitleProject and TranslationProject can
+override it with their asr_backend field, which only accepts backends whose
+library is installed; loading a missing one raises ImproperlyConfigured.
+"""
+import importlib.util
+import logging
+from abc import ABC, abstractmethod
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from core.ml import faster_whisper, whisper
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+DEFAULT_ASR_SETTINGS = {
+    'BACKEND': 'whisper',
+    'MODEL': 'large-v2',
+    'FALLBACK_MODEL': 'base',     # Loaded when MODEL can't be
+    # faster_whisper only
+    'DEVICE': 'auto',             # 'cpu', 'cuda' or 'auto'
+    'COMPUTE_TYPE': 'int8',       # CTranslate2 weight type: int8, int8_float16, float16, float32
+    'CPU_THREADS': 0,             # 0 lets CTranslate2 decide
+}
+
+
+def get_asr_settings():
+    """Return the ASR settings merged over the defaults."""
+    config = DEFAULT_ASR_SETTINGS.copy()
+    config.update(getattr(settings, 'ASR', {}))
+    return config
+
+
+class ASRBackend(ABC):
+    """A speech recognition engine; the model is loaded on first use."""
+
+    name = None
+    label = None
+    module = None     # The library the backend imports
+    package = None    # ...and the pip package that provides it
+
+    def __init__(self, model_name=None, config=None):
+        self.config = config or get_asr_settings()
+        self.model_name = model_name or self.config['MODEL']
+        self.model = None
+
+    @property
+    def loaded(self):
+        return self.model is not None
+
+    @classmethod
+    def is_available(cls):
+        """Whether the backend's library is installed, checked without importing it."""
+        return importlib.util.find_spec(cls.module) is not None
+
+    def check_available(self):
+        if not self.is_available():
+            raise ImproperlyConfigured(
+                f"The {self.label} ASR backend needs the {self.package} package, which is not installed; "
+                f"install it or choose another ASR backend"
+            )
+
+    def load(self, fallback=True):
+        """
+        Load the model; later calls are no-ops.
+
+        If MODEL can't be loaded, FALLBACK_MODEL is loaded instead unless
+        `fallback` is False; model_name is the model actually loaded.
+        """
+        if self.model is not None:
+            return self.model
+        self.check_available()
+        logger.info(f"Loading {self.label} model {self.model_name}...")
+        try:
+            self.model = self._load_model(self.model_name)
+        except Exception as e:
+            fallback_model = self.config['FALLBACK_MODEL']
+            if not fallback or not fallback_model or fallback_model == self.model_name:
+                raise
+            logger.warning(f"Could not load {self.model_name}: {e}")
+            logger.info(f"Loading {self.label} model {fallback_model} instead...")
+            self.model = self._load_model(fallback_model)
+            self.model_name = fallback_model
+        logger.info(f"✓ {self.label} {self.model_name} loaded")
+        return self.model
+
+    @abstractmethod
+    def load_audio(self, path):
+        """Decode a media file to 16 kHz mono float32 samples."""
+
+    def audio_duration(self, audio):
+        return len(audio) / SAMPLE_RATE
+
+    @abstractmethod
+    def transcribe(self, audio, language=None, word_timestamps=True, task='transcribe', **options):
+        """Transcribe a path or load_audio() samples into the shared result dict."""
+
+    @abstractmethod
+    def _load_model(self, model_name):
+        """Load and return the engine's model object."""
+
+
+class WhisperBackend(ASRBackend):
+    """openai-whisper on PyTorch."""
+
+    name = 'whisper'
+    label = 'Whisper'
+    module = 'whisper'
+    package = 'openai-whisper'
+
+    def _load_model(self, model_name):
+        return whisper.load_model(model_name)
+
+    def load_audio(self, path):
+        return whisper.load_audio(path)
+
+    def transcribe(self, audio, language=None, word_timestamps=True, task='transcribe', **options):
+        self.load()
+        result = self.model.transcribe(audio, language=language, word_timestamps=word_timestamps, task=task, **options)
+
+        # Whisper's dict also holds tokens and numpy scalars the pipelines don't read
+        return {
+            'language': result.get('language'),
+            'text': result.get('text', ''),
+            'segments': [
+                {
+                    'start': float(segment['start']),
+                    'end': float(segment['end']),
+                    'text': segment['text'],
+                    'words': [
+                        {
+                            'word': word['word'],
+                            'start': float(word['start']),
+                            'end': float(word['end']),
+                            'probability': float(word.get('probability', 0.0)),
+                        }
+                        for word in segment.get('words', [])
+                    ],
+                }
+                for segment in result['segments']
+            ],
+        }
+
+
+class FasterWhisperBackend(ASRBackend):
+    """faster-whisper: Whisper on CTranslate2, int8 on CPU by default."""
+
+    name = 'faster_whisper'
+    label = 'faster-whisper'
+    module = 'faster_whisper'
+    package = 'faster-whisper'
+
+    # openai-whisper options with no faster-whisper equivalent
+    IGNORED_OPTIONS = ('fp16', 'verbose')
+
+    def _load_model(self, model_name):
+        return faster_whisper.WhisperModel(
+            model_name,
+            device=self.config['DEVICE'],
+            compute_type=self.config['COMPUTE_TYPE'],
+            cpu_threads=self.config['CPU_THREADS'],
+        )
+
+    def load_audio(self, path):
+        return faster_whisper.decode_audio(path, sampling_rate=SAMPLE_RATE)
+
+    def transcribe(self, audio, language=None, word_timestamps=True, task='transcribe', **options):
+        self.load()
+        for option in self.IGNORED_OPTIONS:
+            options.pop(option, None)
+        segments, info = self.model.transcribe(
+            audio, language=language, word_timestamps=word_timestamps, task=task, **options
+        )
+
+        # segments is a generator: decoding happens while it is read
+        result_segments = [
+            {
+                'start': float(segment.start),
+                'end': float(segment.end),
+                'text': segment.text,
+                'words': [
+                    {
+                        'word': word.word,
+                        'start': float(word.start),
+                        'end': float(word.end),
+                        'probability': float(word.probability),
+                    }
+                    for word in (segment.words or [])
+                ],
+            }
+            for segment in segments
+        ]
+        return {
+            'language': info.language,
+            'text': ''.join(segment['text'] for segment in result_segments),
+            'segments': result_segments,
+        }
+
+
+ASR_BACKENDS = {
+    'whisper': WhisperBackend,
+    'faster_whisper': FasterWhisperBackend,
+}
+
+ASR_BACKEND_CHOICES = [(name, backend.label) for name, backend in ASR_BACKENDS.items()]
+
+
+def validate_asr_backend(name):
+    """Reject a project asr_backend whose library isn't installed (blank means the default)."""
+    if name and name in ASR_BACKENDS and not ASR_BACKENDS[name].is_available():
+        backend = ASR_BACKENDS[name]
+        raise ValidationError(
+            f"{backend.label} is not installed on this server ({backend.package}); choose another ASR backend."
+        )
+
+
+def get_asr_backend(name=None, model_name=None):
+    """A new, unloaded backend: `name` or ASR['BACKEND'], with `model_name` or ASR['MODEL']."""
+    config = get_asr_settings()
+    name = name or config['BACKEND']
+    if name not in ASR_BACKENDS:
+        raise ValueError(f"Unknown ASR backend {name!r}; choose from {', '.join(ASR_BACKENDS)}")
+    return ASR_BACKENDS[name](model_name, config)
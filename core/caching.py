@@ -0,0 +1,150 @@
+"""
+Typed, versioned cache namespaces on top of Django's cache.
+
+A CacheNamespace owns every key under one name. Keys embed a schema version
+(bumped in code when the cached shape changes) and a generation counter kept
+in the cache itself, so invalidate_all() drops a whole namespace in every
+process with a single INCR instead of hunting keys down.
+
+get_or_compute() guards misses against stampedes: the first caller takes a
+short lock with cache.add() and computes; the others poll for the value
+for up to `wait_timeout` and only compute themselves if the holder died.
+With CACHE_URL pointing at Redis all of this is shared across workers and
+nodes; with the local fallbacks it is per machine or per process.
+"""
+import hashlib
+import logging
+import time
+import uuid
+from typing import Callable, Generic, Hashable, Iterable, Optional, Tuple, TypeVar, Union
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+Key = Union[Hashable, Tuple[Hashable, ...]]
+
+# Longest key part kept verbatim; longer keys are hashed
+MAX_KEY_LENGTH = 200
+POLL_INTERVAL = 0.05
+
+
+class CacheNamespace(Generic[T]):
+    """
+    A group of cache entries of one type that are invalidated together.
+
+        tools_cache: CacheNamespace[list] = CacheNamespace('tools', timeout=3600)
+        tools = tools_cache.get_or_compute('active', load_tools)
+        tools_cache.invalidate_all()
+    """
+
+    def __init__(self, name: str, timeout: Optional[float] = 300, version: int = 1,
+                 alias: str = 'default', lock_timeout: float = 30.0, wait_timeout: float = 10.0):
+        self.name = name
+        self.timeout = timeout
+        self.version = version
+        self.alias = alias
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+
+    @property
+    def cache(self):
+        # Looked up per call: Django keeps one connection per thread
+        return caches[self.alias]
+
+    @property
+    def generation_key(self) -> str:
+        return f'{self.name}:generation'
+
+    def generation(self) -> int:
+        """Current generation of the namespace (created on first use)."""
+        generation = self.cache.get(self.generation_key)
+        if generation is None:
+            # Seeded from the clock so an evicted counter never reuses old generations
+            self.cache.add(self.generation_key, int(time.time()), None)
+            generation = self.cache.get(self.generation_key, 0)
+        return generation
+
+    def make_key(self, key: Key, generation: Optional[int] = None) -> str:
+        parts = key if isinstance(key, tuple) else (key,)
+        suffix = ':'.join(str(part) for part in parts)
+        if len(suffix) > MAX_KEY_LENGTH:
+            suffix = hashlib.sha1(suffix.encode('utf-8')).hexdigest()
+        if generation is None:
+            generation = self.generation()
+        return f'{self.name}:v{self.version}:g{generation}:{suffix}'
+
+    def get(self, key: Key, default: Optional[T] = None) -> Optional[T]:
+        entry = self.cache.get(self.make_key(key))
+        # Entries are stored as 1-tuples so a cached None is still a hit
+        return entry[0] if entry is not None else default
+
+    def get_many(self, keys: Iterable[Key]) -> dict:
+        """Return {key: value} for the keys that are cached."""
+        generation = self.generation()
+        names = {self.make_key(key, generation): key for key in keys}
+        found = self.cache.get_many(list(names))
+        return {names[name]: entry[0] for name, entry in found.items()}
+
+    def set(self, key: Key, value: T, timeout: Optional[float] = DEFAULT_TIMEOUT) -> None:
+        timeout = self.timeout if timeout is DEFAULT_TIMEOUT else timeout
+        self.cache.set(self.make_key(key), (value,), timeout)
+
+    def delete(self, key: Key) -> None:
+        self.cache.delete(self.make_key(key))
+
+    def invalidate_all(self) -> None:
+        """Drop every entry in the namespace, in all processes sharing the cache."""
+        try:
+            self.cache.incr(self.generation_key)
+        except ValueError:
+            # Nothing cached yet, or the counter was evicted
+            self.cache.set(self.generation_key, int(time.time()), None)
+
+    def get_or_compute(self, key: Key, compute: Callable[[], T], timeout: Optional[float] = DEFAULT_TIMEOUT) -> T:
+        """
+        Return the cached value, computing and storing it on a miss.
+
+        Only one caller per key computes at a time; the rest wait for its
+        result. compute() errors propagate and nothing is cached.
+        """
+        timeout = self.timeout if timeout is DEFAULT_TIMEOUT else timeout
+        generation = self.generation()
+        cache_key = self.make_key(key, generation)
+        cache = self.cache
+
+        entry = cache.get(cache_key)
+        if entry is not None:
+            return entry[0]
+
+        lock_key = f'{cache_key}:lock'
+        token = uuid.uuid4().hex
+        if not cache.add(lock_key, token, self.lock_timeout):
+            deadline = time.monotonic() + self.wait_timeout
+            while time.monotonic() < deadline:
+                time.sleep(POLL_INTERVAL)
+                entry = cache.get(cache_key)
+                if entry is not None:
+                    return entry[0]
+                if cache.add(lock_key, token, self.lock_timeout):
+                    break
+            else:
+                logger.warning(f"Cache lock wait timed out for {cache_key}; computing anyway")
+                return self._compute(cache_key, compute, timeout)
+
+        try:
+            # The previous holder may have finished between our get and add
+            entry = cache.get(cache_key)
+            if entry is not None:
+                return entry[0]
+            return self._compute(cache_key, compute, timeout)
+        finally:
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+
+    def _compute(self, cache_key, compute, timeout):
+        value = compute()
+        self.cache.set(cache_key, (value,), timeout)
+        return value
@@ -0,0 +1,107 @@
+"""
+Windowed and keyset-paginated reads of subtitle cues for the editors.
+
+Both Subtitle (translation) and SubtitleSegment (transcription) have a
+(project, start_time) index, so either mode is an index range scan however
+long the programme is:
+
+    ?start=120&end=180          cues overlapping [120s, 180s)
+    ?cursor=<next_cursor>&limit=200
+                                the next page in (start_time, id) order
+
+Rows come from values(), so no model instances are built.
+"""
+from django.http import JsonResponse
+
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+
+# Cues starting this long before a window are still checked for overlap.
+# Generated cues are at most a few seconds; hand-edited ones can be longer.
+WINDOW_LOOKBACK = 60.0
+
+
+class CueQueryError(ValueError):
+    """Raised for malformed window or cursor parameters."""
+
+
+def encode_cursor(start_time, pk):
+    return f"{start_time!r}:{pk}"
+
+
+def decode_cursor(cursor):
+    try:
+        start_time, pk = cursor.rsplit(':', 1)
+        return float(start_time), int(pk)
+    except ValueError:
+        raise CueQueryError(f"Invalid cursor {cursor!r}")
+
+
+def cues_in_window(queryset, start, end, fields, lookback=WINDOW_LOOKBACK):
+    """Rows of cues overlapping [start, end), ordered by start time."""
+    return list(
+        queryset.filter(
+            start_time__gte=start - lookback,
+            start_time__lt=end,
+            end_time__gt=start,
+        ).order_by('start_time', 'id').values(*fields)
+    )
+
+
+def cues_after(queryset, cursor, limit, fields):
+    """One keyset page after `cursor` (None for the first page). Returns (rows, next_cursor)."""
+    if cursor:
+        start_time, pk = decode_cursor(cursor)
+        queryset = queryset.filter(start_time__gte=start_time).exclude(start_time=start_time, id__lte=pk)
+
+    # One extra row tells whether there is a next page
+    rows = list(queryset.order_by('start_time', 'id').values(*fields)[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]['start_time'], rows[-1]['id'])
+    return rows, next_cursor
+
+
+def _float_param(request, name):
+    value = request.GET.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise CueQueryError(f"{name} must be a number of seconds")
+
+
+def cue_page_response(request, queryset, fields, transform=None, extra=None):
+    """
+    Answer an editor cue request with either a time window or a keyset page.
+
+    `fields` must include id and start_time. `transform` may rewrite each row
+    dict, and `extra` is merged into the response.
+    """
+    try:
+        start = _float_param(request, 'start')
+        end = _float_param(request, 'end')
+        try:
+            limit = min(max(int(request.GET.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        except ValueError:
+            raise CueQueryError("limit must be an integer")
+
+        if start is not None or end is not None:
+            if start is None or end is None or end <= start:
+                raise CueQueryError("start and end must both be given, with end > start")
+            rows = cues_in_window(queryset, start, end, fields)
+            next_cursor = None
+        else:
+            rows, next_cursor = cues_after(queryset, request.GET.get('cursor'), limit, fields)
+    except CueQueryError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+    if transform:
+        rows = [transform(row) for row in rows]
+
+    data = {'cues': rows, 'next_cursor': next_cursor}
+    if extra:
+        data.update(extra)
+    return JsonResponse(data)
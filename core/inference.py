@@ -0,0 +1,144 @@
+"""
+Client side of the local inference server (`manage.py inference_server`).
+
+The server keeps Whisper and NLLB loaded in one long-lived process; web and
+job processes send it transcribe/translate calls over a Unix socket instead
+of loading their own copies. Messages are length-prefixed JSON:
+
+    4-byte big-endian length + UTF-8 JSON
+
+Requests are {"op": ..., ...}; replies are {"ok": true, "result": ...,
+"queue_wait": s, "run_time": s} or {"ok": false, "error": ..., "type": ...}.
+
+The socket lives on the local filesystem, so the server has to run in the
+same container (dyno, Railway service) as the processes that use it; a
+separate Procfile process type gets its own filesystem and can't be
+reached. To use it, start it next to web and turn client mode on there:
+
+    INFERENCE_SERVER_ENABLED=true
+    python manage.py inference_server & python manage.py migrate --noinput && gunicorn ...
+
+Without INFERENCE_SERVER_ENABLED nothing talks to the server, so don't start
+it at all.
+"""
+import json
+import logging
+import socket
+import struct
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INFERENCE_SETTINGS = {
+    'ENABLED': False,
+    'SOCKET_PATH': '/tmp/ai-sba-inference.sock',
+    'TIMEOUT': 3600,        # Seconds a client waits for a reply (queue + inference)
+    'MAX_QUEUE': 16,        # Requests waiting before new ones are rejected as busy
+    'PRELOAD': True,        # Load models when the server starts rather than on first call
+    'TRANSLATE_BATCH_SIZE': 32,  # Subtitle cues sent per translate call
+}
+
+_HEADER = struct.Struct('>I')
+MAX_MESSAGE_SIZE = 256 * 1024 * 1024
+
+
+class InferenceError(Exception):
+    """Raised when the inference server rejects or fails a request."""
+
+
+class InferenceUnavailable(InferenceError):
+    """Raised when the inference server cannot be reached."""
+
+
+def get_inference_settings():
+    """Return the inference server settings merged over the defaults."""
+    config = DEFAULT_INFERENCE_SETTINGS.copy()
+    config.update(getattr(settings, 'INFERENCE_SERVER', {}))
+    return config
+
+
+def send_message(sock, payload):
+    data = json.dumps(payload).encode('utf-8')
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1024 * 1024))
+        if not chunk:
+            raise ConnectionError('Connection closed mid-message')
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def recv_message(sock):
+    (length,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    if length > MAX_MESSAGE_SIZE:
+        raise ConnectionError(f'Message of {length} bytes exceeds the limit')
+    return json.loads(_recv_exact(sock, length).decode('utf-8'))
+
+
+class InferenceClient:
+    """Blocking client; opens one connection per call so it is fork-safe."""
+
+    def __init__(self, socket_path=None, timeout=None):
+        config = get_inference_settings()
+        self.socket_path = socket_path or config['SOCKET_PATH']
+        self.timeout = timeout or config['TIMEOUT']
+        self.translate_batch_size = config['TRANSLATE_BATCH_SIZE']
+
+    def call(self, op, **params):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            try:
+                sock.connect(self.socket_path)
+            except (FileNotFoundError, ConnectionRefusedError) as e:
+                raise InferenceUnavailable(
+                    f"Inference server is not running at {self.socket_path} "
+                    f"(start it with `manage.py inference_server`): {e}"
+                )
+            send_message(sock, dict(params, op=op))
+            reply = recv_message(sock)
+        except socket.timeout:
+            raise InferenceError(f"Inference request '{op}' timed out after {self.timeout}s")
+        except OSError as e:
+            # Broken pipe or a connection dropped mid-message, e.g. the server restarted
+            raise InferenceUnavailable(f"Lost the connection to the inference server during '{op}': {e}")
+        finally:
+            sock.close()
+
+        if not reply.get('ok'):
+            raise InferenceError(f"Inference server error ({reply.get('type', 'error')}): {reply.get('error')}")
+
+        logger.info(f"Inference '{op}': waited {reply.get('queue_wait', 0):.2f}s, ran {reply.get('run_time', 0):.2f}s")
+        return reply['result']
+
+    def transcribe(self, path, backend=None, **options):
+        """Transcribe a media file readable by the server; returns core.asr's result dict.
+
+        `backend` names a core.asr backend; the server's default is used if None.
+        """
+        return self.call('transcribe', path=path, backend=backend, options=options)
+
+    def translate(self, texts, source_lang, target_lang, generate=None):
+        """Translate a list of strings; `generate` is passed to NLLB's generate()."""
+        return self.call(
+            'translate',
+            texts=texts,
+            source_lang=source_lang,
+            target_lang=target_lang,
+            generate=generate or {},
+        )
+
+    def stats(self):
+        return self.call('stats')
+
+
+def get_inference_client():
+    """Return an InferenceClient when the inference server is enabled, else None."""
+    if not get_inference_settings()['ENABLED']:
+        return None
+    return InferenceClient()
@@ -0,0 +1,240 @@
+"""
+Local inference server: one process that keeps the ASR model and NLLB loaded and
+serves transcribe/translate calls from web and job processes over a Unix
+socket (see core.inference for the protocol and client).
+
+Connections are accepted on threads, but all model work goes through a
+bounded queue to a single worker thread, so there is only ever one copy of
+each model in memory and GPU calls never overlap. When the queue is full new
+requests are rejected as busy instead of piling up.
+"""
+import os
+import time
+import queue
+import logging
+import threading
+import socketserver
+from core.asr import get_asr_backend
+from core.inference import get_inference_settings, send_message, recv_message
+
+logger = logging.getLogger(__name__)
+
+NLLB_LANGUAGE_CODES = {
+    'ar': 'arb_Arab',
+    'en': 'eng_Latn',
+}
+
+
+class _Job:
+    __slots__ = ('op', 'params', 'enqueued_at', 'started_at', 'reply', 'done')
+
+    def __init__(self, op, params):
+        self.op = op
+        self.params = params
+        self.enqueued_at = time.monotonic()
+        self.started_at = None
+        self.reply = None
+        self.done = threading.Event()
+
+
+class InferenceWorker:
+    """Owns the models and runs queued jobs one at a time."""
+
+    def __init__(self, max_queue=16):
+        from transcription.subtitle_services import EnhancedSubtitleService
+
+        self.queue = queue.Queue(maxsize=max_queue)
+        # Holds the default ASR backend and NLLB; each is loaded by the first op that needs it
+        self.service = EnhancedSubtitleService(use_inference_server=False)
+        # ASR backends other than the service's, loaded when a request names one
+        self.asr_backends = {}
+        self.started_at = time.time()
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._models_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='inference-worker')
+        self._thread.daemon = True
+
+    def start(self):
+        self._thread.start()
+
+    def load_models(self):
+        """Preload the default ASR backend and NLLB; one failing doesn't stop the other."""
+        try:
+            self.get_asr()
+        except Exception as e:
+            logger.error(f"Could not preload the ASR model, transcribe calls will fail: {str(e)}")
+        with self._models_lock:
+            self.service.load_translator()
+
+    def get_translator(self):
+        """The service with NLLB loaded; ASR is not touched."""
+        with self._models_lock:
+            self.service.load_translator()
+        if self.service.translator_model is None:
+            raise RuntimeError('Translation model is not loaded')
+        return self.service
+
+    def get_asr(self, name=None):
+        """
+        The loaded ASR backend called `name` (default: the service's).
+
+        Projects are served from here, so like TranslationService a model
+        that won't load is an error rather than a quiet switch to FALLBACK_MODEL.
+        """
+        service = self.service
+        with self._models_lock:
+            if not name or name == service.asr.name:
+                service.asr.load(fallback=False)
+                return service.asr
+            if name not in self.asr_backends:
+                backend = get_asr_backend(name)
+                backend.load(fallback=False)
+                self.asr_backends[name] = backend
+            return self.asr_backends[name]
+
+    def submit(self, op, params):
+        """Queue a job; returns it, or None if the queue is full."""
+        job = _Job(op, params)
+        try:
+            self.queue.put_nowait(job)
+        except queue.Full:
+            self.rejected += 1
+            return None
+        return job
+
+    def stats(self):
+        service = self.service
+        return {
+            'pid': os.getpid(),
+            'uptime': time.time() - self.started_at,
+            'queued': self.queue.qsize(),
+            'max_queue': self.queue.maxsize,
+            'processed': self.processed,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'asr_backend': service.asr.name,
+            'asr_loaded': sorted(([service.asr.name] if service.asr.loaded else []) + list(self.asr_backends)),
+            'translator_loaded': service.translator_model is not None,
+        }
+
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            job.started_at = time.monotonic()
+            try:
+                result = getattr(self, f'_op_{job.op}')(**job.params)
+                job.reply = {'ok': True, 'result': result}
+                self.processed += 1
+            except Exception as e:
+                logger.error(f"Inference '{job.op}' failed: {str(e)}")
+                job.reply = {'ok': False, 'error': str(e), 'type': 'error'}
+                self.failed += 1
+            finally:
+                job.reply['queue_wait'] = job.started_at - job.enqueued_at
+                job.reply['run_time'] = time.monotonic() - job.started_at
+                job.done.set()
+
+    def _op_transcribe(self, path, options=None, backend=None):
+        asr = self.get_asr(backend)
+        audio = asr.load_audio(path)
+        result = asr.transcribe(audio, **(options or {}))
+        result['duration'] = asr.audio_duration(audio)
+        return result
+
+    def _op_translate(self, texts, source_lang, target_lang, generate=None):
+        from core.ml import torch
+
+        service = self.get_translator()
+
+        tokenizer = service.tokenizer
+        tokenizer.src_lang = NLLB_LANGUAGE_CODES.get(source_lang, 'eng_Latn')
+        forced_bos_token_id = tokenizer.convert_tokens_to_ids(NLLB_LANGUAGE_CODES.get(target_lang, 'eng_Latn'))
+
+        translations = []
+        for text in texts:
+            if not text.strip():
+                translations.append('')
+                continue
+            inputs = tokenizer(
+                text,
+                return_tensors="pt",
+                max_length=512,
+                truncation=True,
+                padding=True
+            ).to(service.device)
+            with torch.no_grad():
+                generated_tokens = service.translator_model.generate(
+                    **inputs,
+                    forced_bos_token_id=forced_bos_token_id,
+                    **(generate or {})
+                )
+            translations.append(tokenizer.decode(generated_tokens[0], skip_special_tokens=True))
+        return translations
+
+
+class InferenceRequestHandler(socketserver.BaseRequestHandler):
+    """Reads one request per connection, waits for the worker and replies."""
+
+    def handle(self):
+        try:
+            request = recv_message(self.request)
+        except Exception as e:
+            logger.warning(f"Bad inference request: {str(e)}")
+            return
+
+        params = dict(request)
+        op = params.pop('op', None)
+        worker = self.server.worker
+
+        if op == 'stats':
+            send_message(self.request, {'ok': True, 'result': worker.stats()})
+            return
+        if op not in ('transcribe', 'translate'):
+            send_message(self.request, {'ok': False, 'error': f'Unknown op {op!r}', 'type': 'error'})
+            return
+
+        job = worker.submit(op, params)
+        if job is None:
+            send_message(self.request, {
+                'ok': False,
+                'error': f'Queue is full ({worker.queue.maxsize} waiting)',
+                'type': 'busy',
+            })
+            return
+
+        job.done.wait()
+        try:
+            send_message(self.request, job.reply)
+        except OSError:
+            # Client gave up (timeout or worker recycled); the result is simply dropped
+            logger.warning(f"Inference client went away before '{op}' finished")
+
+
+class InferenceServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, worker):
+        self.worker = worker
+        self.socket_path = socket_path
+        if os.path.exists(socket_path):
+            # Left behind by a previous run that was killed
+            os.unlink(socket_path)
+        super().__init__(socket_path, InferenceRequestHandler)
+        os.chmod(socket_path, 0o660)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def make_server(socket_path=None, max_queue=None, preload=None):
+    """Load the models, start the worker and bind the socket; call serve_forever() to serve."""
+    config = get_inference_settings()
+    worker = InferenceWorker(max_queue=max_queue or config['MAX_QUEUE'])
+    if preload if preload is not None else config['PRELOAD']:
+        worker.load_models()
+    worker.start()
+    return InferenceServer(socket_path or config['SOCKET_PATH'], worker)
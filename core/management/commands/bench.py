@@ -0,0 +1,85 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from benchmarks.runner import run_benchmarks, compare_results
+from benchmarks.suites import BENCHMARKS
+
+DEFAULT_SIZES = '1000,10000,50000,200000'
+
+
+class Command(BaseCommand):
+    help = 'Run the subtitle micro-benchmarks and optionally compare against a baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default=DEFAULT_SIZES,
+            help=f'Comma-separated synthetic segment counts (default {DEFAULT_SIZES})',
+        )
+        parser.add_argument(
+            '--filter',
+            help='Only run benchmarks whose name contains this string (e.g. "render")',
+        )
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per benchmark')
+        parser.add_argument('--output', help='Write the JSON results to this file')
+        parser.add_argument('--compare', help='Baseline JSON file to compare against')
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.10,
+            help='Fail when a benchmark is this much slower than the baseline (default 0.10)',
+        )
+        parser.add_argument('--list', action='store_true', help='List benchmarks and exit')
+
+    def handle(self, *args, **options):
+        benchmarks = BENCHMARKS
+        if options['filter']:
+            benchmarks = [b for b in benchmarks if options['filter'] in b.name]
+
+        if options['list']:
+            for benchmark in benchmarks:
+                self.stdout.write(f"{benchmark.name:<28} {benchmark.description}")
+            return
+
+        if not benchmarks:
+            raise CommandError('No benchmarks match the filter')
+
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        except ValueError:
+            raise CommandError('--sizes must be a comma-separated list of integers')
+
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare'], encoding='utf-8') as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read baseline {options['compare']}: {e}")
+
+        document = run_benchmarks(benchmarks, sizes, repeat=options['repeat'], log=self.stdout.write)
+
+        skipped = {key: result['skipped'] for key, result in document['results'].items() if 'skipped' in result}
+        for key, reason in skipped.items():
+            self.stdout.write(self.style.WARNING(f"{key:<36} skipped ({reason})"))
+        failed = [key for key, result in document['results'].items() if 'failed' in result]
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(document, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote results to {options['output']}"))
+
+        if baseline is not None:
+            rows, regressions = compare_results(baseline, document, options['threshold'])
+            commit = baseline.get('meta', {}).get('commit') or 'baseline'
+            self.stdout.write(f"\nCompared with {commit[:12]}:")
+            for key, before, after, change in rows:
+                line = f"{key:<36} {before * 1000:10.2f} ms -> {after * 1000:10.2f} ms  {change:+.1%}"
+                style = self.style.ERROR if change > options['threshold'] else self.style.SUCCESS
+                self.stdout.write(style(line))
+            if regressions:
+                raise CommandError(
+                    f"{len(regressions)} benchmark(s) regressed by more than {options['threshold']:.0%}"
+                )
+
+        if failed:
+            raise CommandError(f"{len(failed)} benchmark(s) failed: {', '.join(failed)}")
@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.ml import HEAVY_MODULES
+
+# What a web worker does before serving its first request
+STARTUP_SCRIPT = (
+    "from django.core.wsgi import get_wsgi_application\n"
+    "application = get_wsgi_application()\n"
+    "from django.urls import get_resolver\n"
+    "get_resolver().url_patterns\n"
+)
+
+
+def parse_importtime(output):
+    """
+    Parse `python -X importtime` stderr into [(module, self_us, cumulative_us, depth)].
+
+    Nested imports are indented by two spaces per level in the module column.
+    """
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3:
+            continue
+        name = parts[2].rstrip()
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        rows.append((stripped, int(parts[0]), int(parts[1]), depth))
+    return rows
+
+
+class Command(BaseCommand):
+    help = 'Measure web startup import time with python -X importtime and enforce a budget'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--budget', type=float, default=1.0,
+                            help='Maximum total import time in seconds (default 1.0)')
+        parser.add_argument('--top', type=int, default=15, help='Show the N slowest top-level imports')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+        started = time.perf_counter()
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+            capture_output=True, text=True, cwd=str(settings.BASE_DIR), env=env,
+        )
+        wall_time = time.perf_counter() - started
+
+        if process.returncode != 0:
+            tail = '\n'.join(process.stderr.splitlines()[-20:])
+            raise CommandError(f'Startup script failed:\n{tail}')
+
+        rows = parse_importtime(process.stderr)
+        total = sum(row[1] for row in rows) / 1e6
+        imported = {row[0] for row in rows}
+        heavy = [name for name in HEAVY_MODULES if name in imported]
+
+        self.stdout.write(f'Slowest top-level imports ({len(rows)} modules imported):')
+        top_level = sorted((row for row in rows if row[3] == 0), key=lambda row: row[2], reverse=True)
+        for name, _, cumulative, _ in top_level[:options['top']]:
+            self.stdout.write(f'  {cumulative / 1000:8.1f} ms  {name}')
+
+        self.stdout.write(f'\nTotal import time {total:.3f}s (budget {options["budget"]:.3f}s), '
+                          f'process wall time {wall_time:.3f}s')
+
+        problems = []
+        if heavy:
+            problems.append(f'heavy ML modules imported at startup: {", ".join(heavy)} '
+                            f'(use the proxies in core.ml)')
+        if total > options['budget']:
+            problems.append(f'import time {total:.3f}s exceeds the {options["budget"]:.3f}s budget')
+        if problems:
+            raise CommandError('; '.join(problems))
+
+        self.stdout.write(self.style.SUCCESS('Startup imports are within budget'))
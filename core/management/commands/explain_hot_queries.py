@@ -0,0 +1,120 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+
+def sample_id(model):
+    """Any existing primary key, so plans reflect real data; 0 on an empty table."""
+    return model.objects.order_by().values_list('pk', flat=True).first() or 0
+
+
+def get_hot_queries():
+    """
+    Return [(name, queryset)] mirroring the filters of the busiest views and jobs.
+
+    Keep this in step with the views: a query here that no longer matches its
+    view hides exactly the regression this command is for.
+    """
+    from askme.models import Conversation, Question
+    from core.models import UserActivity
+    from program_ideation.models import IdeaResponse, ProgramIdea
+    from transcription.models import SubtitleProject, SubtitleSegment, VideoFile
+    from translation.models import Subtitle, TranslationOutput, TranslationProject
+
+    user_id = sample_id(get_user_model())
+    conversation_id = sample_id(Conversation)
+    subtitle_project_id = sample_id(SubtitleProject)
+    translation_project_id = sample_id(TranslationProject)
+    idea_id = sample_id(ProgramIdea)
+
+    return [
+        ('askme.conversation_list', Conversation.objects.filter(
+            user_id=user_id, is_active=True
+        ).order_by('-updated_at')[:5]),
+        ('askme.conversation_detail', Question.objects.filter(
+            conversation_id=conversation_id
+        ).order_by('sequence')),
+        ('dashboard.recent_activity', UserActivity.objects.filter(user_id=user_id)[:5]),
+        ('transcription.cleanup_old_videos', VideoFile.objects.filter(
+            delete_at__lte=timezone.now(), delete_at__isnull=False
+        )),
+        ('transcription.subtitle_editor', SubtitleSegment.objects.filter(
+            project_id=subtitle_project_id
+        ).order_by('position', 'id')),
+        ('transcription.segment_cues', SubtitleSegment.objects.filter(
+            project_id=subtitle_project_id, start_time__gte=60.0, start_time__lt=180.0, end_time__gt=120.0
+        ).order_by('start_time', 'id')),
+        ('translation.api_subtitle_list', Subtitle.objects.filter(project_id=translation_project_id)),
+        ('translation.api_subtitle_cues', Subtitle.objects.filter(
+            project_id=translation_project_id, start_time__gte=60.0, start_time__lt=180.0, end_time__gt=120.0
+        ).order_by('start_time', 'id')),
+        ('translation.download_output', TranslationOutput.objects.filter(
+            project_id=translation_project_id, output_type='srt_original'
+        )),
+        ('program_ideation.latest_response', IdeaResponse.objects.filter(
+            idea_id=idea_id, response_type='missing_data'
+        ).order_by('-created_at')[:1]),
+    ]
+
+
+def find_full_scans(plan):
+    """Plan lines that read a whole table instead of using an index."""
+    scans = []
+    for line in plan.splitlines():
+        if 'Seq Scan' in line:
+            scans.append(line.strip())
+        elif 'SCAN ' in line and ' INDEX' not in line and 'SCAN CONSTANT ROW' not in line:
+            # SQLite: "SCAN table" without an index; temp B-trees are reported separately
+            scans.append(line.strip())
+    return scans
+
+
+class Command(BaseCommand):
+    help = 'Run EXPLAIN for the hot view and job queries against the configured database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filter', help='Only explain queries whose name contains this text')
+        parser.add_argument(
+            '--analyze',
+            action='store_true',
+            help='Execute the queries to get real timings (PostgreSQL/MySQL only)',
+        )
+        parser.add_argument(
+            '--fail-on-scan',
+            action='store_true',
+            help='Exit with an error if any plan scans a whole table (for CI on representative data)',
+        )
+
+    def handle(self, *args, **options):
+        options_for_explain = {}
+        if options['analyze']:
+            if connection.vendor not in ('postgresql', 'mysql'):
+                raise CommandError(f'--analyze is not supported on {connection.vendor}')
+            options_for_explain['analyze'] = True
+
+        self.stdout.write(f'Backend: {connection.vendor} ({connection.settings_dict["NAME"]})')
+
+        flagged = []
+        for name, queryset in get_hot_queries():
+            if options['filter'] and options['filter'] not in name:
+                continue
+
+            plan = queryset.explain(**options_for_explain)
+            scans = find_full_scans(plan)
+
+            self.stdout.write('')
+            heading = f'== {name}'
+            self.stdout.write(self.style.WARNING(heading) if scans else self.style.MIGRATE_HEADING(heading))
+            self.stdout.write(plan)
+            if scans:
+                flagged.append(name)
+
+        self.stdout.write('')
+        if flagged:
+            message = f'{len(flagged)} plans scan a whole table: {", ".join(flagged)}'
+            if options['fail_on_scan']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS('All hot queries use an index'))
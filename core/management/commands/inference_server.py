@@ -0,0 +1,46 @@
+import socket
+from django.core.management.base import BaseCommand, CommandError
+from core.inference import get_inference_settings
+
+
+class Command(BaseCommand):
+    help = 'Run the local inference server that keeps Whisper and NLLB loaded for web and job processes'
+
+    def add_arguments(self, parser):
+        config = get_inference_settings()
+        parser.add_argument('--socket', default=config['SOCKET_PATH'], help='Unix socket path to listen on')
+        parser.add_argument(
+            '--max-queue',
+            type=int,
+            default=config['MAX_QUEUE'],
+            help='Requests allowed to wait before new ones are rejected as busy',
+        )
+        parser.add_argument(
+            '--lazy',
+            action='store_true',
+            help='Load models on the first request instead of at startup',
+        )
+
+    def handle(self, *args, **options):
+        if not hasattr(socket, 'AF_UNIX'):
+            raise CommandError('The inference server needs Unix domain sockets, which this platform lacks')
+
+        from core.inference_server import make_server
+
+        if not options['lazy']:
+            self.stdout.write('Loading models...')
+        server = make_server(
+            socket_path=options['socket'],
+            max_queue=options['max_queue'],
+            preload=not options['lazy'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Inference server listening on {options['socket']}"))
+        self.stdout.write('Enable the client with INFERENCE_SERVER_ENABLED=true in web and job processes')
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f'Final counters: {server.worker.stats()}')
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from loadtest.redis_stub import make_server
+
+
+class Command(BaseCommand):
+    help = 'Run an in-memory Redis stand-in for trying the shared cache tier locally'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=6379)
+
+    def handle(self, *args, **options):
+        server, store = make_server(options['host'], options['port'])
+        url = f"redis://{options['host']}:{server.server_address[1]}/0"
+
+        self.stdout.write(self.style.SUCCESS(f'Redis stand-in listening on {url}'))
+        self.stdout.write(f'Point the app at it with CACHE_URL={url}')
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f'Final counters: {store.snapshot()}')
@@ -0,0 +1,97 @@
+import sys
+import time
+import logging
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+def get_peak_rss_mb():
+    """Return this process's peak resident set size in MB, or None if unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+class StageTimer:
+    """
+    Record per-stage wall time, CPU time and peak RSS for a processing job.
+
+    Usage:
+        timer = StageTimer('subtitle', project.id)
+        with timer.stage('asr'):
+            ...
+        timer.save()
+
+    Entering the same stage name again (e.g. once per segment) accumulates
+    into a single row. CPU time and peak RSS are process-wide, so jobs run
+    in a web worker also count other threads' work.
+    """
+
+    def __init__(self, job_type, job_id, audio_duration=None):
+        self.job_type = job_type
+        self.job_id = job_id
+        self.audio_duration = audio_duration
+        self.stages = {}
+        self.success = True
+
+    @contextmanager
+    def stage(self, name):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            entry = self.stages.setdefault(name, {'calls': 0, 'wall_time': 0.0, 'cpu_time': 0.0})
+            entry['calls'] += 1
+            entry['wall_time'] += time.perf_counter() - wall_start
+            entry['cpu_time'] += time.process_time() - cpu_start
+            entry['peak_rss_mb'] = get_peak_rss_mb()
+
+    def summary(self):
+        """Return {stage: wall_time} rounded for log lines."""
+        return {name: round(entry['wall_time'], 2) for name, entry in self.stages.items()}
+
+    def save(self, success=None):
+        """Write one JobStageMetric row per stage. Never raises."""
+        from core.models import JobStageMetric
+
+        if success is not None:
+            self.success = success
+
+        rows = []
+        for name, entry in self.stages.items():
+            rtf = None
+            if self.audio_duration:
+                rtf = entry['wall_time'] / self.audio_duration
+            rows.append(JobStageMetric(
+                job_type=self.job_type,
+                job_id=self.job_id,
+                stage=name,
+                calls=entry['calls'],
+                wall_time=entry['wall_time'],
+                cpu_time=entry['cpu_time'],
+                peak_rss_mb=entry['peak_rss_mb'],
+                audio_duration=self.audio_duration,
+                real_time_factor=rtf,
+                success=self.success,
+            ))
+
+        try:
+            JobStageMetric.objects.bulk_create(rows)
+        except Exception as e:
+            # Metrics must never fail the job they are measuring
+            logger.error(f"Error saving stage metrics for {self.job_type} #{self.job_id}: {str(e)}")
+            return 0
+
+        logger.info(f"{self.job_type} #{self.job_id} stage times: {self.summary()}")
+        return len(rows)
@@ -1,61 +1,109 @@
 import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
-from django.urls import resolve
 from core.utils import log_user_activity
 
 
+class StaticFilesMiddleware:
+    """
+    WhiteNoise for sync and async middleware chains.
+
+    WhiteNoiseMiddleware is sync-only, and one sync middleware makes Django
+    run the whole chain, async views included, on a thread per request.
+    Under ASGI this serves static files through WhiteNoise and hands
+    everything else straight to the next middleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        from whitenoise.middleware import WhiteNoiseMiddleware
+
+        self.get_response = get_response
+        self.whitenoise = WhiteNoiseMiddleware(get_response)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.whitenoise(request)
+
+    async def __acall__(self, request):
+        if self.whitenoise.autorefresh:
+            static_file = await sync_to_async(self.whitenoise.find_file)(request.path_info)
+        else:
+            static_file = self.whitenoise.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.whitenoise.serve)(static_file, request)
+        return await self.get_response(request)
+
+
 class UserActivityMiddleware(MiddlewareMixin):
     """Middleware to log user activity for specific views."""
-    
+
     # List of URL names to log
     TRACKED_URL_NAMES = [
         'transcription:upload',
         # Add more URL names to track as needed
     ]
-    
+
+    def __init__(self, get_response=None):
+        super().__init__(get_response)
+        # Extra URL names / whole namespaces can be switched on from settings,
+        # e.g. USER_ACTIVITY_TRACKED_NAMESPACES = ['askme', 'program_ideation']
+        self.tracked_url_names = set(self.TRACKED_URL_NAMES) | set(
+            getattr(settings, 'USER_ACTIVITY_TRACKED_URL_NAMES', [])
+        )
+        self.tracked_namespaces = set(getattr(settings, 'USER_ACTIVITY_TRACKED_NAMESPACES', []))
+
     def process_request(self, request):
         """Store the start time of the request."""
         request.start_time = time.time()
-    
+
     def process_response(self, request, response):
         """Log user activity for tracked views."""
         if not hasattr(request, 'user') or not request.user.is_authenticated:
             return response
-        
+
         try:
-            # Try to resolve the URL to get the URL name
-            resolver_match = resolve(request.path_info)
+            # Reuse the match Django already made while dispatching the view
+            resolver_match = getattr(request, 'resolver_match', None)
+            if resolver_match is None:
+                return response
+
             url_name = resolver_match.url_name
             namespace = resolver_match.namespace
-            
+
             # Construct the full URL name (with namespace)
             if namespace:
                 full_url_name = f"{namespace}:{url_name}"
             else:
                 full_url_name = url_name
-            
+
             # Check if this view should be tracked
-            if full_url_name in self.TRACKED_URL_NAMES:
+            if full_url_name in self.tracked_url_names or namespace in self.tracked_namespaces:
                 # Determine the tool name from the namespace
                 tool_name = namespace if namespace else "unknown"
-                
+
                 # Calculate response time
                 if hasattr(request, 'start_time'):
                     response_time = time.time() - request.start_time
                 else:
                     response_time = None
-                
+
                 # Prepare details
                 details = {
                     'method': request.method,
                     'path': request.path,
                     'status_code': response.status_code,
                 }
-                
+
                 if response_time:
                     details['response_time'] = round(response_time, 3)
-                
-                # Log the activity
+
+                # Queue the activity (written in batches off the request path)
                 log_user_activity(
                     user=request.user,
                     tool_name=tool_name,
@@ -66,5 +114,5 @@ class UserActivityMiddleware(MiddlewareMixin):
         except:
             # Fail silently - logging should not affect the response
             pass
-        
-        return response
\ No newline at end of file
+
+        return response
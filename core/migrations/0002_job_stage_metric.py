@@ -0,0 +1,35 @@
+# Generated by Django 4.2.8 on 2026-10-19 02:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobStageMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('job_type', models.CharField(choices=[('subtitle', 'Subtitle Generation'), ('translation', 'Translation')], max_length=20)),
+                ('job_id', models.PositiveIntegerField(help_text='Primary key of the SubtitleProject / TranslationProject')),
+                ('stage', models.CharField(max_length=50)),
+                ('calls', models.PositiveIntegerField(default=1, help_text='Times the stage ran (e.g. once per segment)')),
+                ('wall_time', models.FloatField(help_text='Wall-clock time in seconds')),
+                ('cpu_time', models.FloatField(help_text='Process CPU time in seconds')),
+                ('peak_rss_mb', models.FloatField(blank=True, help_text='Process peak RSS at the end of the stage', null=True)),
+                ('audio_duration', models.FloatField(blank=True, help_text='Media duration in seconds', null=True)),
+                ('real_time_factor', models.FloatField(blank=True, help_text='wall_time / audio_duration', null=True)),
+                ('success', models.BooleanField(default=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['job_type', 'job_id'], name='core_jobsta_job_typ_21b464_idx'), models.Index(fields=['job_type', 'stage', 'created_at'], name='core_jobsta_job_typ_ce9db5_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.8 on 2026-10-19 02:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_job_stage_metric'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='useractivity',
+            index=models.Index(fields=['user', '-created_at'], name='core_userac_user_id_d927ee_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+"""
+Lazy handles for the heavy ML libraries.
+
+`torch`, `whisper`, `faster_whisper` and `transformers` take seconds to
+import and pull in hundreds of modules, so service modules import these
+proxies instead:
+
+    from core.ml import torch, whisper
+
+The real module is imported the first time an attribute is used (normally
+at first inference), so importing views, URLconfs or services stays cheap.
+`manage.py check_import_time` fails if any of them is imported at startup.
+"""
+import importlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+HEAVY_MODULES = ('torch', 'whisper', 'faster_whisper', 'ctranslate2', 'transformers')
+
+
+class LazyModule:
+    """Module proxy that imports `name` on first attribute access."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    started = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    logger.info(f"Imported {self._name} in {time.perf_counter() - started:.2f}s")
+                    self._module = module
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    @property
+    def is_loaded(self):
+        return self._module is not None
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<LazyModule {self._name} ({state})>"
+
+
+torch = LazyModule('torch')
+whisper = LazyModule('whisper')
+faster_whisper = LazyModule('faster_whisper')
+transformers = LazyModule('transformers')
+
+
+def get_device():
+    """Return the torch device for inference (imports torch)."""
+    return torch.device("cuda" if torch.cuda.is_available() else "cpu")
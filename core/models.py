@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 
 class BaseModel(models.Model):
@@ -13,6 +14,9 @@ class BaseModel(models.Model):
 
 class UserActivity(BaseModel):
     """Model to track user activity across the platform."""
+    # Not auto_now_add: buffered rows are stamped when queued (core.activity),
+    # and auto_now_add would restamp them at flush time in bulk_create
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     tool_name = models.CharField(max_length=100)
     action = models.CharField(max_length=100)
@@ -22,6 +26,38 @@ class UserActivity(BaseModel):
     class Meta:
         verbose_name_plural = "User Activities"
         ordering = ['-created_at']
+        indexes = [
+            # Dashboard recent activity
+            models.Index(fields=['user', '-created_at']),
+        ]
     
     def __str__(self):
-        return f"{self.user.username} - {self.action} - {self.created_at}"
\ No newline at end of file
+        return f"{self.user.username} - {self.action} - {self.created_at}"
+
+class JobStageMetric(BaseModel):
+    """Timing and memory for one stage of a long-running processing job."""
+    JOB_TYPE_CHOICES = [
+        ('subtitle', 'Subtitle Generation'),
+        ('translation', 'Translation'),
+    ]
+    
+    job_type = models.CharField(max_length=20, choices=JOB_TYPE_CHOICES)
+    job_id = models.PositiveIntegerField(help_text="Primary key of the SubtitleProject / TranslationProject")
+    stage = models.CharField(max_length=50)
+    calls = models.PositiveIntegerField(default=1, help_text="Times the stage ran (e.g. once per segment)")
+    wall_time = models.FloatField(help_text="Wall-clock time in seconds")
+    cpu_time = models.FloatField(help_text="Process CPU time in seconds")
+    peak_rss_mb = models.FloatField(null=True, blank=True, help_text="Process peak RSS at the end of the stage")
+    audio_duration = models.FloatField(null=True, blank=True, help_text="Media duration in seconds")
+    real_time_factor = models.FloatField(null=True, blank=True, help_text="wall_time / audio_duration")
+    success = models.BooleanField(default=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['job_type', 'job_id']),
+            models.Index(fields=['job_type', 'stage', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.job_type} #{self.job_id} - {self.stage} ({self.wall_time:.2f}s)"
@@ -0,0 +1,282 @@
+"""
+Word-timestamp subtitle segmentation shared by the transcription and
+translation pipelines.
+
+Whisper's own segments are acoustic chunks, not subtitles: some are a single
+word, others run for 20 seconds. segment_words() ignores those boundaries and
+walks the word stream once, closing a cue on long pauses, sentence ends or when
+the next word would break a line/word/duration limit. Display times are then
+stretched into the following gap so each cue can be read at `reading_speed`.
+"""
+import math
+
+DEFAULT_SUBTITLE_CONFIG = {
+    "max_chars_per_line": 42,
+    "max_lines": 2,
+    "min_duration": 1.7,       # seconds on screen, when the gap allows it
+    "max_duration": 7.0,
+    "reading_speed": 15,       # characters per second
+    "gap_threshold": 0.5,      # pause that ends a cue once it has min_words
+    "max_merge_gap": 1.0,      # pause that always ends a cue
+    "min_gap": 0.08,           # kept between consecutive cues (two frames)
+    "min_words": 4,
+    "max_words": 25,
+}
+
+SENTENCE_END = ('.', '!', '?', '؟', '…', '。')
+CLAUSE_END = (',', '،', ';', '؛', ':')
+
+
+def get_subtitle_config(overrides=None):
+    """Return the default segmentation config updated with `overrides`."""
+    config = DEFAULT_SUBTITLE_CONFIG.copy()
+    if overrides:
+        config.update(overrides)
+    return config
+
+
+def iter_words(segments):
+    """
+    Yield (text, start, end) for every word in Whisper segments.
+
+    Segments without word timestamps get their words spread evenly across the
+    segment so the engine still works on older transcripts.
+    """
+    for segment in segments:
+        words = segment.get('words')
+        if words:
+            for word in words:
+                text = word.get('word', '').strip()
+                if text:
+                    yield text, word['start'], word['end']
+            continue
+
+        texts = segment.get('text', '').split()
+        if not texts:
+            continue
+        step = (segment['end'] - segment['start']) / len(texts)
+        for index, text in enumerate(texts):
+            start = segment['start'] + index * step
+            yield text, start, start + step
+
+
+def break_lines(words, max_chars_per_line=42, max_lines=2):
+    """
+    Split a cue's words into at most `max_lines` lines.
+
+    Uses the fewest lines that fit `max_chars_per_line`, and picks the break
+    points that make the longest line as short as possible. Cues hold at
+    most max_words words, so the small quadratic search is cheap.
+    """
+    text = ' '.join(words)
+    if len(text) <= max_chars_per_line or max_lines <= 1 or len(words) == 1:
+        return [text]
+
+    # offsets[i] = length of ' '.join(words[:i]) + 1, so a line words[i:j] is offsets[j] - offsets[i] - 1
+    offsets = [0]
+    for word in words:
+        offsets.append(offsets[-1] + len(word) + 1)
+
+    def width(i, j):
+        return offsets[j] - offsets[i] - 1
+
+    count = len(words)
+    line_count = min(max_lines, count, math.ceil(len(text) / max_chars_per_line))
+
+    if line_count == 2:
+        # The common case: try every break point
+        split = min(range(1, count), key=lambda i: (max(width(0, i), width(i, count)), i))
+        if max(width(0, split), width(split, count)) <= max_chars_per_line or max_lines == 2:
+            return [' '.join(words[:split]), ' '.join(words[split:])]
+        line_count = 3
+
+    while True:
+        # best[l][j]: (longest line, break) for the first j words in l lines
+        best = [{0: (0, None)}] + [{} for _ in range(line_count)]
+        for lines in range(1, line_count + 1):
+            for j in range(lines, count + 1):
+                candidates = [
+                    (max(best[lines - 1][i][0], width(i, j)), i)
+                    for i in best[lines - 1]
+                    if i < j
+                ]
+                if candidates:
+                    best[lines][j] = min(candidates)
+        if best[line_count][count][0] <= max_chars_per_line or line_count >= min(max_lines, count):
+            break
+        line_count += 1
+
+    breaks = []
+    j = count
+    for lines in range(line_count, 0, -1):
+        i = best[lines][j][1]
+        breaks.append((i, j))
+        j = i
+    return [' '.join(words[i:j]) for i, j in reversed(breaks)]
+
+
+class _Cue:
+    """
+    Words collected for one cue.
+
+    `lines`/`line_len` track a greedy fill of the words into lines, which
+    gives the minimum number of lines the cue needs, so checking whether the
+    next word still fits is O(1).
+    """
+    __slots__ = ('words', 'starts', 'ends', 'chars', 'lines', 'line_len', 'line_width')
+
+    def __init__(self, line_width):
+        self.words = []
+        self.starts = []
+        self.ends = []
+        self.chars = 0
+        self.lines = 0
+        self.line_len = 0
+        self.line_width = line_width
+
+    def lines_with(self, text):
+        """Lines needed if `text` were appended."""
+        if not self.words:
+            return 1
+        if self.line_len + 1 + len(text) <= self.line_width:
+            return self.lines
+        return self.lines + 1
+
+    def add(self, text, start, end):
+        if not self.words:
+            self.lines = 1
+            self.line_len = len(text)
+        elif self.line_len + 1 + len(text) <= self.line_width:
+            self.line_len += 1 + len(text)
+        else:
+            self.lines += 1
+            self.line_len = len(text)
+        self.chars += len(text) + (1 if self.words else 0)
+        self.words.append(text)
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def split(self, index):
+        """Keep words[:index] here and return a new cue holding the rest."""
+        head = _Cue(self.line_width)
+        tail = _Cue(self.line_width)
+        for position, item in enumerate(zip(self.words, self.starts, self.ends)):
+            (head if position < index else tail).add(*item)
+        for name in ('words', 'starts', 'ends', 'chars', 'lines', 'line_len'):
+            setattr(self, name, getattr(head, name))
+        return tail
+
+
+def _best_split(cue, min_words):
+    """
+    Pick where to split an overfull cue: the latest sentence end, else clause
+    end, else the largest pause, in the second half of the cue. Returns None
+    when there is no better point than the end.
+    """
+    best_index = None
+    best_score = 0.0
+    lower = max(min_words, (len(cue.words) + 1) // 2)
+    for index in range(lower, len(cue.words)):
+        previous = cue.words[index - 1]
+        score = cue.starts[index] - cue.ends[index - 1]
+        if previous.endswith(SENTENCE_END):
+            score += 2.0
+        elif previous.endswith(CLAUSE_END):
+            score += 1.0
+        if score >= best_score and score > 0.15:
+            best_index = index
+            best_score = score
+    return best_index
+
+
+def segment_words(segments, config=None):
+    """
+    Turn Whisper segments (with word timestamps) into subtitle cues.
+
+    Returns a list of {'start', 'end', 'text'} dicts where text is already
+    broken into lines with '\\n'. Runs in time linear in the number of words.
+    """
+    config = get_subtitle_config(config)
+    line_width = config['max_chars_per_line']
+    max_lines = config['max_lines']
+    max_chars = line_width * max_lines
+    max_words = config['max_words']
+    max_duration = config['max_duration']
+    min_words = config['min_words']
+    gap_threshold = config['gap_threshold']
+    max_merge_gap = config['max_merge_gap']
+
+    def overfull(cue, text, end):
+        return (
+            cue.lines_with(text) > max_lines
+            or len(cue.words) + 1 > max_words
+            or end - cue.starts[0] > max_duration
+        )
+
+    cues = []
+    cue = _Cue(line_width)
+
+    for text, start, end in iter_words(segments):
+        if cue.words:
+            gap = start - cue.ends[-1]
+            last = cue.words[-1]
+
+            if gap >= max_merge_gap or (gap >= gap_threshold and len(cue.words) >= min_words):
+                cues.append(cue)
+                cue = _Cue(line_width)
+            elif overfull(cue, text, end):
+                split_at = _best_split(cue, min_words)
+                tail = cue.split(split_at) if split_at else _Cue(line_width)
+                cues.append(cue)
+                cue = tail
+                if cue.words and overfull(cue, text, end):
+                    cues.append(cue)
+                    cue = _Cue(line_width)
+            elif (last.endswith(SENTENCE_END) and len(cue.words) >= min_words
+                  and cue.chars >= max_chars / 2):
+                cues.append(cue)
+                cue = _Cue(line_width)
+
+        cue.add(text, start, end)
+
+    if cue.words:
+        cues.append(cue)
+
+    return _finalise(cues, config)
+
+
+def _finalise(cues, config):
+    """Compute display times and line breaks for the collected cues."""
+    min_duration = config['min_duration']
+    max_duration = config['max_duration']
+    reading_speed = config['reading_speed']
+    min_gap = config['min_gap']
+
+    result = []
+    for index, cue in enumerate(cues):
+        start = cue.starts[0]
+        end = cue.ends[-1]
+
+        # Hold the cue long enough to read, without running into the next one
+        wanted = start + max(min_duration, cue.chars / reading_speed)
+        limit = start + max_duration
+        if index + 1 < len(cues):
+            limit = min(limit, cues[index + 1].starts[0] - min_gap)
+        end = max(end, min(wanted, limit))
+
+        lines = break_lines(cue.words, config['max_chars_per_line'], config['max_lines'])
+        result.append({
+            'start': start,
+            'end': end,
+            'text': '\n'.join(lines),
+        })
+    return result
+
+
+def wrap_text(text, config=None):
+    """Re-break free text (e.g. a translation) into subtitle lines."""
+    config = get_subtitle_config(config)
+    words = text.split()
+    if not words:
+        return ''
+    return '\n'.join(break_lines(words, config['max_chars_per_line'], config['max_lines']))
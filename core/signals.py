@@ -0,0 +1,9 @@
+from django.dispatch import Signal
+
+# Sent by core.activity after a batch of UserActivity rows has been written.
+# Receivers get `user_ids`: the set of users that have new activity.
+activity_flushed = Signal()
+
+# Sent after subtitles were written with bulk_create/bulk_update (no post_save).
+# `sender` is the subtitle model (Subtitle or SubtitleSegment); receivers get `project_id`.
+subtitles_changed = Signal()
@@ -1,3 +1,92 @@
-from django.test import TestCase
+from django.test import SimpleTestCase
 
-# Create your tests here.
+from .segmentation import DEFAULT_SUBTITLE_CONFIG, break_lines, segment_words
+
+
+def timed_words(text, start=0.0, step=0.3, pauses=None):
+    """A Whisper segment for `text` with one word every `step` seconds, plus `pauses` after given word indexes."""
+    pauses = pauses or {}
+    words = []
+    time = start
+    for index, word in enumerate(text.split()):
+        words.append({'word': ' ' + word, 'start': time, 'end': time + step})
+        time += step + pauses.get(index, 0.0)
+    return {'start': start, 'end': time, 'text': text, 'words': words}
+
+
+class SegmentWordsTests(SimpleTestCase):
+    """segment_words() turns word timestamps into readable cues."""
+
+    def texts(self, cues):
+        return [cue['text'].replace('\n', ' ') for cue in cues]
+
+    def test_long_pause_always_ends_a_cue(self):
+        cues = segment_words([timed_words('hello there friend', pauses={0: 1.2})])
+
+        self.assertEqual(self.texts(cues), ['hello', 'there friend'])
+
+    def test_short_pause_ends_a_cue_only_after_min_words(self):
+        cues = segment_words([timed_words('one two three four five six', pauses={1: 0.6, 3: 0.6})])
+
+        self.assertEqual(self.texts(cues), ['one two three four', 'five six'])
+
+    def test_sentence_end_closes_a_half_full_cue(self):
+        first = 'This opening sentence is long enough to fill half a cue.'
+        cues = segment_words([timed_words(f'{first} Then more follows')])
+
+        self.assertEqual(self.texts(cues), [first, 'Then more follows'])
+
+    def test_limits_hold_and_every_word_is_kept_in_order(self):
+        text = ' '.join(f'word{index}' for index in range(200))
+        cues = segment_words([timed_words(text, step=0.2)])
+
+        config = DEFAULT_SUBTITLE_CONFIG
+        for cue in cues:
+            lines = cue['text'].split('\n')
+            self.assertLessEqual(len(lines), config['max_lines'])
+            self.assertTrue(all(len(line) <= config['max_chars_per_line'] for line in lines))
+            self.assertLessEqual(len(cue['text'].split()), config['max_words'])
+            self.assertLessEqual(cue['end'] - cue['start'], config['max_duration'])
+        self.assertEqual(' '.join(self.texts(cues)).split(), text.split())
+
+    def test_display_time_stretches_without_overlapping_the_next_cue(self):
+        cues = segment_words([
+            timed_words('hi', start=0.0),
+            timed_words('again', start=1.5),
+            timed_words('later', start=10.0),
+        ])
+
+        self.assertEqual(len(cues), 3)
+        # Held until just before the next cue rather than the full min_duration
+        self.assertAlmostEqual(cues[0]['end'], 1.5 - DEFAULT_SUBTITLE_CONFIG['min_gap'])
+        # Enough room: held for min_duration
+        self.assertAlmostEqual(cues[1]['end'], 1.5 + DEFAULT_SUBTITLE_CONFIG['min_duration'])
+
+    def test_segments_without_word_timestamps_are_spread_evenly(self):
+        cues = segment_words([{'start': 2.0, 'end': 4.0, 'text': 'no word times'}])
+
+        self.assertEqual(self.texts(cues), ['no word times'])
+        self.assertEqual(cues[0]['start'], 2.0)
+
+    def test_config_overrides_apply(self):
+        cues = segment_words([timed_words('a b c d e f')], {'max_words': 2})
+
+        self.assertEqual([len(text.split()) for text in self.texts(cues)], [2, 2, 2])
+
+    def test_empty_input(self):
+        self.assertEqual(segment_words([]), [])
+        self.assertEqual(segment_words([{'start': 0.0, 'end': 1.0, 'text': '  '}]), [])
+
+
+class BreakLinesTests(SimpleTestCase):
+
+    def test_short_text_stays_on_one_line(self):
+        self.assertEqual(break_lines(['short', 'cue']), ['short cue'])
+
+    def test_two_lines_are_balanced(self):
+        words = 'the quick brown fox jumps over the lazy dog again and again'.split()
+        lines = break_lines(words, max_chars_per_line=42)
+
+        self.assertEqual(len(lines), 2)
+        self.assertLessEqual(abs(len(lines[0]) - len(lines[1])), 8)
+        self.assertEqual(' '.join(lines).split(), words)
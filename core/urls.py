@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'core'
+
+urlpatterns = [
+    path('api/metrics/job-stages/', views.job_stage_metrics, name='job_stage_metrics'),
+]
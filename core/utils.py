@@ -1,5 +1,7 @@
 import os
 import uuid
+from functools import wraps
+from asgiref.sync import sync_to_async
 from django.utils import timezone
 
 
@@ -32,6 +34,10 @@ def log_user_activity(user, tool_name, action, details=None, request=None):
     """
     Log user activity in the database.
     
+    The row is queued on the in-process activity buffer and written in
+    batches by a background flusher, so this never adds a write to the
+    request path.
+    
     Args:
         user: The user performing the action
         tool_name: Name of the AI tool being used
@@ -40,6 +46,7 @@ def log_user_activity(user, tool_name, action, details=None, request=None):
         request: The request object, to extract IP address
     """
     from core.models import UserActivity
+    from core.activity import record_activity
     
     ip_address = None
     if request:
@@ -49,10 +56,34 @@ def log_user_activity(user, tool_name, action, details=None, request=None):
         else:
             ip_address = request.META.get('REMOTE_ADDR')
     
-    UserActivity.objects.create(
-        user=user,
+    return record_activity(UserActivity(
+        user_id=user.pk,
         tool_name=tool_name,
         action=action,
         details=details,
         ip_address=ip_address
-    )
\ No newline at end of file
+    ))
+
+
+async def resolve_user(request):
+    """
+    Load request.user for an async view.
+
+    The user is loaded lazily from the session on first access, which is a
+    sync DB query; this does it in a worker thread (Django 4.2 has no
+    request.auser()). Afterwards request.user is safe to use in async code.
+    """
+    await sync_to_async(lambda: request.user.is_authenticated)()
+    return request.user
+
+
+def async_login_required(view):
+    """login_required for async views (Django 4.2's decorator only wraps sync views)."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await resolve_user(request)
+        if not user.is_authenticated:
+            from django.contrib.auth.views import redirect_to_login
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+    return wrapper
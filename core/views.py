@@ -1,6 +1,53 @@
+from datetime import timedelta
 from django.shortcuts import render
+from django.http import JsonResponse
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db.models import Avg, Count, Max
+from django.utils import timezone
+from .models import JobStageMetric
 
-# Create your views here.
+
+@staff_member_required
+def job_stage_metrics(request):
+    """
+    JSON stage timings for capacity planning.
+
+    ?job_type=subtitle|translation and ?days=N (default 30) filter the
+    per-stage aggregates; ?job_id=N returns that job's raw stage rows instead.
+    """
+    metrics = JobStageMetric.objects.all()
+    
+    job_type = request.GET.get('job_type')
+    if job_type:
+        metrics = metrics.filter(job_type=job_type)
+    
+    job_id = request.GET.get('job_id')
+    if job_id:
+        if not job_id.isdigit():
+            return JsonResponse({'error': 'job_id must be an integer'}, status=400)
+        rows = metrics.filter(job_id=int(job_id)).order_by('created_at', 'id').values(
+            'job_type', 'stage', 'calls', 'wall_time', 'cpu_time', 'peak_rss_mb',
+            'audio_duration', 'real_time_factor', 'success', 'created_at'
+        )
+        return JsonResponse({'job_id': int(job_id), 'stages': list(rows)})
+    
+    try:
+        days = int(request.GET.get('days', 30))
+    except ValueError:
+        return JsonResponse({'error': 'days must be an integer'}, status=400)
+    metrics = metrics.filter(created_at__gte=timezone.now() - timedelta(days=days))
+    
+    stages = metrics.values('job_type', 'stage').annotate(
+        rows=Count('id'),
+        jobs=Count('job_id', distinct=True),
+        avg_wall_time=Avg('wall_time'),
+        max_wall_time=Max('wall_time'),
+        avg_cpu_time=Avg('cpu_time'),
+        max_peak_rss_mb=Max('peak_rss_mb'),
+        avg_real_time_factor=Avg('real_time_factor'),
+    ).order_by('job_type', '-avg_wall_time')
+    
+    return JsonResponse({'days': days, 'stages': list(stages)})
 
 
 def register_models_and_tools(request):
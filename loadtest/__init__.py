@@ -0,0 +1,8 @@
+"""
+Offline load testing for the LLM pipelines and the shared cache.
+
+`manage.py llm_stub_server` runs an OpenAI/DeepSeek-compatible stub with
+configurable latency, errors and 429s; `manage.py llm_loadtest` replays
+Ask Me and program-ideation flows against it. `manage.py redis_stub_server`
+runs an in-memory Redis stand-in for the CACHE_URL cache tier.
+"""
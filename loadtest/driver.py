@@ -0,0 +1,228 @@
+"""
+Load driver that replays Ask Me and program-ideation flows.
+
+Ask Me goes through the real askme.tasks.process_llm_request pipeline (a
+coroutine per question on the background event loop) and is observed the
+way the browser does it, by polling Question.status. Program ideation calls run synchronously inside
+views, so each call is submitted to a pool of `workers` threads standing in
+for web worker threads.
+
+For every request the driver records
+    latency  - submission to result
+    service  - time spent in LLMService / the ideation call
+    queue    - latency minus service (waiting for a worker, DB, scheduling)
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from django.db import close_old_connections
+
+ASKME_PROMPTS = [
+    'Summarise the main themes of a documentary about Saudi coffee culture.',
+    'Suggest five interview questions for a young entrepreneur from Riyadh.',
+    'Write a short introduction for a travel programme episode in AlUla.',
+    'What are good segment ideas for a weekly youth sports magazine show?',
+]
+
+IDEATION_CONCEPTS = [
+    'A travel programme following families visiting heritage villages',
+    'A cooking competition built around regional dishes',
+    'A science show for teenagers filmed in university labs',
+]
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of `values` (0 <= q <= 1), or None if empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def is_provider_error(content):
+    """Provider failures fail the call (askme.resilience); only an empty reply gets through."""
+    return not content or not content.strip()
+
+
+class LoadResult:
+    def __init__(self, flow):
+        self.flow = flow
+        self._lock = threading.Lock()
+        self.samples = []
+        self.failures = {}
+        self.started_at = None
+        self.finished_at = None
+
+    def record(self, latency, service, ok=True, reason=None):
+        with self._lock:
+            self.samples.append((latency, service, ok))
+            if not ok:
+                self.failures[reason or 'error'] = self.failures.get(reason or 'error', 0) + 1
+
+    def summary(self):
+        duration = (self.finished_at or time.perf_counter()) - (self.started_at or time.perf_counter())
+        latencies = [sample[0] for sample in self.samples]
+        services = [sample[1] for sample in self.samples if sample[1] is not None]
+        queues = [max(sample[0] - sample[1], 0.0) for sample in self.samples if sample[1] is not None]
+        succeeded = sum(1 for sample in self.samples if sample[2])
+
+        return {
+            'flow': self.flow,
+            'requests': len(self.samples),
+            'succeeded': succeeded,
+            'failed': len(self.samples) - succeeded,
+            'failures': self.failures,
+            'duration': duration,
+            'throughput': succeeded / duration if duration > 0 else None,
+            'latency_p50': percentile(latencies, 0.50),
+            'latency_p95': percentile(latencies, 0.95),
+            'latency_max': max(latencies) if latencies else None,
+            'service_p50': percentile(services, 0.50),
+            'service_p95': percentile(services, 0.95),
+            'queue_p50': percentile(queues, 0.50),
+            'queue_p95': percentile(queues, 0.95),
+        }
+
+
+def get_loadtest_fixtures():
+    """Return the (user, LLMModel) used for load-test traffic, creating them if needed."""
+    from django.contrib.auth import get_user_model
+    from askme.models import LLMModel
+
+    user, created = get_user_model().objects.get_or_create(username='loadtest')
+    if created:
+        user.set_unusable_password()
+        user.save()
+
+    # Inactive so it never appears in the Ask Me model picker
+    model, _ = LLMModel.objects.get_or_create(
+        name='Load Test Stub',
+        provider='openai',
+        defaults={'model_id': 'gpt-4o-stub', 'is_active': False},
+    )
+    return user, model
+
+
+def run_askme(users, requests_per_user, think_time=0.0, poll_interval=0.2, timeout=300):
+    """Replay Ask Me conversations; returns (LoadResult, conversation ids)."""
+    from askme.models import Conversation, Question, Response
+    from askme.tasks import process_llm_request
+
+    user, llm_model = get_loadtest_fixtures()
+    result = LoadResult('askme')
+    conversation_ids = []
+    ids_lock = threading.Lock()
+
+    def virtual_user(index):
+        try:
+            conversation = Conversation.objects.create(
+                user=user, title=f'Load test {index}', llm_model=llm_model
+            )
+            with ids_lock:
+                conversation_ids.append(conversation.id)
+
+            for number in range(requests_per_user):
+                question = Question.objects.create(
+                    user=user,
+                    conversation=conversation,
+                    content=ASKME_PROMPTS[(index + number) % len(ASKME_PROMPTS)],
+                    llm_model=llm_model,
+                )
+                submitted = time.perf_counter()
+                process_llm_request(question.id)
+
+                status = 'pending'
+                while status not in ('completed', 'failed'):
+                    if time.perf_counter() - submitted > timeout:
+                        break
+                    time.sleep(poll_interval)
+                    status = Question.objects.filter(id=question.id).values_list('status', flat=True).first()
+                latency = time.perf_counter() - submitted
+
+                response = Response.objects.filter(question_id=question.id).values(
+                    'content', 'processing_time'
+                ).first()
+                if status == 'completed' and response and not is_provider_error(response['content']):
+                    result.record(latency, response['processing_time'])
+                elif status == 'completed' and response:
+                    result.record(latency, response['processing_time'], ok=False, reason='provider_error')
+                else:
+                    result.record(latency, None, ok=False, reason=status if status == 'failed' else 'timeout')
+
+                if think_time:
+                    time.sleep(think_time)
+        finally:
+            close_old_connections()
+
+    result.started_at = time.perf_counter()
+    threads = [threading.Thread(target=virtual_user, args=(index,)) for index in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result.finished_at = time.perf_counter()
+
+    return result, conversation_ids
+
+
+def run_ideation(users, requests_per_user, workers=4, think_time=0.0, language='en'):
+    """Replay program-ideation flows through `workers` simulated web threads."""
+    from program_ideation.models import ProgramIdea
+    from program_ideation.services import ProgramIdeationService
+
+    _, llm_model = get_loadtest_fixtures()
+    stub_model = SimpleNamespace(provider=llm_model.provider, model_id=llm_model.model_id, name=llm_model.name)
+    result = LoadResult('ideation')
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='loadtest-web')
+
+    def timed_call(func, *args):
+        started = time.perf_counter()
+        try:
+            content = func(*args)
+            return content, time.perf_counter() - started
+        finally:
+            close_old_connections()
+
+    def virtual_user(index):
+        service = ProgramIdeationService(language=language)
+        # Pin the stub model; the normal lookup prefers whatever real models are configured
+        service._get_default_model = lambda: stub_model
+        error_message = service._get_error_message()
+
+        concept = IDEATION_CONCEPTS[index % len(IDEATION_CONCEPTS)]
+        idea = ProgramIdea(language=language, initial_concept=concept, program_name=concept[:40])
+        steps = [
+            (service.process_initial_concept, concept),
+            (service.get_missing_data_proposals, idea),
+            (service.generate_program_format, idea),
+            (service.generate_discussion_questions, idea),
+        ]
+
+        for number in range(requests_per_user):
+            func, arg = steps[number % len(steps)]
+            submitted = time.perf_counter()
+            try:
+                content, service_time = pool.submit(timed_call, func, arg).result()
+            except Exception as e:
+                result.record(time.perf_counter() - submitted, None, ok=False, reason=type(e).__name__)
+                continue
+            latency = time.perf_counter() - submitted
+            if content == error_message or is_provider_error(content):
+                result.record(latency, service_time, ok=False, reason='provider_error')
+            else:
+                result.record(latency, service_time)
+            if think_time:
+                time.sleep(think_time)
+
+    result.started_at = time.perf_counter()
+    threads = [threading.Thread(target=virtual_user, args=(index,)) for index in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result.finished_at = time.perf_counter()
+    pool.shutdown()
+
+    return result
@@ -0,0 +1,315 @@
+"""
+In-memory stand-in for a Redis server.
+
+Speaks RESP2 over TCP and implements the commands Django's RedisCache and
+core.caching use (GET/SET with EX/PX/NX/XX, MGET/MSET, DEL, EXISTS,
+INCRBY, EXPIRE/PERSIST/TTL, FLUSHDB, MULTI/EXEC and the connection
+handshake), so the shared cache tier can be exercised across several
+processes without a real Redis. Expiry is checked lazily on access. Not for
+production use.
+"""
+import socketserver
+import threading
+import time
+
+
+class RedisError(Exception):
+    """Answered to the client as a RESP error."""
+
+
+class RedisStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.data = {}      # key -> bytes
+        self.expires = {}   # key -> monotonic deadline
+        self.counters = {'commands': 0, 'hits': 0, 'misses': 0}
+
+    def _alive(self, key):
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def _set_expiry(self, key, seconds):
+        if seconds is None:
+            self.expires.pop(key, None)
+        else:
+            self.expires[key] = time.monotonic() + seconds
+
+    def _run(self, name, args):
+        handler = getattr(self, f'cmd_{name.lower()}', None)
+        if handler is None:
+            return RedisError(f"ERR unknown command '{name}'")
+        self.counters['commands'] += 1
+        try:
+            return handler(*args)
+        except RedisError as e:
+            return e
+        except TypeError:
+            return RedisError(f"ERR wrong number of arguments for '{name.lower()}' command")
+
+    def execute(self, name, args):
+        """Run one command; errors are returned as RedisError, not raised."""
+        with self._lock:
+            return self._run(name, args)
+
+    def execute_transaction(self, commands):
+        """Run MULTI-queued commands atomically; returns the list of replies."""
+        with self._lock:
+            return [self._run(name, args) for name, args in commands]
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counters, keys=len(self.data))
+
+    # Connection
+
+    def cmd_ping(self, message=None):
+        return message if message is not None else SimpleString(b'PONG')
+
+    def cmd_echo(self, message):
+        return message
+
+    def cmd_select(self, db):
+        return OK
+
+    def cmd_client(self, *args):
+        return OK
+
+    def cmd_info(self, *args):
+        return b'# Server\r\nredis_version:7.0.0-stub\r\n'
+
+    def cmd_dbsize(self):
+        return sum(1 for key in list(self.data) if self._alive(key))
+
+    # Strings
+
+    def cmd_get(self, key):
+        if self._alive(key):
+            self.counters['hits'] += 1
+            return self.data[key]
+        self.counters['misses'] += 1
+        return None
+
+    def cmd_mget(self, *keys):
+        return [self.cmd_get(key) for key in keys]
+
+    def cmd_set(self, key, value, *options):
+        seconds = None
+        keep_ttl = False
+        condition = None
+        options = list(options)
+        while options:
+            option = options.pop(0).upper()
+            if option in (b'EX', b'PX'):
+                amount = _integer(options.pop(0))
+                if amount <= 0:
+                    raise RedisError("ERR invalid expire time in 'set' command")
+                seconds = amount if option == b'EX' else amount / 1000
+            elif option in (b'NX', b'XX'):
+                condition = option
+            elif option == b'KEEPTTL':
+                keep_ttl = True
+            else:
+                raise RedisError('ERR syntax error')
+
+        exists = self._alive(key)
+        if (condition == b'NX' and exists) or (condition == b'XX' and not exists):
+            return None
+        self.data[key] = value
+        if not keep_ttl:
+            self._set_expiry(key, seconds)
+        return OK
+
+    def cmd_mset(self, *pairs):
+        if not pairs or len(pairs) % 2:
+            raise RedisError("ERR wrong number of arguments for 'mset' command")
+        for index in range(0, len(pairs), 2):
+            self.data[pairs[index]] = pairs[index + 1]
+            self.expires.pop(pairs[index], None)
+        return OK
+
+    def cmd_incrby(self, key, amount):
+        value = _integer(self.data[key]) if self._alive(key) else 0
+        value += _integer(amount)
+        self.data[key] = str(value).encode()
+        return value
+
+    def cmd_incr(self, key):
+        return self.cmd_incrby(key, b'1')
+
+    def cmd_decrby(self, key, amount):
+        return self.cmd_incrby(key, str(-_integer(amount)).encode())
+
+    # Keys
+
+    def cmd_del(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                del self.data[key]
+                self.expires.pop(key, None)
+                removed += 1
+        return removed
+
+    cmd_unlink = cmd_del
+
+    def cmd_exists(self, *keys):
+        return sum(1 for key in keys if self._alive(key))
+
+    def cmd_expire(self, key, seconds):
+        if not self._alive(key):
+            return 0
+        seconds = _integer(seconds)
+        if seconds <= 0:
+            return self.cmd_del(key)
+        self._set_expiry(key, seconds)
+        return 1
+
+    def cmd_pexpire(self, key, milliseconds):
+        if not self._alive(key):
+            return 0
+        self._set_expiry(key, _integer(milliseconds) / 1000)
+        return 1
+
+    def cmd_persist(self, key):
+        if not self._alive(key) or key not in self.expires:
+            return 0
+        del self.expires[key]
+        return 1
+
+    def cmd_ttl(self, key):
+        if not self._alive(key):
+            return -2
+        if key not in self.expires:
+            return -1
+        return int(round(self.expires[key] - time.monotonic()))
+
+    def cmd_flushdb(self, *args):
+        self.data.clear()
+        self.expires.clear()
+        return OK
+
+    cmd_flushall = cmd_flushdb
+
+
+class SimpleString(bytes):
+    pass
+
+
+OK = SimpleString(b'OK')
+
+
+def _integer(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise RedisError('ERR value is not an integer or out of range')
+
+
+def encode_reply(value):
+    if isinstance(value, RedisError):
+        return b'-' + str(value).encode() + b'\r\n'
+    if value is None:
+        return b'$-1\r\n'
+    if isinstance(value, SimpleString):
+        return b'+' + bytes(value) + b'\r\n'
+    if isinstance(value, bool) or isinstance(value, int):
+        return b':%d\r\n' % value
+    if isinstance(value, bytes):
+        return b'$%d\r\n%s\r\n' % (len(value), value)
+    if isinstance(value, list):
+        return b'*%d\r\n' % len(value) + b''.join(encode_reply(item) for item in value)
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+class RedisStubHandler(socketserver.StreamRequestHandler):
+    # Set on the handler subclass by make_server()
+    store = None
+
+    def read_command(self):
+        """Read one command as a list of bytes; None at EOF."""
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            # Inline command, e.g. `PING` typed into nc
+            return line.split()
+        args = []
+        for _ in range(int(line[1:])):
+            header = self.rfile.readline()
+            if not header.startswith(b'$'):
+                raise RedisError('ERR Protocol error: expected bulk string')
+            length = int(header[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        queued = None
+        while True:
+            try:
+                command = self.read_command()
+            except (ConnectionError, ValueError):
+                return
+            except RedisError as e:
+                self.wfile.write(encode_reply(e))
+                return
+            if command is None:
+                return
+            if not command:
+                continue
+
+            name = command[0].decode('ascii', 'replace')
+            upper = name.upper()
+            if upper == 'QUIT':
+                self.wfile.write(encode_reply(OK))
+                return
+
+            # MULTI ... EXEC, which redis-py pipelines use by default
+            if upper == 'MULTI':
+                reply = RedisError('ERR MULTI calls can not be nested') if queued is not None else OK
+                queued = [] if queued is None else queued
+            elif upper == 'EXEC':
+                reply = RedisError('ERR EXEC without MULTI') if queued is None else self.store.execute_transaction(queued)
+                queued = None
+            elif upper == 'DISCARD':
+                reply = RedisError('ERR DISCARD without MULTI') if queued is None else OK
+                queued = None
+            elif queued is not None:
+                queued.append((name, command[1:]))
+                reply = SimpleString(b'QUEUED')
+            else:
+                reply = self.store.execute(name, command[1:])
+
+            try:
+                self.wfile.write(encode_reply(reply))
+            except (BrokenPipeError, ConnectionResetError):
+                return
+
+
+class RedisStubServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def make_server(host='127.0.0.1', port=0):
+    """
+    Create (but don't start) a stand-in server. Port 0 picks a free port.
+
+    Returns (server, store); call server.serve_forever() in a thread and
+    server.shutdown() when done.
+    """
+    store = RedisStore()
+    handler = type('ConfiguredRedisStubHandler', (RedisStubHandler,), {'store': store})
+    return RedisStubServer((host, port), handler), store
+
+
+def start_background_server(host='127.0.0.1', port=0):
+    """Start a stand-in server on a daemon thread; returns (server, store, url)."""
+    server, store = make_server(host, port)
+    thread = threading.Thread(target=server.serve_forever, name='redis-stub-server')
+    thread.daemon = True
+    thread.start()
+    url = f"redis://{server.server_address[0]}:{server.server_address[1]}/0"
+    return server, store, url
@@ -0,0 +1,286 @@
+"""
+OpenAI-compatible chat-completions stub.
+
+Speaks enough of POST /v1/chat/completions (plain and `"stream": true`
+server-sent events) for askme.services.LLMService, with a latency model of
+
+    time to first token  ~ latency distribution
+    generation           = completion_tokens / tokens_per_second
+
+plus injected 500s, 429s (with Retry-After) and a concurrency cap that
+answers 429 when exceeded, like a provider's rate limiter.
+GET /stats returns request counters.
+"""
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FILLER_WORDS = (
+    'program episode audience culture heritage story guest studio documentary '
+    'season format segment host region history family youth innovation'
+).split()
+
+
+def parse_distribution(spec):
+    """
+    Parse a latency spec into a zero-argument sampler returning seconds.
+
+    Supported: "fixed:S", "uniform:LOW,HIGH", "exp:MEAN",
+    "lognormal:MEDIAN,SIGMA" (heavy-tailed, the closest to real providers).
+    """
+    try:
+        kind, _, args = spec.partition(':')
+        values = [float(value) for value in args.split(',') if value]
+    except ValueError:
+        raise ValueError(f"Invalid latency spec: {spec}")
+
+    if kind == 'fixed' and len(values) == 1:
+        return lambda: values[0]
+    if kind == 'uniform' and len(values) == 2:
+        return lambda: random.uniform(values[0], values[1])
+    if kind == 'exp' and len(values) == 1:
+        return lambda: random.expovariate(1 / values[0]) if values[0] > 0 else 0.0
+    if kind == 'lognormal' and len(values) == 2:
+        mu = math.log(values[0])
+        return lambda: random.lognormvariate(mu, values[1])
+    raise ValueError(f"Invalid latency spec: {spec}")
+
+
+class StubConfig:
+    def __init__(self, latency='lognormal:0.8,0.5', tokens_per_second=60.0, completion_tokens=200,
+                 error_rate=0.0, rate_limit_rate=0.0, max_concurrent=None, retry_after=1):
+        self.latency_spec = latency
+        self.sample_latency = parse_distribution(latency)
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.max_concurrent = max_concurrent
+        self.retry_after = retry_after
+
+
+class StubStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.counters = {'requests': 0, 'completed': 0, 'streamed': 0, 'rate_limited': 0, 'errors': 0}
+
+    def increment(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def enter(self, limit):
+        """Count a request in flight; returns False if it would exceed `limit`."""
+        with self._lock:
+            if limit and self.in_flight >= limit:
+                return False
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            return True
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counters, in_flight=self.in_flight, peak_in_flight=self.peak_in_flight)
+
+
+def build_completion_text(messages, token_count):
+    """
+    Return a reply of roughly `token_count` tokens.
+
+    If the prompt asks for the ideation "===== Field =====" format, the reply
+    uses the same headings so downstream parsing sees realistic input.
+    """
+    prompt = messages[-1].get('content', '') if messages else ''
+    headings = []
+    for line in prompt.splitlines():
+        line = line.strip()
+        if line.startswith('=====') and line.endswith('=====') and len(line) > 10:
+            if line not in headings:
+                headings.append(line)
+
+    words = [random.choice(FILLER_WORDS) for _ in range(max(token_count, 1))]
+    if not headings:
+        return ' '.join(words)
+
+    per_suggestion = max(len(words) // (len(headings) * 3), 1)
+    lines = []
+    for heading in headings:
+        lines.append(heading)
+        for number in range(1, 4):
+            chunk = words[:per_suggestion]
+            words = words[per_suggestion:] or words
+            lines.append(f"Suggestion {number}: {' '.join(chunk)}")
+        lines.append('')
+    return '\n'.join(lines)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    # Set on the handler subclass by make_server()
+    config = None
+    stats = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message, error_type, headers=None):
+        self._send_json(status, {'error': {'message': message, 'type': error_type, 'code': status}}, headers)
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/stats':
+            self._send_json(200, self.stats.snapshot())
+        elif self.path.rstrip('/').endswith('/models'):
+            self._send_json(200, {'object': 'list', 'data': [{'id': 'stub-model', 'object': 'model'}]})
+        else:
+            self._send_error(404, 'Not found', 'invalid_request_error')
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_error(404, 'Not found', 'invalid_request_error')
+            return
+
+        try:
+            payload = json.loads(raw or b'{}')
+        except ValueError:
+            self._send_error(400, 'Invalid JSON body', 'invalid_request_error')
+            return
+
+        config = self.config
+        self.stats.increment('requests')
+
+        if random.random() < config.rate_limit_rate or not self.stats.enter(config.max_concurrent):
+            self.stats.increment('rate_limited')
+            self._send_error(429, 'Rate limit reached (stub)', 'rate_limit_error',
+                             {'Retry-After': str(config.retry_after)})
+            return
+
+        try:
+            time.sleep(config.sample_latency())
+
+            if random.random() < config.error_rate:
+                self.stats.increment('errors')
+                self._send_error(500, 'Internal server error (stub)', 'server_error')
+                return
+
+            messages = payload.get('messages', [])
+            completion_tokens = config.completion_tokens
+            for key in ('max_completion_tokens', 'max_tokens'):
+                if payload.get(key):
+                    completion_tokens = min(completion_tokens, int(payload[key]))
+            text = build_completion_text(messages, completion_tokens)
+            prompt_tokens = sum(len(m.get('content') or '') for m in messages) // 4
+            model = payload.get('model', 'stub-model')
+
+            if payload.get('stream'):
+                self._stream(model, text, prompt_tokens)
+                self.stats.increment('streamed')
+            else:
+                time.sleep(completion_tokens / config.tokens_per_second)
+                self._send_json(200, {
+                    'id': f"chatcmpl-{uuid.uuid4().hex[:24]}",
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': model,
+                    'choices': [{
+                        'index': 0,
+                        'message': {'role': 'assistant', 'content': text},
+                        'finish_reason': 'stop',
+                    }],
+                    'usage': {
+                        'prompt_tokens': prompt_tokens,
+                        'completion_tokens': completion_tokens,
+                        'total_tokens': prompt_tokens + completion_tokens,
+                    },
+                })
+            self.stats.increment('completed')
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.stats.leave()
+
+    def _stream(self, model, text, prompt_tokens):
+        """Send the reply as chat.completion.chunk server-sent events."""
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        def send_chunk(delta, finish_reason=None):
+            chunk = {
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': model,
+                'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+
+        send_chunk({'role': 'assistant', 'content': ''})
+        tokens = text.split(' ')
+        delay = 1 / self.config.tokens_per_second
+        for index, token in enumerate(tokens):
+            send_chunk({'content': token if index == 0 else ' ' + token})
+            time.sleep(delay)
+        send_chunk({}, finish_reason='stop')
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 resets connections when an async client
+    # opens hundreds at once
+    request_queue_size = 1024
+
+
+def make_server(host='127.0.0.1', port=0, config=None):
+    """
+    Create (but don't start) a stub server. Port 0 picks a free port.
+
+    Returns (server, stats); call server.serve_forever() in a thread and
+    server.shutdown() when done.
+    """
+    stats = StubStats()
+    handler = type('ConfiguredStubHandler', (StubHandler,), {
+        'config': config or StubConfig(),
+        'stats': stats,
+    })
+    server = StubHTTPServer((host, port), handler)
+    return server, stats
+
+
+def start_background_server(config=None, host='127.0.0.1', port=0):
+    """Start a stub server on a daemon thread; returns (server, stats, base_url)."""
+    server, stats = make_server(host, port, config)
+    thread = threading.Thread(target=server.serve_forever, name='llm-stub-server')
+    thread.daemon = True
+    thread.start()
+    base_url = f"http://{server.server_address[0]}:{server.server_address[1]}/v1"
+    return server, stats, base_url
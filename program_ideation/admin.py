@@ -65,14 +65,14 @@ class IdeaResponseAdmin(admin.ModelAdmin):
     list_display = ('id', 'get_program_name', 'response_type', 'content_preview', 'created_at')
     list_filter = ('response_type', 'created_at')
     search_fields = ('idea__program_name', 'content', 'idea__user__username')
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('structured', 'created_at', 'updated_at')
     
     fieldsets = (
         ('Response Information', {
             'fields': ('idea', 'response_type')
         }),
         ('Content', {
-            'fields': ('content',)
+            'fields': ('content', 'structured')
         }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
@@ -87,6 +87,12 @@ class IdeaResponseAdmin(admin.ModelAdmin):
         return "-"
     content_preview.short_description = "Content Preview"
     
+    def save_model(self, request, obj, form, change):
+        # Edited text is parsed again on save
+        if 'content' in form.changed_data:
+            obj.structured = None
+        super().save_model(request, obj, form, change)
+    
     def get_program_name(self, obj):
         """Get the program name associated with this response."""
         if obj.idea and obj.idea.program_name:
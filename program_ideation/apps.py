@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ProgramIdeationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'program_ideation'
+
+    def ready(self):
+        from . import signals  # noqa: F401
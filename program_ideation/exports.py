@@ -0,0 +1,388 @@
+"""
+PDF and Word exports of program ideas.
+
+An export is stored under PROGRAM_IDEATION_EXPORTS['PATH'], named by a
+hash of everything it shows: the idea's fields and the latest response of
+each type. A download works that hash out (two small queries) and serves
+the stored file when it exists, building it first only when the idea
+changed since. Saving an idea or one of its responses also schedules a
+rebuild on a daemon thread, once the idea has gone quiet for
+REBUILD_DELAY seconds, so the file is usually ready before anyone asks.
+"""
+import os
+import json
+import time
+import html
+import hashlib
+import logging
+import tempfile
+import threading
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+# Bump when the documents' layout changes, so stored exports are rebuilt
+EXPORT_VERSION = 1
+
+DEFAULT_EXPORT_SETTINGS = {
+    'PATH': 'exports/program_ideation',
+    'PREBUILD': True,          # Rebuild in the background when an idea changes
+    'FORMATS': ['pdf', 'word'],
+    'REBUILD_DELAY': 10.0,     # Seconds an idea must stay unchanged before rebuilding
+}
+
+FORMATS = {
+    'pdf': ('application/pdf', 'pdf'),
+    'word': ('application/vnd.openxmlformats-officedocument.wordprocessingml.document', 'docx'),
+}
+
+RESPONSE_TITLES = {
+    'discussion_questions': 'Discussion Questions',
+    'program_format': 'Program Format',
+    'program_script': 'Program Script',
+    'visual_materials': 'Visual Materials',
+    'suggestions': 'Suggestions',
+    'missing_data': 'Missing Data Proposals'
+}
+
+# Long sections are followed by a page break
+PAGE_BREAK_AFTER = ('program_format', 'program_script')
+
+# One build per file at a time in this process
+_build_locks = {}
+_build_locks_lock = threading.Lock()
+
+
+def get_export_settings():
+    """Return the export settings merged over the defaults."""
+    config = DEFAULT_EXPORT_SETTINGS.copy()
+    config.update(getattr(settings, 'PROGRAM_IDEATION_EXPORTS', {}))
+    return config
+
+
+class ExportSnapshot:
+    """What an export of one idea shows, and the hash that names the file."""
+
+    def __init__(self, idea, responses):
+        self.idea = idea
+        # Latest response of each type, in RESPONSE_TYPE_CHOICES order
+        self.responses = responses
+        user = idea.user
+        self.author = user.get_full_name() or user.username
+
+    def digest(self, export_format):
+        idea = self.idea
+        data = {
+            'version': EXPORT_VERSION,
+            'format': export_format,
+            'author': self.author,
+            'language': idea.language,
+            'created': idea.created_at.date().isoformat(),
+            'fields': [
+                idea.program_name, idea.general_idea, idea.target_audience, idea.program_objectives,
+                idea.program_type, idea.program_duration, idea.episode_count, idea.filming_location,
+            ],
+            'responses': [(response.response_type, response.content) for response in self.responses],
+        }
+        return hashlib.sha256(json.dumps(data, ensure_ascii=False).encode('utf-8')).hexdigest()[:32]
+
+    def path(self, export_format):
+        extension = FORMATS[export_format][1]
+        return f"{get_export_settings()['PATH']}/{self.idea.id}/{export_format}-{self.digest(export_format)}.{extension}"
+
+
+def get_snapshot(idea):
+    """ExportSnapshot for an idea: only the newest response of each type is loaded."""
+    from .models import IdeaResponse
+
+    latest = {}
+    rows = IdeaResponse.objects.filter(idea=idea).order_by('response_type', '-created_at')
+    for response_id, response_type in rows.values_list('id', 'response_type'):
+        latest.setdefault(response_type, response_id)
+
+    responses = {response.response_type: response for response in IdeaResponse.objects.filter(id__in=latest.values())}
+    ordered = [responses[response_type] for response_type, _ in IdeaResponse.RESPONSE_TYPE_CHOICES if response_type in responses]
+    return ExportSnapshot(idea, ordered)
+
+
+def build_pdf(snapshot, output):
+    """Write the idea as a PDF (ReportLab) to a binary file object."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+
+    idea = snapshot.idea
+    doc = SimpleDocTemplate(output, pagesize=A4, rightMargin=72, leftMargin=72,
+                            topMargin=72, bottomMargin=18)
+    elements = []
+    styles = getSampleStyleSheet()
+
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor=colors.HexColor('#1f2937'),
+        spaceAfter=30,
+        alignment=TA_CENTER
+    )
+    heading_style = ParagraphStyle(
+        'CustomHeading',
+        parent=styles['Heading2'],
+        fontSize=16,
+        textColor=colors.HexColor('#4b5563'),
+        spaceAfter=12,
+        spaceBefore=12
+    )
+
+    # Arabic text needs an Arabic font registered with pdfmetrics and set
+    # as fontName on these styles; none is bundled yet
+
+    elements.append(Paragraph(html.escape(idea.program_name or "Program Idea"), title_style))
+    elements.append(Spacer(1, 12))
+
+    metadata = [
+        ['Created Date:', idea.created_at.strftime('%B %d, %Y')],
+        ['Program Type:', idea.program_type or 'N/A'],
+        ['Duration:', idea.program_duration or 'N/A'],
+        ['Episodes:', idea.episode_count or 'N/A'],
+    ]
+    metadata_table = Table(metadata, colWidths=[2*inch, 4*inch])
+    metadata_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.grey),
+        ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ('GRID', (0, 0), (-1, -1), 1, colors.grey)
+    ]))
+    elements.append(metadata_table)
+    elements.append(Spacer(1, 20))
+
+    details = [
+        ('General Idea', idea.general_idea),
+        ('Target Audience', idea.target_audience),
+        ('Program Objectives', idea.program_objectives),
+        ('Filming Location', idea.filming_location),
+    ]
+    for label, content in details:
+        if content:
+            elements.append(Paragraph(f"<b>{label}:</b>", heading_style))
+            elements.append(Paragraph(html.escape(content), styles['BodyText']))
+            elements.append(Spacer(1, 12))
+
+    elements.append(PageBreak())
+
+    for response in snapshot.responses:
+        elements.append(Paragraph(response.get_response_type_display(), heading_style))
+        for line in response.content.split('\n')[:50]:  # Limit lines to prevent huge PDFs
+            if line.strip():
+                elements.append(Paragraph(html.escape(line), styles['BodyText']))
+        elements.append(Spacer(1, 20))
+        if response.response_type in PAGE_BREAK_AFTER:
+            elements.append(PageBreak())
+
+    doc.build(elements)
+
+
+def build_word(snapshot, output):
+    """Write the idea as a Word document (python-docx) to a binary file object."""
+    from docx import Document
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+    idea = snapshot.idea
+    document = Document()
+    document.core_properties.title = idea.program_name or "Program Idea"
+    document.core_properties.author = snapshot.author
+
+    title = document.add_heading(idea.program_name or "Program Idea", 0)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    metadata = document.add_paragraph()
+    metadata.add_run(f"Created: {idea.created_at.strftime('%B %d, %Y')}\n").bold = True
+    metadata.add_run(f"Type: {idea.program_type or 'N/A'} | ")
+    metadata.add_run(f"Duration: {idea.program_duration or 'N/A'} | ")
+    metadata.add_run(f"Episodes: {idea.episode_count or 'N/A'}")
+    metadata.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    document.add_paragraph()  # Empty line
+
+    details = [
+        ('General Idea', idea.general_idea),
+        ('Target Audience', idea.target_audience),
+        ('Program Objectives', idea.program_objectives),
+        ('Program Type', idea.program_type),
+        ('Program Duration', idea.program_duration),
+        ('Episode Count', idea.episode_count),
+        ('Filming Location', idea.filming_location),
+    ]
+    for label, content in details:
+        if content:
+            document.add_heading(label, level=2)
+            para = document.add_paragraph(content)
+            para.style = 'Normal'
+            document.add_paragraph()
+
+    document.add_page_break()
+
+    for response in snapshot.responses:
+        document.add_heading(RESPONSE_TITLES.get(response.response_type, response.get_response_type_display()), level=1)
+        for paragraph in response.content.split('\n'):
+            if paragraph.strip():
+                document.add_paragraph(paragraph)
+        if response.response_type in PAGE_BREAK_AFTER:
+            document.add_page_break()
+
+    document.save(output)
+
+
+BUILDERS = {
+    'pdf': build_pdf,
+    'word': build_word,
+}
+
+
+def _build_lock(path):
+    with _build_locks_lock:
+        return _build_locks.setdefault(path, threading.Lock())
+
+
+def get_export(snapshot, export_format):
+    """Storage path of the export for `snapshot`, building and storing it if it isn't there."""
+    path = snapshot.path(export_format)
+    if default_storage.exists(path):
+        return path
+
+    with _build_lock(path):
+        if default_storage.exists(path):
+            return path
+        started = time.time()
+        # Built into a temporary file, not memory; storage copies it in chunks
+        with tempfile.TemporaryFile() as output:
+            BUILDERS[export_format](snapshot, output)
+            output.seek(0)
+            saved = default_storage.save(path, File(output, name=os.path.basename(path)))
+        if saved != path:
+            # Another process stored the same export first
+            default_storage.delete(saved)
+        remove_stale_exports(snapshot.idea.id, export_format, keep=path)
+        logger.info(f"Built {export_format} export of idea {snapshot.idea.id} in {time.time() - started:.2f}s")
+
+    with _build_locks_lock:
+        _build_locks.pop(path, None)
+    return path
+
+
+def remove_stale_exports(idea_id, export_format, keep=None):
+    """Delete an idea's stored exports in one format, except `keep`."""
+    directory = f"{get_export_settings()['PATH']}/{idea_id}"
+    try:
+        _, files = default_storage.listdir(directory)
+    except (FileNotFoundError, NotImplementedError):
+        return
+    for name in files:
+        path = f"{directory}/{name}"
+        if name.startswith(f"{export_format}-") and path != keep:
+            default_storage.delete(path)
+
+
+def delete_exports(idea_id):
+    """Delete every stored export of an idea."""
+    for export_format in FORMATS:
+        remove_stale_exports(idea_id, export_format)
+
+
+def build_exports(idea_id):
+    """Bring every configured export of an idea up to date."""
+    from .models import ProgramIdea
+
+    idea = ProgramIdea.objects.select_related('user').filter(id=idea_id).first()
+    if idea is None:
+        return
+    snapshot = get_snapshot(idea)
+    for export_format in get_export_settings()['FORMATS']:
+        get_export(snapshot, export_format)
+
+
+class ExportBuilder:
+    """
+    Daemon thread that rebuilds exports of changed ideas.
+
+    schedule() only records the idea; each new change pushes its rebuild
+    back, so an idea saved at every ideation step is rendered once, after
+    the last step.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._due = {}
+        self._thread = None
+        self._pid = None
+
+    def schedule(self, idea_id, delay):
+        self._ensure_thread()
+        with self._changed:
+            self._due[idea_id] = time.monotonic() + delay
+            self._changed.notify()
+
+    def pending(self):
+        with self._lock:
+            return len(self._due)
+
+    def _ensure_thread(self):
+        """Start the builder thread lazily, once per process.
+
+        Gunicorn forks workers after --preload, and threads do not survive a
+        fork, so the pid is checked rather than just the thread handle.
+        """
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._due = {}
+            self._thread = threading.Thread(target=self._run, name='program-idea-exports')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _next_due(self):
+        """Wait for ideas whose delay has passed and take them off the schedule."""
+        with self._changed:
+            while True:
+                now = time.monotonic()
+                ready = [idea_id for idea_id, due in self._due.items() if due <= now]
+                if ready:
+                    for idea_id in ready:
+                        del self._due[idea_id]
+                    return ready
+                self._changed.wait(min(self._due.values()) - now if self._due else None)
+
+    def _run(self):
+        while True:
+            for idea_id in self._next_due():
+                try:
+                    close_old_connections()
+                    build_exports(idea_id)
+                except Exception as e:
+                    logger.error(f"Error building exports of idea {idea_id}: {str(e)}")
+                finally:
+                    close_old_connections()
+
+
+_builder = ExportBuilder()
+
+
+def schedule_exports(idea_id):
+    """Rebuild an idea's exports in the background once it stops changing."""
+    config = get_export_settings()
+    if config['PREBUILD'] and config['FORMATS']:
+        _builder.schedule(idea_id, config['REBUILD_DELAY'])
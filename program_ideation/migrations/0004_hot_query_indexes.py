@@ -0,0 +1,17 @@
+# Generated by Django 4.2.8 on 2026-10-19 02:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('program_ideation', '0003_ideanote_note_type_ideanote_priority_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='idearesponse',
+            index=models.Index(fields=['idea', 'response_type', '-created_at'], name='program_ide_idea_id_83ba6c_idx'),
+        ),
+    ]
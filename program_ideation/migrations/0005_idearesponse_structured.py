@@ -0,0 +1,42 @@
+# Generated by Django 4.2.8 on 2026-10-19 03:19
+
+from django.db import migrations, models
+
+# Must match IdeaResponse.STRUCTURED_TYPES at the time of this migration
+STRUCTURED_TYPES = {'suggestions': 'detect', 'missing_data': 'general'}
+
+
+def parse_existing_responses(apps, schema_editor):
+    from program_ideation.parsing import parse_suggestions
+
+    IdeaResponse = apps.get_model('program_ideation', 'IdeaResponse')
+    responses = IdeaResponse.objects.filter(response_type__in=STRUCTURED_TYPES).select_related('idea')
+    batch = []
+    for response in responses.iterator(chunk_size=500):
+        response.structured = parse_suggestions(
+            response.content,
+            language=response.idea.language,
+            unstructured=STRUCTURED_TYPES[response.response_type],
+        )
+        batch.append(response)
+        if len(batch) >= 500:
+            IdeaResponse.objects.bulk_update(batch, ['structured'])
+            batch = []
+    if batch:
+        IdeaResponse.objects.bulk_update(batch, ['structured'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('program_ideation', '0004_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='idearesponse',
+            name='structured',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.RunPython(parse_existing_responses, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.8 on 2026-10-19 03:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('program_ideation', '0005_idearesponse_structured'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ideanote',
+            name='processing_time',
+            field=models.FloatField(blank=True, help_text='Processing time in seconds', null=True),
+        ),
+    ]
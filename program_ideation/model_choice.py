@@ -0,0 +1,119 @@
+"""
+Which LLMModel program ideation sends its prompts to.
+
+The choice is worked out from one query over LLMModel and kept per
+process for PROGRAM_IDEATION_MODEL_CACHE_TIMEOUT seconds; post_save and
+post_delete on LLMModel drop it in the writing process, other processes
+pick the change up when their copy expires. PROGRAM_IDEATION_MODEL_PREFERENCES
+lists the models to try, best first.
+"""
+import time
+import logging
+import threading
+from types import SimpleNamespace
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_PREFERENCES = [
+    {'provider': 'openai', 'model_prefix': 'gpt-5'},
+    {'provider': 'openai', 'model_prefix': 'gpt-4'},
+    {'provider': 'openai'},
+    {'provider': 'deepseek'},
+]
+DEFAULT_CACHE_TIMEOUT = 60
+
+# Per-process choice: (expires_at, ModelChoice)
+_local_choice = None
+_local_choice_lock = threading.Lock()
+
+
+class ModelChoice:
+    """The chosen model and why it was chosen."""
+
+    def __init__(self, model, reason):
+        self.model = model
+        self.reason = reason
+        self.resolved_at = time.time()
+
+    def as_dict(self):
+        return {
+            'name': self.model.name,
+            'provider': self.model.provider,
+            'model_id': self.model.model_id,
+            'reason': self.reason,
+            'resolved_at': self.resolved_at,
+        }
+
+
+def get_model_preferences():
+    return getattr(settings, 'PROGRAM_IDEATION_MODEL_PREFERENCES', DEFAULT_MODEL_PREFERENCES)
+
+
+def matches(model, preference):
+    if model.provider.lower() != preference['provider'].lower():
+        return False
+    return model.model_id.startswith(preference.get('model_prefix', ''))
+
+
+def resolve_model_choice():
+    """Pick a model from the database, following the configured preferences."""
+    from askme.models import LLMModel
+
+    models = list(LLMModel.objects.order_by('name'))
+    active = [model for model in models if model.is_active]
+
+    for preference in get_model_preferences():
+        for model in active:
+            if matches(model, preference):
+                return ModelChoice(model, f"preference {preference}")
+    if active:
+        return ModelChoice(active[0], 'first active model')
+    if models:
+        logger.warning(f"Program ideation has no active models, using inactive {models[0]}")
+        return ModelChoice(models[0], 'no active models')
+    logger.error("Program ideation found no LLM models, using the mock provider")
+    return ModelChoice(SimpleNamespace(provider='Mock', model_id='mock-model', name='Emergency Mock Model'), 'no models')
+
+
+def get_cached_model_choice():
+    """The per-process choice if it hasn't expired, else None (no database access)."""
+    local = _local_choice
+    if local is not None and local[0] > time.monotonic():
+        return local[1]
+    return None
+
+
+def get_model_choice():
+    """The ModelChoice for program ideation, resolved at most once per cache timeout."""
+    global _local_choice
+
+    choice = get_cached_model_choice()
+    if choice is not None:
+        return choice
+
+    previous = _local_choice[1] if _local_choice else None
+    try:
+        choice = resolve_model_choice()
+    except Exception as e:
+        # Not cached, so the next call tries the database again
+        logger.error(f"Error choosing program ideation model: {str(e)}")
+        return ModelChoice(SimpleNamespace(provider='Mock', model_id='mock-model', name='Error Fallback Mock Model'), 'error')
+
+    if previous is None or (previous.model.provider, previous.model.model_id) != (choice.model.provider, choice.model.model_id):
+        logger.info(f"Program ideation using model: {choice.model.name} ({choice.model.provider}/{choice.model.model_id}), {choice.reason}")
+
+    timeout = getattr(settings, 'PROGRAM_IDEATION_MODEL_CACHE_TIMEOUT', DEFAULT_CACHE_TIMEOUT)
+    with _local_choice_lock:
+        _local_choice = (time.monotonic() + timeout, choice)
+    return choice
+
+
+def invalidate_model_choice():
+    """Forget the chosen model in this process; the next call resolves it again."""
+    global _local_choice
+
+    with _local_choice_lock:
+        if _local_choice is not None:
+            # Keep the old choice for change logging, but expired
+            _local_choice = (0.0, _local_choice[1])
@@ -1,6 +1,7 @@
 from django.db import models
 from django.conf import settings
 from core.models import BaseModel
+from .parsing import PARSER_VERSION, parse_suggestions
 
 
 class ProgramIdea(BaseModel):
@@ -73,16 +74,56 @@ class IdeaResponse(BaseModel):
         ('visual_materials', 'Visual Materials'),
     ]
     
+    # Replies in the "===== field =====" format, and how to read ones that aren't
+    STRUCTURED_TYPES = {'suggestions': 'detect', 'missing_data': 'general'}
+    
     idea = models.ForeignKey(ProgramIdea, on_delete=models.CASCADE, related_name='responses')
     response_type = models.CharField(max_length=50, choices=RESPONSE_TYPE_CHOICES)
     content = models.TextField()
+    # Field -> suggestions sections parsed from content (see program_ideation.parsing)
+    structured = models.JSONField(null=True, blank=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Latest response of a type for an idea
+            models.Index(fields=['idea', 'response_type', '-created_at']),
+        ]
     
     def __str__(self):
         return f"{self.get_response_type_display()} for {self.idea}"
     
+    def save(self, *args, **kwargs):
+        # Parse once here rather than in the browser on every page view
+        if self.response_type in self.STRUCTURED_TYPES and not self.is_parsed():
+            self.parse_content()
+        super().save(*args, **kwargs)
+    
+    def is_parsed(self):
+        return bool(self.structured) and self.structured.get('version') == PARSER_VERSION
+    
+    def parse_content(self):
+        self.structured = parse_suggestions(
+            self.content,
+            language=self.idea.language,
+            unstructured=self.STRUCTURED_TYPES[self.response_type],
+        )
+        return self.structured
+    
+    @property
+    def sections(self):
+        """[{'field', 'label', 'suggestions'}, ...] for suggestion-type responses."""
+        if self.response_type not in self.STRUCTURED_TYPES:
+            return []
+        if not self.is_parsed():
+            self.parse_content()
+        return self.structured['sections']
+    
+    @property
+    def suggestion_map(self):
+        """{field: [suggestion, ...]} for the ProgramIdea fields suggestions were made for."""
+        return {section['field']: section['suggestions'] for section in self.sections if section['field']}
+    
 
 
 # Add this to program_ideation/models.py
@@ -133,6 +174,7 @@ class IdeaNote(BaseModel):
     response_content = models.TextField(blank=True, null=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     is_applied = models.BooleanField(default=False, help_text="Whether the suggestion has been applied")
+    processing_time = models.FloatField(null=True, blank=True, help_text="Processing time in seconds")
     
     class Meta:
         ordering = ['-created_at']
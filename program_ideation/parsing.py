@@ -0,0 +1,172 @@
+"""
+Parse LLM suggestion replies into field -> suggestions maps.
+
+Suggestion and missing-data prompts ask for
+
+    ===== اسم البرنامج =====
+    اقتراح 1: ...
+    اقتراح 2: ...
+
+blocks. parse_suggestions() turns that text into sections that name one
+ProgramIdea field each, so pages render and apply suggestions without
+re-parsing the raw reply in the browser. Replies that ignore the format
+are recovered line by line as well as the old page scripts did.
+"""
+import re
+
+# Bump when the output changes; stored rows with an older version are re-parsed
+PARSER_VERSION = 1
+
+IDEA_FIELDS = [
+    'program_name', 'general_idea', 'target_audience', 'program_objectives',
+    'program_type', 'program_duration', 'episode_count', 'filming_location',
+]
+
+FIELD_LABELS = {
+    'ar': {
+        'program_name': 'اسم البرنامج',
+        'general_idea': 'الفكرة العامة',
+        'target_audience': 'الجمهور المستهدف',
+        'program_objectives': 'أهداف البرنامج',
+        'program_type': 'نوع البرنامج',
+        'program_duration': 'مدة البرنامج',
+        'episode_count': 'عدد الحلقات',
+        'filming_location': 'موقع التصوير',
+    },
+    'en': {
+        'program_name': 'Program Name',
+        'general_idea': 'General Idea',
+        'target_audience': 'Target Audience',
+        'program_objectives': 'Program Objectives',
+        'program_type': 'Program Type',
+        'program_duration': 'Program Duration',
+        'episode_count': 'Episode Count',
+        'filming_location': 'Filming Location',
+    },
+}
+
+GENERAL_LABELS = {'ar': 'اقتراحات عامة', 'en': 'General Suggestions'}
+
+# Section headings the prompts use, in both languages
+HEADING_FIELDS = {
+    'موقع أو أسلوب التصوير': 'filming_location',
+    **{label: field for labels in FIELD_LABELS.values() for field, label in labels.items()},
+}
+
+# Keywords that identify a field from an unexpected heading, checked in order
+HEADING_KEYWORDS = [
+    ('program_name', ('name', 'اسم', 'title', 'عنوان')),
+    ('general_idea', ('idea', 'فكرة', 'concept')),
+    ('target_audience', ('audience', 'جمهور', 'demographic')),
+    ('program_objectives', ('objective', 'أهداف', 'goal')),
+    ('program_type', ('type', 'نوع', 'format')),
+    ('program_duration', ('duration', 'مدة', 'length')),
+    ('episode_count', ('episode', 'حلقات', 'count')),
+    ('filming_location', ('location', 'موقع', 'filming')),
+]
+
+SECTION_RE = re.compile(r'={3,}\s*([^=]+?)\s*={3,}(.*?)(?=={3,}|\Z)', re.S)
+SUGGESTION_RES = [
+    re.compile(r'^(?:اقتراح|Suggestion)\s*\d+\s*:\s*(.+)', re.I),
+    re.compile(r'^\d+\.\s*(.+)'),
+    re.compile(r'^[-•*]\s*(.+)'),
+    re.compile(r'\*\*(?:اقتراح|Suggestion)\s*\d+\*\*\s*:\s*(.+)', re.I),
+]
+DURATION_RE = re.compile(r'\d+\s*(دقيقة|minutes?|mins?)', re.I)
+EPISODES_RE = re.compile(r'\d+\s*(حلقة|episodes?)', re.I)
+
+
+def field_for_heading(heading, body=''):
+    """The ProgramIdea field a section heading refers to."""
+    if heading in HEADING_FIELDS:
+        return HEADING_FIELDS[heading]
+    heading = heading.lower()
+    for field, keywords in HEADING_KEYWORDS:
+        if any(keyword in heading for keyword in keywords):
+            return field
+        if field == 'general_idea' and len(body) > 200:
+            return field
+    return 'program_name'
+
+
+def field_for_line(line):
+    """Best guess at the field for one line of an unstructured reply."""
+    if DURATION_RE.search(line):
+        return 'program_duration'
+    if EPISODES_RE.search(line):
+        return 'episode_count'
+    if len(line) > 150:
+        return 'general_idea'
+    return 'program_name'
+
+
+def split_suggestions(body):
+    """Numbered, bulleted or "Suggestion N:" items; continuation lines join the item above."""
+    suggestions = []
+    current = ''
+    for line in body.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        for pattern in SUGGESTION_RES:
+            match = pattern.search(line)
+            if match:
+                if current:
+                    suggestions.append(current)
+                current = match.group(1).strip()
+                break
+        else:
+            current = f"{current} {line}" if current else line
+    if current:
+        suggestions.append(current)
+    return suggestions
+
+
+def clean_suggestions(suggestions):
+    """Drop blanks and repeats; strip markdown emphasis the prompts ask the model to avoid."""
+    cleaned = []
+    for text in suggestions:
+        text = re.sub(r'\s+', ' ', text.replace('**', '')).strip(' "“”')
+        if text and text not in cleaned:
+            cleaned.append(text)
+    return cleaned
+
+
+def parse_suggestions(content, language='ar', unstructured='detect'):
+    """
+    Parse a suggestions reply into {'version', 'sections'}.
+
+    Each section is {'field', 'label', 'suggestions'}, with at most one
+    section per field, in reply order. A reply without ===== headings is
+    split by guessing each line's field (unstructured='detect'), or kept
+    as one 'general' section whose field is None (unstructured='general').
+    """
+    labels = FIELD_LABELS.get(language, FIELD_LABELS['en'])
+    sections = {}
+
+    for match in SECTION_RE.finditer(content or ''):
+        heading, body = match.group(1).strip(), match.group(2).strip()
+        if heading and body:
+            field = field_for_heading(heading, body)
+            sections.setdefault(field, []).extend(split_suggestions(body))
+
+    if not sections and content and content.strip():
+        lines = [line.strip() for line in content.splitlines() if line.strip()]
+        if unstructured == 'detect':
+            for line in lines:
+                sections.setdefault(field_for_line(line), []).append(line)
+        else:
+            sections[None] = split_suggestions('\n'.join(lines)) or [content.strip()]
+
+    return {
+        'version': PARSER_VERSION,
+        'sections': [
+            {
+                'field': field,
+                'label': labels[field] if field else GENERAL_LABELS.get(language, GENERAL_LABELS['en']),
+                'suggestions': suggestions,
+            }
+            for field, suggestions in ((field, clean_suggestions(items)) for field, items in sections.items())
+            if suggestions
+        ],
+    }
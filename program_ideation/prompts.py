@@ -0,0 +1,401 @@
+"""
+Prompt templates for program ideation.
+
+Each template has a system part, which is fixed text (the shared
+consultant preamble, then the task's instructions and output format),
+and a user part, which holds the idea's data. The system message goes
+first and is byte-identical on every call for a template and language,
+so provider prompt caching (OpenAI, DeepSeek, Anthropic) can reuse it.
+Every template also starts with the same preamble, so that much is
+shared between templates too.
+
+Templates are compiled for every language at import; render() then only
+fills in the user part.
+"""
+from string import Formatter
+
+LANGUAGES = ('ar', 'en')
+
+PREAMBLE = {
+    'ar': 'أنت مستشار إبداعي لهيئة الإذاعة والتلفزيون السعودية. ملاحظة رجاءا عدم كتابة علامة * و علامة التنصيص "". لا تقدم اي اقتراح متعلق بالموسيقى !!.',
+    'en': 'You are a creative consultant for the Saudi Broadcasting Authority.',
+}
+
+FORMAT_RULE = {
+    'ar': 'استخدم التنسيق بالضبط كما هو موضح، مع الحفاظ على العناوين المميزة بخمسة علامات مساواة (=====) قبل وبعد اسم الحقل.',
+    'en': 'Use the exact formatting as shown, keeping the headings marked with five equals signs (=====) before and after the field name.',
+}
+
+FIVE_IDEAS_FORMAT = {
+    'ar': """===== اسم البرنامج =====
+اقتراح 1: [عنوان البرنامج المقترح الأول]
+اقتراح 2: [عنوان البرنامج المقترح الثاني]
+اقتراح 3: [عنوان البرنامج المقترح الثالث]
+اقتراح 4: [عنوان البرنامج المقترح الرابع]
+اقتراح 5: [عنوان البرنامج المقترح الخامس]
+
+===== الفكرة العامة =====
+اقتراح 1: [وصف موجز للفكرة الأولى]
+اقتراح 2: [وصف موجز للفكرة الثانية]
+اقتراح 3: [وصف موجز للفكرة الثالثة]
+اقتراح 4: [وصف موجز للفكرة الرابعة]
+اقتراح 5: [وصف موجز للفكرة الخامسة]
+
+===== الجمهور المستهدف =====
+اقتراح 1: [وصف للجمهور المستهدف للفكرة الأولى]
+اقتراح 2: [وصف للجمهور المستهدف للفكرة الثانية]
+اقتراح 3: [وصف للجمهور المستهدف للفكرة الثالثة]
+اقتراح 4: [وصف للجمهور المستهدف للفكرة الرابعة]
+اقتراح 5: [وصف للجمهور المستهدف للفكرة الخامسة]""",
+    'en': """===== Program Name =====
+Suggestion 1: [first proposed program title]
+Suggestion 2: [second proposed program title]
+Suggestion 3: [third proposed program title]
+Suggestion 4: [fourth proposed program title]
+Suggestion 5: [fifth proposed program title]
+
+===== General Idea =====
+Suggestion 1: [brief description of the first idea]
+Suggestion 2: [brief description of the second idea]
+Suggestion 3: [brief description of the third idea]
+Suggestion 4: [brief description of the fourth idea]
+Suggestion 5: [brief description of the fifth idea]
+
+===== Target Audience =====
+Suggestion 1: [description of target audience for the first idea]
+Suggestion 2: [description of target audience for the second idea]
+Suggestion 3: [description of target audience for the third idea]
+Suggestion 4: [description of target audience for the fourth idea]
+Suggestion 5: [description of target audience for the fifth idea]""",
+}
+
+FIELD_SUGGESTIONS_FORMAT = {
+    'ar': """===== [اسم الحقل] =====
+اقتراح 1: [النص المقترح للحقل]
+اقتراح 2: [النص المقترح للحقل]
+اقتراح 3: [النص المقترح للحقل]""",
+    'en': """===== [Field Name] =====
+Suggestion 1: [suggested text for the field]
+Suggestion 2: [suggested text for the field]
+Suggestion 3: [suggested text for the field]""",
+}
+
+
+class CompiledPrompt:
+    """One template in one language: fixed system text and a user format string."""
+
+    def __init__(self, name, language, system, user):
+        self.name = name
+        self.language = language
+        self.system = system
+        self.user = user
+        self.fields = {field for _, field, _, _ in Formatter().parse(user) if field}
+
+    def render(self, **context):
+        missing = self.fields - set(context)
+        if missing:
+            raise KeyError(f"Prompt '{self.name}' needs {', '.join(sorted(missing))}")
+        return RenderedPrompt(self.system, self.user.format(**context))
+
+
+class RenderedPrompt:
+    """A system message shared by every call and the call's own user message."""
+
+    def __init__(self, system, user):
+        self.system = system
+        self.user = user
+
+
+class PromptTemplate:
+    """A prompt's task instructions (fixed) and context (per call), per language."""
+
+    def __init__(self, name, instructions, context):
+        self.name = name
+        self.compiled = {}
+        for language in LANGUAGES:
+            system = f"{PREAMBLE[language]}\n\n{instructions[language].strip()}"
+            self.compiled[language] = CompiledPrompt(name, language, system, context[language].strip())
+
+    def render(self, language, **context):
+        return self.compiled.get(language, self.compiled['en']).render(**context)
+
+
+_registry = {}
+
+
+def register(name, instructions, context):
+    _registry[name] = PromptTemplate(name, instructions, context)
+    return _registry[name]
+
+
+def render_prompt(name, language, **context):
+    """RenderedPrompt for a registered template."""
+    return _registry[name].render(language, **context)
+
+
+register(
+    'idea_suggestions',
+    instructions={
+        'ar': f"""قدم اقتراحاتك بالتنسيق التالي:
+
+{FIVE_IDEAS_FORMAT['ar']}
+
+{FORMAT_RULE['ar']}""",
+        'en': f"""Provide your suggestions in the following format:
+
+{FIVE_IDEAS_FORMAT['en']}
+
+{FORMAT_RULE['en']}""",
+    },
+    context={
+        'ar': "اقترح 5 أفكار مبتكرة لبرامج جديدة تناسب المملكة العربية السعودية، وتتماشى مع السياق الإعلامي الحالي.",
+        'en': "Suggest 5 innovative ideas for new programs suitable for the Kingdom of Saudi Arabia, in line with the current media context.",
+    },
+)
+
+register(
+    'initial_concept',
+    instructions={
+        'ar': f"""بناءً على التصور الأولي الذي يقدمه المستخدم، اقترح 5 عناوين مختلفة ونطاق للفكرة.
+
+قدم اقتراحاتك بالتنسيق التالي:
+
+{FIVE_IDEAS_FORMAT['ar']}
+
+{FORMAT_RULE['ar']}""",
+        'en': f"""Based on the initial concept the user gives, suggest 5 different titles and scope for the idea.
+
+Provide your suggestions in the following format:
+
+{FIVE_IDEAS_FORMAT['en']}
+
+{FORMAT_RULE['en']}""",
+    },
+    context={
+        'ar': "التصور الأولي: {concept}",
+        'en': "Initial concept: {concept}",
+    },
+)
+
+register(
+    'missing_data',
+    instructions={
+        'ar': f"""بناءً على المعلومات المتوفرة عن فكرة البرنامج، اقترح بيانات للحقول الناقصة فقط.
+
+قم بتقديم اقتراحات لكل حقل ناقص بالتنسيق التالي:
+
+===== [اسم الحقل الناقص] =====
+اقتراح 1: [النص المقترح للحقل]
+اقتراح 2: [النص المقترح للحقل]
+
+قدم اقتراحين مختلفين على الأقل لكل حقل ناقص، مع مراعاة انسجامها مع البيانات المتوفرة.
+
+{FORMAT_RULE['ar']}""",
+        'en': f"""Based on the available information about the program idea, suggest data for the missing fields only.
+
+Provide suggestions for each missing field in the following format:
+
+===== [Missing Field Name] =====
+Suggestion 1: [suggested text for the field]
+Suggestion 2: [suggested text for the field]
+
+Provide at least two different suggestions for each missing field, ensuring consistency with the available data.
+
+{FORMAT_RULE['en']}""",
+    },
+    context={
+        'ar': """البيانات المتوفرة:
+{available_data}
+
+الحقول الناقصة: {missing_fields}""",
+        'en': """Available data:
+{available_data}
+
+Missing fields: {missing_fields}""",
+    },
+)
+
+register(
+    'discussion_questions',
+    instructions={
+        'ar': """بناءً على معلومات البرنامج المقترح، قم بإعداد أسئلة نقاش لورشة عمل لمناقشة وتطوير الفكرة.
+
+قم بإعداد 10 أسئلة نقاش مهمة تساعد في:
+1. استكشاف جوانب الفكرة بعمق
+2. تحديد التحديات المحتملة وكيفية التغلب عليها
+3. تطوير عناصر البرنامج
+4. ضمان جاذبية البرنامج للجمهور المستهدف
+
+قدم الأسئلة في تنسيق واضح ومنظم، مع تقسيمها إلى محاور مناسبة.""",
+        'en': """Based on the proposed program information, prepare discussion questions for a workshop to discuss and develop the idea.
+
+Prepare 10 important discussion questions that help:
+1. Explore aspects of the idea in depth
+2. Identify potential challenges and how to overcome them
+3. Develop program elements
+4. Ensure the program's appeal to the target audience
+
+Present the questions in a clear, organized format, dividing them into appropriate axes.""",
+    },
+    context={
+        'ar': "معلومات البرنامج:\n{idea_data}",
+        'en': "Program information:\n{idea_data}",
+    },
+)
+
+register(
+    'program_format',
+    instructions={
+        'ar': """بناءً على معلومات البرنامج، قم بإعداد تنسيق تفصيلي للبرنامج.
+
+قم بإعداد تنسيق البرنامج متضمناً:
+1. هيكل البرنامج (فقرات/أقسام)
+2. تفاصيل كل فقرة وهدفها
+3. التسلسل المنطقي للفقرات
+4. التوقيت المقترح لكل فقرة
+5. العناصر البصرية الرئيسية
+6. أسلوب التقديم المقترح
+
+قدم التنسيق بشكل تفصيلي ومنظم.""",
+        'en': """Based on the program information, prepare a detailed format for the program.
+
+Prepare the program format including:
+1. Program structure (segments/sections)
+2. Details of each segment and its purpose
+3. Logical sequence of segments
+4. Proposed timing for each segment
+5. Key visual elements
+6. Proposed presentation style
+
+Present the format in a detailed and organized manner.""",
+    },
+    context={
+        'ar': "معلومات البرنامج:\n{idea_data}",
+        'en': "Program information:\n{idea_data}",
+    },
+)
+
+register(
+    'program_script',
+    instructions={
+        'ar': """بناءً على معلومات البرنامج، قم بإعداد نموذج لنص حلقة من البرنامج.
+
+قم بإعداد نص البرنامج متضمناً:
+1. مقدمة البرنامج
+2. نصوص المقدم/المقدمين
+3. تسلسل الفقرات
+4. أمثلة للحوارات المحتملة
+5. الانتقالات بين الفقرات
+6. خاتمة البرنامج
+
+اكتب النص بشكل احترافي يناسب البث التلفزيوني، مع مراعاة طبيعة البرنامج وجمهوره المستهدف.""",
+        'en': """Based on the program information, prepare a model script for an episode of the program.
+
+Prepare the program script including:
+1. Program introduction
+2. Presenter(s) scripts
+3. Sequence of segments
+4. Examples of potential dialogues
+5. Transitions between segments
+6. Program conclusion
+
+Write the script professionally, suitable for television broadcasting, taking into account the nature of the program and its target audience.""",
+    },
+    context={
+        'ar': "معلومات البرنامج:\n{idea_data}",
+        'en': "Program information:\n{idea_data}",
+    },
+)
+
+register(
+    'visual_proposals',
+    instructions={
+        'ar': """بناءً على معلومات البرنامج، قم بتقديم مقترحات للمواد البصرية للبرنامج.
+
+قدم مقترحات مفصلة للعناصر البصرية التالية:
+1. شعار البرنامج (وصف التصميم، الألوان، العناصر)
+2. تصميم الاستوديو/موقع التصوير (الديكور، الإضاءة، الأثاث)
+3. الجرافيكس (أسلوب، ألوان، عناصر متحركة)
+4. الفواصل والمقدمة (وصف أسلوب التصوير،الأسلوب)
+5. العناصر البصرية الفريدة التي تميز البرنامج
+
+قدم المقترحات بشكل تفصيلي مع مراعاة طبيعة البرنامج وجمهوره المستهدف.""",
+        'en': """Based on the program information, provide proposals for the visual materials of the program.
+
+Provide detailed proposals for the following visual elements:
+1. Program logo (design description, colors, elements)
+2. Studio/filming location design (decor, lighting, furniture)
+3. Graphics (style, colors, moving elements)
+4. Breaks and introduction (description of filming style, style)
+5. Unique visual elements that distinguish the program
+
+Present the proposals in detail, taking into account the nature of the program and its target audience.""",
+    },
+    context={
+        'ar': "معلومات البرنامج:\n{idea_data}",
+        'en': "Program information:\n{idea_data}",
+    },
+)
+
+register(
+    'idea_note',
+    instructions={
+        'ar': f"""المستخدم يرغب في تحسين محتوى حقل في فكرة برنامج. قدم اقتراحات لتحسين هذا الحقل بناءً على ملاحظة المستخدم بالتنسيق التالي، باستخدام اسم الحقل كعنوان:
+
+{FIELD_SUGGESTIONS_FORMAT['ar']}
+
+كل اقتراح يجب أن يكون مستقلاً بذاته ويمكن استخدامه مباشرة كمحتوى جديد للحقل.
+{FORMAT_RULE['ar']}""",
+        'en': f"""The user wants to enhance the content of a field in a program idea. Provide suggestions to enhance this field based on the user's note using the following format, with the field name as the heading:
+
+{FIELD_SUGGESTIONS_FORMAT['en']}
+
+Each suggestion should be self-contained and can be used directly as new content for the field.
+{FORMAT_RULE['en']}""",
+    },
+    context={
+        'ar': """الحقل: {field_label}
+
+المحتوى الحالي: {field_content}
+
+ملاحظة المستخدم: {note_content}""",
+        'en': """Field: {field_label}
+
+Current content: {field_content}
+
+User's note: {note_content}""",
+    },
+)
+
+register(
+    'multi_field_note',
+    instructions={
+        'ar': f"""المستخدم لديه ملاحظة على عدة حقول من فكرة البرنامج. قدم اقتراحات تحسين منفصلة لكل حقل معني بالملاحظة، مع مراعاة العلاقة بين الحقول. فقط للحقول المعنية.
+
+استخدم التنسيق التالي لكل حقل:
+
+{FIELD_SUGGESTIONS_FORMAT['ar']}
+
+{FORMAT_RULE['ar']}""",
+        'en': f"""The user has a note on multiple fields of a program idea. Provide separate improvement suggestions for each field mentioned in the note, considering the relationship between fields.
+
+Use the following format for each field:
+
+{FIELD_SUGGESTIONS_FORMAT['en']}
+
+{FORMAT_RULE['en']}""",
+    },
+    context={
+        'ar': """الحقول المعنية:
+{fields_text}
+
+ملاحظة المستخدم: {note_content}""",
+        'en': """Related fields:
+{fields_text}
+
+Note type: {note_type}
+Priority: {priority}
+
+User's note: {note_content}""",
+    },
+)
@@ -0,0 +1,29 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from askme.models import LLMModel
+from .exports import delete_exports, schedule_exports
+from .model_choice import invalidate_model_choice
+from .models import IdeaResponse, ProgramIdea
+
+
+@receiver(post_save, sender=LLMModel)
+@receiver(post_delete, sender=LLMModel)
+def clear_model_choice(sender, **kwargs):
+    """Choose the ideation model again after any LLMModel change."""
+    invalidate_model_choice()
+
+
+@receiver(post_save, sender=ProgramIdea)
+@receiver(post_save, sender=IdeaResponse)
+@receiver(post_delete, sender=IdeaResponse)
+def rebuild_exports(sender, instance, **kwargs):
+    """Refresh the idea's stored PDF/Word exports after it or a response changes."""
+    idea_id = instance.id if sender is ProgramIdea else instance.idea_id
+    transaction.on_commit(lambda: schedule_exports(idea_id))
+
+
+@receiver(post_delete, sender=ProgramIdea)
+def remove_exports(sender, instance, **kwargs):
+    idea_id = instance.id
+    transaction.on_commit(lambda: delete_exports(idea_id))
@@ -19,4 +19,5 @@ urlpatterns = [
     path('notes/<int:note_id>/apply/', views.apply_note_suggestion, name='apply_note_suggestion'),
     path('<int:idea_id>/export/pdf/', views.export_idea_pdf, name='export_pdf'),
     path('<int:idea_id>/export/word/', views.export_idea_word, name='export_word'),
+    path('api/model/', views.model_choice, name='model_choice'),
 ]
\ No newline at end of file
@@ -1,5 +1,8 @@
+import asyncio
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
 from django.urls import reverse
 from django.utils.translation import gettext as _
@@ -7,20 +10,19 @@ from django.http import HttpResponseRedirect
 
 from .models import ProgramIdea, IdeaResponse , IdeaNote
 from .forms import LanguageSelectionForm, StartIdeationForm, InitialConceptForm, ProgramDetailsForm , IdeaNoteForm
-from .services import ProgramIdeationService
-from core.utils import log_user_activity
+from .services import AsyncProgramIdeationService, ProgramIdeationService
+from .model_choice import get_model_choice
+from .exports import FORMATS as EXPORT_FORMATS, get_export, get_snapshot
+from core.utils import log_user_activity, resolve_user
 
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 import json
+import time
 from django.core.exceptions import PermissionDenied
 
-from django.http import HttpResponse
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-import io
-
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse
+from django.core.files.storage import default_storage
 from django.template.loader import render_to_string
 from django.shortcuts import get_object_or_404
 import io
@@ -114,14 +116,68 @@ def start_ideation(request, idea_id):
     })
 
 
+# Generated, in order, once every required field of a specific idea is filled
+COMPLETION_RESPONSES = [
+    ('discussion_questions', 'generate_discussion_questions'),
+    ('program_format', 'generate_program_format'),
+    ('program_script', 'generate_program_script'),
+    ('visual_materials', 'generate_visual_proposals'),
+]
+
+
 # @login_required
-def specific_idea(request, idea_id):
+async def specific_idea(request, idea_id):
     """Handle the specific idea path."""
+    await resolve_user(request)
+    response, idea, next_step = await sync_to_async(_specific_idea_form)(request, idea_id)
+    if next_step is None:
+        return response
+    
+    service = AsyncProgramIdeationService(language=idea.language)
+    if next_step == 'complete':
+        # The four generations don't depend on each other, so run them concurrently
+        contents = await asyncio.gather(*[
+            getattr(service, method)(idea) for _, method in COMPLETION_RESPONSES
+        ])
+        
+        # Save the responses in their usual order
+        for (response_type, _), content in zip(COMPLETION_RESPONSES, contents):
+            await IdeaResponse.objects.acreate(
+                idea=idea,
+                response_type=response_type,
+                content=content
+            )
+        
+        # Update idea status
+        idea.status = 'completed'
+        idea.current_step = 'complete'
+        await idea.asave()
+    else:
+        # Generate proposals for missing data
+        missing_data_proposals = await service.get_missing_data_proposals(idea)
+        
+        # Save the response
+        await IdeaResponse.objects.acreate(
+            idea=idea,
+            response_type='missing_data',
+            content=missing_data_proposals
+        )
+    
+    return response
+
+
+def _specific_idea_form(request, idea_id):
+    """
+    Form handling for specific_idea().
+    
+    Returns (response, idea, next_step); next_step is 'complete' or
+    'missing_data' when the LLM output must be generated before `response`.
+    """
     idea = get_object_or_404(ProgramIdea, id=idea_id, user=request.user)
     
     # Ensure correct path
     if not idea.has_specific_idea:
-        return redirect('program_ideation:start', idea_id=idea.id)
+        return redirect('program_ideation:start', idea_id=idea.id), idea, None
     
     # Update translations based on language
     if idea.language == 'ar':
@@ -146,60 +202,9 @@ def specific_idea(request, idea_id):
             
             # Check if all required fields are filled
             if idea.is_complete():
-                # Generate discussion questions
-                service = ProgramIdeationService(language=idea.language)
-                discussion_questions = service.generate_discussion_questions(idea)
-                
-                # Save the response
-                IdeaResponse.objects.create(
-                    idea=idea,
-                    response_type='discussion_questions',
-                    content=discussion_questions
-                )
-                
-                # Generate program format
-                program_format = service.generate_program_format(idea)
-                IdeaResponse.objects.create(
-                    idea=idea,
-                    response_type='program_format',
-                    content=program_format
-                )
-                
-                # Generate program script
-                program_script = service.generate_program_script(idea)
-                IdeaResponse.objects.create(
-                    idea=idea,
-                    response_type='program_script',
-                    content=program_script
-                )
-                
-                # Generate visual materials
-                visual_materials = service.generate_visual_proposals(idea)
-                IdeaResponse.objects.create(
-                    idea=idea,
-                    response_type='visual_materials',
-                    content=visual_materials
-                )
-                
-                # Update idea status
-                idea.status = 'completed'
-                idea.current_step = 'complete'
-                idea.save()
-                
-                return redirect('program_ideation:complete', idea_id=idea.id)
+                return redirect('program_ideation:complete', idea_id=idea.id), idea, 'complete'
             else:
-                # Generate proposals for missing data
-                service = ProgramIdeationService(language=idea.language)
-                missing_data_proposals = service.get_missing_data_proposals(idea)
-                
-                # Save the response
-                IdeaResponse.objects.create(
-                    idea=idea,
-                    response_type='missing_data',
-                    content=missing_data_proposals
-                )
-                
-                return redirect('program_ideation:missing_data', idea_id=idea.id)
+                return redirect('program_ideation:missing_data', idea_id=idea.id), idea, 'missing_data'
     else:
         form = ProgramDetailsForm(instance=idea)
     
@@ -207,7 +212,7 @@ def specific_idea(request, idea_id):
         'form': form,
         'idea': idea,
         'title': title
-    })
+    }), idea, None
 
 
 # @login_required
@@ -215,11 +220,11 @@ def missing_data(request, idea_id):
     """Show missing data proposals and continue with form."""
     idea = get_object_or_404(ProgramIdea, id=idea_id, user=request.user)
     
-    # Get the latest missing data response
+    # Get the latest missing data response; pages only need its parsed sections
     response = IdeaResponse.objects.filter(
         idea=idea,
         response_type='missing_data'
-    ).order_by('-created_at').first()
+    ).defer('content').order_by('-created_at').first()
     
     # Update translations based on language
     if idea.language == 'ar':
@@ -255,13 +260,49 @@ def missing_data(request, idea_id):
 
 
 # @login_required
-def no_specific_idea(request, idea_id):
+async def no_specific_idea(request, idea_id):
     """Handle the no specific idea path."""
+    await resolve_user(request)
+    response, idea, concept = await sync_to_async(_no_specific_idea_form)(request, idea_id)
+    if concept is None:
+        return response
+    has_initial_concept, initial_concept = concept
+    
+    # Generate ideas using the LLM service
+    service = AsyncProgramIdeationService(language=idea.language)
+    
+    if has_initial_concept:
+        # Process the initial concept
+        content = await service.process_initial_concept(initial_concept)
+    else:
+        # Generate random ideas
+        content = await service.get_idea_suggestions()
+    
+    # Create response
+    await IdeaResponse.objects.acreate(
+        idea=idea,
+        response_type='suggestions',
+        content=content
+    )
+    
+    idea.current_step = 'suggestions'
+    await idea.asave()
+    
+    return response
+
+
+def _no_specific_idea_form(request, idea_id):
+    """
+    Form handling for no_specific_idea().
+    
+    Returns (response, idea, concept); concept is None unless suggestions
+    must be generated first, then (has_initial_concept, initial_concept).
+    """
     idea = get_object_or_404(ProgramIdea, id=idea_id, user=request.user)
     
     # Ensure correct path
     if idea.has_specific_idea:
-        return redirect('program_ideation:start', idea_id=idea.id)
+        return redirect('program_ideation:start', idea_id=idea.id), idea, None
     
     # Update translations based on language
     if idea.language == 'ar':
@@ -292,27 +333,7 @@ def no_specific_idea(request, idea_id):
                 request=request
             )
             
-            # Generate ideas using the LLM service
-            service = ProgramIdeationService(language=idea.language)
-            
-            if has_initial_concept:
-                # Process the initial concept
-                content = service.process_initial_concept(initial_concept)
-            else:
-                # Generate random ideas
-                content = service.get_idea_suggestions()
-            
-            # Create response
-            response = IdeaResponse.objects.create(
-                idea=idea,
-                response_type='suggestions',
-                content=content
-            )
-            
-            idea.current_step = 'suggestions'
-            idea.save()
-            
-            return redirect('program_ideation:suggestions', idea_id=idea.id)
+            return redirect('program_ideation:suggestions', idea_id=idea.id), idea, (has_initial_concept, initial_concept)
     else:
         form = InitialConceptForm()
     
@@ -320,7 +341,7 @@ def no_specific_idea(request, idea_id):
         'form': form,
         'idea': idea,
         'title': title
-    })
+    }), idea, None
 
 
 # @login_required
@@ -328,11 +349,12 @@ def suggestions(request, idea_id):
     """Show suggestions and allow user to select one."""
     idea = get_object_or_404(ProgramIdea, id=idea_id, user=request.user)
     
-    # Get the latest suggestions response
+    # Get the latest suggestions response; pages only need its parsed sections
     response = IdeaResponse.objects.filter(
         idea=idea,
         response_type='suggestions'
-    ).order_by('-created_at').first()
+    ).defer('content').order_by('-created_at').first()
+    suggestion_map = response.suggestion_map if response else {}
     
     # Update translations based on language
     if idea.language == 'ar':
@@ -392,6 +414,9 @@ def suggestions(request, idea_id):
     return render(request, 'program_ideation/suggestions.html', {
         'idea': idea,
         'response': response,
+        'suggestion_map': suggestion_map,
+        # Quick fill offers the Nth suggestion of every field at once
+        'quick_fill_numbers': range(1, max(map(len, suggestion_map.values())) + 1) if len(suggestion_map) > 1 else [],
         'title': title,
         'continue_button': continue_button,
         'restart_button': restart_button,
@@ -668,6 +693,7 @@ def apply_note_suggestion(request, note_id):
 def process_note_task(note_id):
     """Process a note with multi-field support."""
     def _process():
+        started = None
         try:
             from .models import IdeaNote, NoteField
             from .services import ProgramIdeationService
@@ -676,6 +702,7 @@ def process_note_task(note_id):
             note = IdeaNote.objects.get(id=note_id)
             note.status = 'processing'
             note.save()
+            started = time.time()
             
             # Initialize service
             service = ProgramIdeationService(language=note.idea.language)
@@ -693,6 +720,7 @@ def process_note_task(note_id):
             # Update note with response
             note.response_content = response
             note.status = 'completed'
+            note.processing_time = time.time() - started
             note.save()
             
             return {'success': True, 'note_id': note.id}
@@ -705,6 +733,8 @@ def process_note_task(note_id):
             try:
                 note = IdeaNote.objects.get(id=note_id)
                 note.status = 'failed'
+                if started is not None:
+                    note.processing_time = time.time() - started
                 note.save()
             except:
                 pass
@@ -720,225 +750,32 @@ def process_note_task(note_id):
     return {'success': True, 'message': f'Processing started for note ID: {note_id}'}
 
 
-# views.py
+def _export_response(request, idea_id, export_format):
+    """Serve the stored export of an idea, building it first if the idea changed since."""
+    idea = get_object_or_404(ProgramIdea.objects.select_related('user'), id=idea_id, user=request.user)
+    path = get_export(get_snapshot(idea), export_format)
+    content_type, extension = EXPORT_FORMATS[export_format]
+    return FileResponse(
+        default_storage.open(path, 'rb'),
+        as_attachment=True,
+        filename=f"program_{idea.id}_{datetime.now().strftime('%Y%m%d')}.{extension}",
+        content_type=content_type,
+    )
 
 
-# PDF Export using ReportLab
 # @login_required
 def export_idea_pdf(request, idea_id):
-    """Export program idea as PDF"""
-    from reportlab.lib.pagesizes import letter, A4
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle
-    from reportlab.lib import colors
-    from reportlab.lib.enums import TA_JUSTIFY, TA_RIGHT, TA_CENTER
-    from reportlab.pdfbase import pdfmetrics
-    from reportlab.pdfbase.ttfonts import TTFont
-    
-    idea = get_object_or_404(ProgramIdea, id=idea_id, user=request.user)
-    
-    # Create response
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="program_{idea.id}_{datetime.now().strftime("%Y%m%d")}.pdf"'
-    
-    # Create PDF
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72,
-                            topMargin=72, bottomMargin=18)
-    
-    # Container for the 'Flowable' objects
-    elements = []
-    
-    # Define styles
-    styles = getSampleStyleSheet()
-    
-    # Title style
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1f2937'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
-    
-    # Heading style
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=16,
-        textColor=colors.HexColor('#4b5563'),
-        spaceAfter=12,
-        spaceBefore=12
-    )
-    
-    # Arabic support (if needed)
-    if idea.language == 'ar':
-        # You need to add an Arabic font file
-        # pdfmetrics.registerFont(TTFont('Arabic', 'path/to/arabic-font.ttf'))
-        # Then use it in styles: fontName='Arabic'
-        pass
-    
-    # Add title
-    elements.append(Paragraph(idea.program_name or "Program Idea", title_style))
-    elements.append(Spacer(1, 12))
-    
-    # Add metadata table
-    metadata = [
-        ['Created Date:', idea.created_at.strftime('%B %d, %Y')],
-        ['Program Type:', idea.program_type or 'N/A'],
-        ['Duration:', idea.program_duration or 'N/A'],
-        ['Episodes:', idea.episode_count or 'N/A'],
-    ]
-    
-    metadata_table = Table(metadata, colWidths=[2*inch, 4*inch])
-    metadata_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.grey),
-        ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey)
-    ]))
-    
-    elements.append(metadata_table)
-    elements.append(Spacer(1, 20))
-    
-    # Add program details
-    details = [
-        ('General Idea', idea.general_idea),
-        ('Target Audience', idea.target_audience),
-        ('Program Objectives', idea.program_objectives),
-        ('Filming Location', idea.filming_location),
-    ]
-    
-    for label, content in details:
-        if content:
-            elements.append(Paragraph(f"<b>{label}:</b>", heading_style))
-            elements.append(Paragraph(content, styles['BodyText']))
-            elements.append(Spacer(1, 12))
-    
-    # Add page break before responses
-    elements.append(PageBreak())
-    
-    # Add responses
-    responses = IdeaResponse.objects.filter(idea=idea)
-    
-    for response in responses:
-        elements.append(Paragraph(response.get_response_type_display(), heading_style))
-        
-        # Split content into paragraphs to handle long text
-        content_lines = response.content.split('\n')
-        for line in content_lines[:50]:  # Limit lines to prevent huge PDFs
-            if line.strip():
-                elements.append(Paragraph(line, styles['BodyText']))
-        
-        elements.append(Spacer(1, 20))
-        
-        # Add page break between major sections
-        if response.response_type in ['program_format', 'program_script']:
-            elements.append(PageBreak())
-    
-    # Build PDF
-    doc.build(elements)
-    
-    # Get the value of the BytesIO buffer and write it to the response
-    pdf = buffer.getvalue()
-    buffer.close()
-    response.write(pdf)
-    
-    return response
+    """Export program idea as PDF (see program_ideation.exports)."""
+    return _export_response(request, idea_id, 'pdf')
 
 
-# Word Export using python-docx
 # @login_required
 def export_idea_word(request, idea_id):
-    """Export program idea as Word document"""
-    from docx import Document
-    from docx.shared import Inches, Pt, RGBColor
-    from docx.enum.text import WD_ALIGN_PARAGRAPH
-    from docx.enum.style import WD_STYLE_TYPE
-    
-    idea = get_object_or_404(ProgramIdea, id=idea_id, user=request.user)
-    
-    # Create document
-    document = Document()
-    
-    # Set document properties
-    document.core_properties.title = idea.program_name or "Program Idea"
-    document.core_properties.author = request.user.get_full_name() or request.user.username
-    
-    # Add title
-    title = document.add_heading(idea.program_name or "Program Idea", 0)
-    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    
-    # Add metadata paragraph
-    metadata = document.add_paragraph()
-    metadata.add_run(f"Created: {idea.created_at.strftime('%B %d, %Y')}\n").bold = True
-    metadata.add_run(f"Type: {idea.program_type or 'N/A'} | ")
-    metadata.add_run(f"Duration: {idea.program_duration or 'N/A'} | ")
-    metadata.add_run(f"Episodes: {idea.episode_count or 'N/A'}")
-    metadata.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    
-    document.add_paragraph()  # Empty line
-    
-    # Add program details
-    details = [
-        ('General Idea', idea.general_idea),
-        ('Target Audience', idea.target_audience),
-        ('Program Objectives', idea.program_objectives),
-        ('Program Type', idea.program_type),
-        ('Program Duration', idea.program_duration),
-        ('Episode Count', idea.episode_count),
-        ('Filming Location', idea.filming_location),
-    ]
-    
-    for label, content in details:
-        if content:
-            # Add heading
-            heading = document.add_heading(label, level=2)
-            
-            # Add content
-            para = document.add_paragraph(content)
-            para.style = 'Normal'
-            
-            # Add space
-            document.add_paragraph()
-    
-    # Add page break
-    document.add_page_break()
-    
-    # Add responses
-    responses = IdeaResponse.objects.filter(idea=idea)
-    
-    response_titles = {
-        'discussion_questions': 'Discussion Questions',
-        'program_format': 'Program Format',
-        'program_script': 'Program Script',
-        'visual_materials': 'Visual Materials',
-        'suggestions': 'Suggestions',
-        'missing_data': 'Missing Data Proposals'
-    }
-    
-    for response in responses:
-        # Add section title
-        document.add_heading(response_titles.get(response.response_type, response.get_response_type_display()), level=1)
-        
-        # Add content
-        for paragraph in response.content.split('\n'):
-            if paragraph.strip():
-                document.add_paragraph(paragraph)
-        
-        # Add page break between major sections
-        if response.response_type in ['program_format', 'program_script']:
-            document.add_page_break()
-    
-    # Save to response
-    response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document')
-    response['Content-Disposition'] = f'attachment; filename="program_{idea.id}_{datetime.now().strftime("%Y%m%d")}.docx"'
-    
-    document.save(response)
-    
-    return response
\ No newline at end of file
+    """Export program idea as Word document (see program_ideation.exports)."""
+    return _export_response(request, idea_id, 'word')
+
+
+@staff_member_required
+def model_choice(request):
+    """JSON for the model ideation prompts go to and why it was chosen (this process only)."""
+    return JsonResponse(get_model_choice().as_dict())
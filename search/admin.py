@@ -0,0 +1,19 @@
+from django.contrib import admin
+from django.db.models import Q
+from .models import SearchDocument
+from .services import query_terms
+
+
+@admin.register(SearchDocument)
+class SearchDocumentAdmin(admin.ModelAdmin):
+    list_display = ('title', 'kind', 'user', 'updated_at')
+    list_filter = ('kind',)
+    search_fields = ('title_terms',)
+    readonly_fields = ('user', 'kind', 'object_id', 'title', 'url', 'title_terms', 'body', 'created_at', 'updated_at')
+    exclude = ('search_vector',)
+
+    def get_search_results(self, request, queryset, search_term):
+        # Match on normalised terms so the admin finds the same spelling variants as the site
+        for term in query_terms(search_term):
+            queryset = queryset.filter(Q(body__contains=term) | Q(title_terms__contains=term))
+        return queryset, False
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from search.services import BUILDERS, index_object
+
+
+def get_object_ids(kind):
+    if kind == 'conversation':
+        from askme.models import Conversation
+        return Conversation.objects.values_list('id', flat=True)
+    if kind == 'idea':
+        from program_ideation.models import ProgramIdea
+        return ProgramIdea.objects.values_list('id', flat=True)
+    if kind == 'translation':
+        from translation.models import TranslationProject
+        return TranslationProject.objects.values_list('id', flat=True)
+    from transcription.models import SubtitleProject
+    return SubtitleProject.objects.values_list('id', flat=True)
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search documents for conversations, ideas and subtitle projects'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=sorted(BUILDERS), action='append', help='Only rebuild these kinds')
+
+    def handle(self, *args, **options):
+        from search.models import SearchDocument
+
+        kinds = options['kind'] or sorted(BUILDERS)
+        for kind in kinds:
+            object_ids = set(get_object_ids(kind).order_by().iterator())
+            for object_id in sorted(object_ids):
+                index_object(kind, object_id)
+
+            # Documents whose objects are gone
+            stale, _ = SearchDocument.objects.filter(kind=kind).exclude(object_id__in=object_ids).delete()
+            self.stdout.write(f'{kind}: indexed {len(object_ids)}, removed {stale} stale')
+
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
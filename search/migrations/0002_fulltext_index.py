@@ -0,0 +1,61 @@
+"""
+Backend-specific full-text index for SearchDocument.
+
+PostgreSQL: a GIN index on search_vector (filled by search.services).
+SQLite: an external-content FTS5 table over title_terms/body, kept in step
+with search_searchdocument by triggers. Other backends get no index and use
+the unindexed fallback in search.services.
+"""
+from django.db import migrations
+
+POSTGRESQL_FORWARD = [
+    "CREATE INDEX search_document_vector_gin ON search_searchdocument USING GIN (search_vector)",
+]
+POSTGRESQL_BACKWARD = [
+    "DROP INDEX IF EXISTS search_document_vector_gin",
+]
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE search_fts USING fts5("
+    "title_terms, body, content='search_searchdocument', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER search_fts_insert AFTER INSERT ON search_searchdocument BEGIN "
+    "INSERT INTO search_fts(rowid, title_terms, body) VALUES (new.id, new.title_terms, new.body); END",
+    "CREATE TRIGGER search_fts_delete AFTER DELETE ON search_searchdocument BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, title_terms, body) VALUES ('delete', old.id, old.title_terms, old.body); END",
+    "CREATE TRIGGER search_fts_update AFTER UPDATE ON search_searchdocument BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, title_terms, body) VALUES ('delete', old.id, old.title_terms, old.body); "
+    "INSERT INTO search_fts(rowid, title_terms, body) VALUES (new.id, new.title_terms, new.body); END",
+    "INSERT INTO search_fts(search_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS search_fts_update",
+    "DROP TRIGGER IF EXISTS search_fts_delete",
+    "DROP TRIGGER IF EXISTS search_fts_insert",
+    "DROP TABLE IF EXISTS search_fts",
+]
+
+
+def _run(schema_editor, statements):
+    statements = statements.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement, params=None)
+
+
+def forwards(apps, schema_editor):
+    _run(schema_editor, {'postgresql': POSTGRESQL_FORWARD, 'sqlite': SQLITE_FORWARD})
+
+
+def backwards(apps, schema_editor):
+    _run(schema_editor, {'postgresql': POSTGRESQL_BACKWARD, 'sqlite': SQLITE_BACKWARD})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models
+from core.models import BaseModel
+
+
+class SearchDocument(BaseModel):
+    """
+    Denormalised searchable text for one conversation, idea or project.
+
+    `title_terms` and `body` hold Arabic-normalised text (search.services).
+    PostgreSQL indexes them through `search_vector` (GIN); SQLite through the
+    search_fts FTS5 table, kept in sync by triggers. Both are created in
+    migration 0002 for the backend in use.
+    """
+    KIND_CHOICES = [
+        ('conversation', 'Conversation'),
+        ('idea', 'Program Idea'),
+        ('translation', 'Translation Project'),
+        ('subtitle', 'Subtitle Project'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='search_documents')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    title = models.CharField(max_length=255)
+    url = models.CharField(max_length=255)
+    title_terms = models.TextField(blank=True)
+    body = models.TextField(blank=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        unique_together = ['kind', 'object_id']
+        ordering = ['-updated_at']
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.title}"
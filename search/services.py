@@ -0,0 +1,398 @@
+"""
+Full-text search over conversations, program ideas and subtitle projects.
+
+Each searchable object is flattened into one SearchDocument. Text is
+normalised the same way for documents and queries (diacritics, tatweel and
+alef/ya/ta-marbuta variants folded), so Arabic matches regardless of
+spelling variant. Writes go through an in-process queue that coalesces
+bursts, e.g. a pipeline saving 1,500 subtitles indexes the project once.
+"""
+import os
+import re
+import time
+import atexit
+import logging
+import threading
+import unicodedata
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEARCH_SETTINGS = {
+    'ASYNC': True,            # Index from a background thread (False: index inline)
+    'DELAY': 2.0,             # Seconds changes are collected before indexing
+    'MAX_BODY_CHARS': 500000, # tsvector values are limited to 1MB
+}
+
+# Private-use characters bracket matches in database snippets; normalize_text()
+# turns them into spaces, so they never occur in an indexed body
+HIGHLIGHT_START = '\ue000'
+HIGHLIGHT_STOP = '\ue001'
+
+# Harakat, Quranic marks and superscript alef
+_ARABIC_MARKS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed]')
+_NON_WORD = re.compile(r'[^\w]+')
+_FOLD = str.maketrans({
+    'ـ': '',     # tatweel
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ی': 'ي', 'ئ': 'ي',
+    'ؤ': 'و',
+    'ة': 'ه',
+    'ک': 'ك',
+    **{chr(0x0660 + digit): str(digit) for digit in range(10)},
+    **{chr(0x06f0 + digit): str(digit) for digit in range(10)},
+})
+
+
+def get_search_settings():
+    """Return the search settings merged over the defaults."""
+    config = DEFAULT_SEARCH_SETTINGS.copy()
+    config.update(getattr(settings, 'SEARCH_INDEX', {}))
+    return config
+
+
+# Definite article with attached conjunctions/prepositions (wa-, bi-, ka-, fa-, li-)
+_ARTICLE_PREFIXES = ('وال', 'بال', 'كال', 'فال', 'ولل', 'ال', 'لل')
+
+
+def _strip_article(term):
+    for prefix in _ARTICLE_PREFIXES:
+        if term.startswith(prefix) and len(term) - len(prefix) >= 2:
+            return term[len(prefix):]
+    return term
+
+
+def normalize_text(text):
+    """
+    Fold text to search terms: case, diacritics, Arabic letter variants and
+    the definite article; punctuation becomes spaces.
+    """
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKC', text)
+    text = _ARABIC_MARKS.sub('', text).translate(_FOLD).casefold()
+    return ' '.join(_strip_article(term) for term in _NON_WORD.sub(' ', text).replace('_', ' ').split())
+
+
+def query_terms(query):
+    """Normalised terms of a user query; safe to embed in tsquery/FTS5 syntax."""
+    return normalize_text(query).split()[:16]
+
+
+# --- Document builders --------------------------------------------------------
+# Each returns (user_id, title, url, [texts]) for an object id, or None if gone.
+
+def _build_conversation(object_id):
+    from askme.models import Conversation, Question
+    conversation = Conversation.objects.filter(pk=object_id).values('user_id', 'title').first()
+    if conversation is None:
+        return None
+    texts = []
+    for content, answer in Question.objects.filter(conversation_id=object_id).order_by('sequence').values_list(
+        'content', 'response__content'
+    ):
+        texts.extend([content, answer])
+    return (
+        conversation['user_id'],
+        conversation['title'],
+        reverse('askme:conversation', args=[object_id]),
+        texts,
+    )
+
+
+def _build_idea(object_id):
+    from program_ideation.models import ProgramIdea, IdeaResponse
+    fields = (
+        'program_name', 'initial_concept', 'general_idea', 'target_audience',
+        'program_objectives', 'program_type', 'filming_location',
+    )
+    idea = ProgramIdea.objects.filter(pk=object_id).values('user_id', *fields).first()
+    if idea is None:
+        return None
+    texts = [idea[field] for field in fields]
+    texts.extend(IdeaResponse.objects.filter(idea_id=object_id).values_list('content', flat=True))
+    title = idea['program_name'] or (idea['initial_concept'] or '')[:80] or f"Idea {object_id}"
+    return (idea['user_id'], title, reverse('program_ideation:complete', args=[object_id]), texts)
+
+
+def _build_translation(object_id):
+    from translation.models import TranslationProject, Subtitle
+    project = TranslationProject.objects.filter(pk=object_id).values('user_id', 'title').first()
+    if project is None:
+        return None
+    texts = []
+    for original, translated in Subtitle.objects.filter(project_id=object_id).order_by('sequence').values_list(
+        'original_text', 'translated_text'
+    ):
+        texts.extend([original, translated])
+    return (project['user_id'], project['title'], reverse('translation:detail', args=[object_id]), texts)
+
+
+def _build_subtitle(object_id):
+    from transcription.models import SubtitleProject, SubtitleSegment
+    project = SubtitleProject.objects.filter(pk=object_id).values(
+        'video__user_id', 'video__original_filename'
+    ).first()
+    if project is None:
+        return None
+    texts = []
+    for original, edited, translated, is_edited in SubtitleSegment.objects.filter(
+        project_id=object_id
+    ).order_by('position', 'id').values_list('original_text', 'edited_text', 'translated_text', 'is_edited'):
+        texts.extend([edited if is_edited else original, translated])
+    return (
+        project['video__user_id'],
+        project['video__original_filename'],
+        reverse('transcription:editor', args=[object_id]),
+        texts,
+    )
+
+
+BUILDERS = {
+    'conversation': _build_conversation,
+    'idea': _build_idea,
+    'translation': _build_translation,
+    'subtitle': _build_subtitle,
+}
+
+
+def index_object(kind, object_id):
+    """Rebuild (or drop) the SearchDocument for one object, synchronously."""
+    from .models import SearchDocument
+
+    built = BUILDERS[kind](object_id)
+    if built is None:
+        SearchDocument.objects.filter(kind=kind, object_id=object_id).delete()
+        return None
+
+    user_id, title, url, texts = built
+    body = normalize_text(' '.join(text for text in texts if text))
+    document, _ = SearchDocument.objects.update_or_create(
+        kind=kind,
+        object_id=object_id,
+        defaults={
+            'user_id': user_id,
+            'title': (title or '')[:255],
+            'url': url,
+            'title_terms': normalize_text(title),
+            'body': body[:get_search_settings()['MAX_BODY_CHARS']],
+        },
+    )
+
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchVector
+        # The 'simple' config: text is already normalised and mixes Arabic and English
+        SearchDocument.objects.filter(pk=document.pk).update(
+            search_vector=(
+                SearchVector('title_terms', weight='A', config='simple')
+                + SearchVector('body', weight='B', config='simple')
+            )
+        )
+    return document
+
+
+class IndexQueue:
+    """
+    Coalescing queue of (kind, object_id) pairs to re-index.
+
+    Signal handlers only add to a set; a daemon thread waits DELAY seconds
+    so bursts of saves collapse into one rebuild per object, then indexes.
+    Same lifecycle as core.activity.ActivityBuffer: started lazily per pid
+    and flushed at exit.
+    """
+
+    def __init__(self, delay=2.0):
+        self.delay = delay
+        self.indexed_count = 0
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def add(self, kind, object_id):
+        with self._lock:
+            self._pending.add((kind, object_id))
+        self._ensure_worker()
+        self._wakeup.set()
+
+    def flush(self):
+        """Index everything pending now. Returns the number of objects indexed."""
+        with self._flush_lock:
+            with self._lock:
+                batch = sorted(self._pending)
+                self._pending.clear()
+
+            if not batch:
+                return 0
+
+            close_old_connections()
+            try:
+                for kind, object_id in batch:
+                    try:
+                        index_object(kind, object_id)
+                        self.indexed_count += 1
+                    except Exception as e:
+                        logger.error(f"Error indexing {kind} {object_id}: {str(e)}")
+            finally:
+                close_old_connections()
+            return len(batch)
+
+    def _ensure_worker(self):
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='search-indexer')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            # Collect the rest of the burst before indexing
+            time.sleep(self.delay)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Search indexer error: {str(e)}")
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_index_queue():
+    """Return the process-wide index queue, creating it on first use."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = IndexQueue(delay=get_search_settings()['DELAY'])
+                # Workers are recycled often; index whatever is left on exit
+                atexit.register(_queue.flush)
+    return _queue
+
+
+def schedule_index(kind, object_id):
+    """Queue an object for re-indexing (or index it now when ASYNC is off)."""
+    if object_id is None:
+        return
+    if not get_search_settings()['ASYNC']:
+        try:
+            index_object(kind, object_id)
+        except Exception as e:
+            logger.error(f"Error indexing {kind} {object_id}: {str(e)}")
+        return
+    get_index_queue().add(kind, object_id)
+
+
+# --- Querying ------------------------------------------------------------------
+
+def search_documents(user, query, kinds=None, page=1, page_size=20):
+    """
+    Ranked search of a user's documents.
+
+    Returns (results, total) where results are dicts with kind, title, url,
+    snippet, rank and updated_at. Every term must match, as a prefix. The
+    snippet is escaped HTML with matches wrapped in <mark>.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return [], 0
+
+    offset = (page - 1) * page_size
+    if connection.vendor == 'postgresql':
+        results, total = _search_postgresql(user, terms, kinds, offset, page_size)
+    elif connection.vendor == 'sqlite':
+        results, total = _search_sqlite(user, terms, kinds, offset, page_size)
+    else:
+        results, total = _search_fallback(user, terms, kinds, offset, page_size)
+
+    for result in results:
+        result['snippet'] = highlight_snippet(result['snippet'])
+    return results, total
+
+
+def highlight_snippet(snippet):
+    """Escape a database snippet, then turn its highlight markers into <mark> tags."""
+    html = escape(snippet or '')
+    return mark_safe(html.replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_STOP, '</mark>'))
+
+
+def _search_postgresql(user, terms, kinds, offset, limit):
+    from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+    from django.db.models import F
+    from .models import SearchDocument
+
+    search_query = SearchQuery(' & '.join(f'{term}:*' for term in terms), config='simple', search_type='raw')
+    documents = SearchDocument.objects.filter(user=user, search_vector=search_query)
+    if kinds:
+        documents = documents.filter(kind__in=kinds)
+
+    total = documents.count()
+    rows = documents.annotate(
+        rank=SearchRank(F('search_vector'), search_query),
+        snippet=SearchHeadline(
+            'body', search_query, config='simple',
+            start_sel=HIGHLIGHT_START, stop_sel=HIGHLIGHT_STOP, max_words=30, min_words=10,
+        ),
+    ).order_by('-rank', '-updated_at').values(
+        'kind', 'object_id', 'title', 'url', 'snippet', 'rank', 'updated_at'
+    )[offset:offset + limit]
+    return list(rows), total
+
+
+def _search_sqlite(user, terms, kinds, offset, limit):
+    match = ' '.join(f'"{term}"*' for term in terms)
+    where = ['search_fts MATCH %s', 'd.user_id = %s']
+    params = [match, user.pk]
+    if kinds:
+        where.append(f"d.kind IN ({', '.join(['%s'] * len(kinds))})")
+        params.extend(kinds)
+    where_sql = ' AND '.join(where)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT COUNT(*) FROM search_fts JOIN search_searchdocument d ON d.id = search_fts.rowid WHERE {where_sql}",
+            params,
+        )
+        total = cursor.fetchone()[0]
+        # bm25 is lower-is-better; the title column weighs 5x the body
+        cursor.execute(
+            f"SELECT d.kind, d.object_id, d.title, d.url, "
+            f"snippet(search_fts, 1, %s, %s, '…', 24), -bm25(search_fts, 5.0, 1.0) AS rank, d.updated_at "
+            f"FROM search_fts JOIN search_searchdocument d ON d.id = search_fts.rowid "
+            f"WHERE {where_sql} ORDER BY bm25(search_fts, 5.0, 1.0), d.updated_at DESC LIMIT %s OFFSET %s",
+            [HIGHLIGHT_START, HIGHLIGHT_STOP] + params + [limit, offset],
+        )
+        columns = ['kind', 'object_id', 'title', 'url', 'snippet', 'rank', 'updated_at']
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    return rows, total
+
+
+def _search_fallback(user, terms, kinds, offset, limit):
+    """Unindexed search for other backends; correct but scans the user's documents."""
+    from django.db.models import Q
+    from .models import SearchDocument
+
+    documents = SearchDocument.objects.filter(user=user)
+    if kinds:
+        documents = documents.filter(kind__in=kinds)
+    for term in terms:
+        documents = documents.filter(Q(body__icontains=term) | Q(title_terms__icontains=term))
+    total = documents.count()
+    rows = list(documents.values('kind', 'object_id', 'title', 'url', 'body', 'updated_at')[offset:offset + limit])
+    for row in rows:
+        row['snippet'] = row.pop('body')[:200]
+        row['rank'] = None
+    return rows, total
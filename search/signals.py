@@ -0,0 +1,75 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from askme.models import Conversation, Question, Response
+from core.signals import subtitles_changed
+from program_ideation.models import ProgramIdea, IdeaResponse
+from transcription.models import SubtitleProject, SubtitleSegment
+from translation.models import TranslationProject, Subtitle
+from .services import schedule_index
+
+
+@receiver(post_save, sender=Conversation)
+@receiver(post_delete, sender=Conversation)
+@receiver(post_save, sender=ProgramIdea)
+@receiver(post_delete, sender=ProgramIdea)
+@receiver(post_save, sender=TranslationProject)
+@receiver(post_delete, sender=TranslationProject)
+@receiver(post_save, sender=SubtitleProject)
+@receiver(post_delete, sender=SubtitleProject)
+def index_parent(sender, instance, raw=False, **kwargs):
+    """Re-index a searchable object when it changes (or drop it when deleted)."""
+    if raw:
+        return
+    kind = {
+        Conversation: 'conversation',
+        ProgramIdea: 'idea',
+        TranslationProject: 'translation',
+        SubtitleProject: 'subtitle',
+    }[sender]
+    schedule_index(kind, instance.pk)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def index_question_conversation(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_index('conversation', instance.conversation_id)
+
+
+@receiver(post_save, sender=Response)
+@receiver(post_delete, sender=Response)
+def index_response_conversation(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    conversation_id = Question.objects.filter(pk=instance.question_id).values_list(
+        'conversation_id', flat=True
+    ).first()
+    schedule_index('conversation', conversation_id)
+
+
+@receiver(post_save, sender=IdeaResponse)
+@receiver(post_delete, sender=IdeaResponse)
+def index_idea_response(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_index('idea', instance.idea_id)
+
+
+@receiver(post_save, sender=Subtitle)
+@receiver(post_delete, sender=Subtitle)
+def index_subtitle(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_index('translation', instance.project_id)
+
+
+@receiver(post_save, sender=SubtitleSegment)
+@receiver(post_delete, sender=SubtitleSegment)
+def index_segment(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_index('subtitle', instance.project_id)
+
+
+@receiver(subtitles_changed)
+def index_bulk_subtitle_changes(sender, project_id, **kwargs):
+    """bulk_update/bulk_create skip post_save, so bulk editors send subtitles_changed."""
+    kind = 'translation' if sender is Subtitle else 'subtitle'
+    schedule_index(kind, project_id)
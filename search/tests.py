@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils.safestring import SafeString
+
+from translation.models import Subtitle, TranslationProject
+from .services import HIGHLIGHT_START, HIGHLIGHT_STOP, highlight_snippet, search_documents
+
+
+class HighlightSnippetTests(SimpleTestCase):
+
+    def test_escapes_everything_but_the_marks(self):
+        snippet = f'<script>x</script> {HIGHLIGHT_START}match{HIGHLIGHT_STOP} & more'
+
+        html = highlight_snippet(snippet)
+
+        self.assertIsInstance(html, SafeString)
+        self.assertEqual(html, '&lt;script&gt;x&lt;/script&gt; <mark>match</mark> &amp; more')
+
+    def test_empty_snippet(self):
+        self.assertEqual(highlight_snippet(None), '')
+
+
+# Index inline: the background indexer would outlive each test's transaction
+@override_settings(SEARCH_INDEX={'ASYNC': False})
+class SearchDocumentsTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='searcher', password='x')
+        project = TranslationProject.objects.create(
+            user=self.user, title='Episode 1', source_language='ar',
+            translation_mode='translate', video_file='videos/episode.mp4',
+        )
+        Subtitle.objects.create(
+            project=project, sequence=1, start_time=0.0, end_time=2.0, original_text='the quick brown fox'
+        )
+
+    def test_snippet_marks_matches(self):
+        results, total = search_documents(self.user, 'brown')
+
+        self.assertEqual(total, 1)
+        self.assertIn('<mark>brown</mark>', results[0]['snippet'])
+        self.assertNotIn(HIGHLIGHT_START, results[0]['snippet'])
+
+    def test_results_page_renders_marks_unescaped(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse('search:search'), {'q': 'brown'})
+
+        self.assertContains(response, '<mark>brown</mark>')
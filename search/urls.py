@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'search'
+
+urlpatterns = [
+    path('', views.search_page, name='search'),
+    path('api/', views.api_search, name='api_search'),
+]
@@ -0,0 +1,59 @@
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import render
+from .models import SearchDocument
+from .services import search_documents
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def _search_params(request):
+    """Parse q, kind (repeatable), page and page_size from the query string."""
+    valid_kinds = {kind for kind, _ in SearchDocument.KIND_CHOICES}
+    kinds = [kind for kind in request.GET.getlist('kind') if kind in valid_kinds]
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+        page_size = min(max(int(request.GET.get('page_size', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        page, page_size = 1, DEFAULT_PAGE_SIZE
+    return request.GET.get('q', '').strip(), kinds, page, page_size
+
+
+@login_required
+def api_search(request):
+    """Ranked, paginated search over the user's conversations, ideas and subtitle projects."""
+    query, kinds, page, page_size = _search_params(request)
+    results, total = search_documents(request.user, query, kinds=kinds, page=page, page_size=page_size)
+
+    return JsonResponse({
+        'query': query,
+        'page': page,
+        'page_size': page_size,
+        'total': total,
+        'has_next': page * page_size < total,
+        'results': results,
+    })
+
+
+@login_required
+def search_page(request):
+    """Search page; the same results as api_search rendered as HTML."""
+    query, kinds, page, page_size = _search_params(request)
+    results, total = search_documents(request.user, query, kinds=kinds, page=page, page_size=page_size)
+    kind_labels = dict(SearchDocument.KIND_CHOICES)
+    for result in results:
+        result['kind_label'] = kind_labels.get(result['kind'], result['kind'])
+
+    context = {
+        'title': 'Search',
+        'query': query,
+        'kinds': kinds,
+        'kind_choices': SearchDocument.KIND_CHOICES,
+        'results': results,
+        'total': total,
+        'page': page,
+        'previous_page': page - 1 if page > 1 else None,
+        'next_page': page + 1 if page * page_size < total else None,
+    }
+    return render(request, 'search/results.html', context)
@@ -75,6 +75,15 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
     
+    // Relative timestamps, for server-rendered times inside cached fragments
+    document.querySelectorAll('time[data-relative-time]').forEach(element => {
+        const date = new Date(element.getAttribute('datetime'));
+        if (!isNaN(date)) {
+            element.title = date.toLocaleString();
+            element.textContent = window.utils.timeSince(date);
+        }
+    });
+    
     // Dark mode toggle
     const darkModeToggle = document.getElementById('dark-mode-toggle');
     if (darkModeToggle) {
@@ -163,6 +172,19 @@ window.utils = {
         });
     },
     
+    // Format a past date as "5 minutes ago"
+    timeSince: function(date) {
+        const seconds = Math.max(0, Math.round((Date.now() - date.getTime()) / 1000));
+        const units = [['day', 86400], ['hour', 3600], ['minute', 60]];
+        for (const [unit, size] of units) {
+            const count = Math.floor(seconds / size);
+            if (count >= 1) {
+                return `${count} ${unit}${count === 1 ? '' : 's'} ago`;
+            }
+        }
+        return 'just now';
+    },
+    
     // Debounce function
     debounce: function(func, wait) {
         let timeout;
@@ -8,27 +8,6 @@ const IdeationUtils = {
                document.querySelector('[dir="rtl"]') !== null;
     },
     
-    // Field mapping for both languages
-    fieldMapping: {
-        'اسم البرنامج': 'program_name',
-        'الفكرة العامة': 'general_idea',
-        'الجمهور المستهدف': 'target_audience',
-        'أهداف البرنامج': 'program_objectives',
-        'نوع البرنامج': 'program_type',
-        'مدة البرنامج': 'program_duration',
-        'عدد الحلقات': 'episode_count',
-        'موقع أو أسلوب التصوير': 'filming_location',
-        'موقع التصوير': 'filming_location',
-        'Program Name': 'program_name',
-        'General Idea': 'general_idea',
-        'Target Audience': 'target_audience',
-        'Program Objectives': 'program_objectives',
-        'Program Type': 'program_type',
-        'Program Duration': 'program_duration',
-        'Episode Count': 'episode_count',
-        'Filming Location': 'filming_location'
-    },
-    
     // Get field label based on field ID
     getFieldLabel: function(fieldId) {
         const isRTL = this.isRTL();
@@ -45,110 +24,38 @@ const IdeationUtils = {
         return labels[fieldId] || fieldId;
     },
     
-    // Parse suggestions from LLM response
-    parseSections: function(content) {
-        const sectionRegex = /={3,}\s*([^=]+?)\s*={3,}([\s\S]*?)(?=={3,}|$)/g;
-        let match;
-        const sections = [];
-        
-        while ((match = sectionRegex.exec(content)) !== null) {
-            const fieldName = match[1].trim();
-            const fieldContent = match[2].trim();
+    // Wire apply/copy buttons of server-rendered suggestion sections
+    // (components/suggestion_sections.html; parsing happens on the server)
+    initSuggestionActions: function(container) {
+        if (!container) return;
+        
+        container.addEventListener('click', (event) => {
+            const button = event.target.closest('.btn-apply-suggestion');
+            if (!button) return;
             
-            if (fieldName && fieldContent) {
-                sections.push({
-                    fieldName: fieldName,
-                    content: fieldContent,
-                    fieldId: this.fieldMapping[fieldName] || this.detectFieldType(fieldName, fieldContent)
-                });
-            }
-        }
-        
-        return sections;
-    },
-    
-    // Extract individual suggestions from content
-    extractSuggestions: function(content) {
-        const suggestions = [];
-        const lines = content.split('\n').filter(line => line.trim());
-        
-        // Patterns to identify suggestions
-        const patterns = [
-            /^(اقتراح|Suggestion)\s*\d+\s*:\s*(.+)/i,
-            /^\d+\.\s*(.+)/,
-            /^[-•*]\s*(.+)/,
-            /\*\*(اقتراح|Suggestion)\s*\d+\*\*\s*:\s*(.+)/i
-        ];
-        
-        let currentSuggestion = '';
-        
-        for (const line of lines) {
-            let matched = false;
+            const item = button.closest('.suggestion-item');
+            const section = button.closest('.field-suggestions-section');
+            const text = item.querySelector('.suggestion-text').textContent;
             
-            for (const pattern of patterns) {
-                const match = line.match(pattern);
-                if (match) {
-                    if (currentSuggestion) {
-                        suggestions.push(currentSuggestion.trim());
-                    }
-                    currentSuggestion = match[match.length - 1];
-                    matched = true;
-                    break;
-                }
+            if (button.classList.contains('btn-copy-suggestion')) {
+                this.copyToClipboard(text);
+            } else if (section && section.dataset.fieldId) {
+                this.applySuggestion(section.dataset.fieldId, text, button);
             }
-            
-            if (!matched) {
-                if (currentSuggestion) {
-                    currentSuggestion += ' ' + line;
-                } else if (line.trim()) {
-                    currentSuggestion = line;
-                }
-            }
-        }
-        
-        if (currentSuggestion) {
-            suggestions.push(currentSuggestion.trim());
-        }
-        
-        // If no suggestions found, treat the whole content as one suggestion
-        if (suggestions.length === 0 && content.trim()) {
-            suggestions.push(content.trim());
-        }
-        
-        return suggestions;
+        });
     },
     
-    // Detect field type from content
-    detectFieldType: function(fieldName, content) {
-        const nameLC = fieldName.toLowerCase();
-        const contentLC = content.toLowerCase();
-        
-        if (nameLC.includes('name') || nameLC.includes('اسم') || nameLC.includes('title') || nameLC.includes('عنوان')) {
-            return 'program_name';
-        }
-        if (nameLC.includes('idea') || nameLC.includes('فكرة') || nameLC.includes('concept') || contentLC.length > 200) {
-            return 'general_idea';
-        }
-        if (nameLC.includes('audience') || nameLC.includes('جمهور') || nameLC.includes('demographic')) {
-            return 'target_audience';
-        }
-        if (nameLC.includes('objective') || nameLC.includes('أهداف') || nameLC.includes('goal')) {
-            return 'program_objectives';
-        }
-        if (nameLC.includes('type') || nameLC.includes('نوع') || nameLC.includes('format')) {
-            return 'program_type';
-        }
-        if (nameLC.includes('duration') || nameLC.includes('مدة') || nameLC.includes('length')) {
-            return 'program_duration';
-        }
-        if (nameLC.includes('episode') || nameLC.includes('حلقات') || nameLC.includes('count')) {
-            return 'episode_count';
-        }
-        if (nameLC.includes('location') || nameLC.includes('موقع') || nameLC.includes('filming')) {
-            return 'filming_location';
-        }
+    // Fill empty fields with the Nth suggestion for each field
+    quickFill: function(suggestionMap, suggestionIndex) {
+        Object.entries(suggestionMap).forEach(([fieldId, suggestions]) => {
+            const field = document.getElementById(`id_${fieldId}`);
+            if (field && !field.value && suggestions[suggestionIndex]) {
+                field.value = suggestions[suggestionIndex];
+                this.highlightField(field);
+            }
+        });
         
-        return 'program_name'; // Default
+        this.showToast(this.isRTL() ? 'تم ملء الحقول الفارغة!' : 'Empty fields filled!');
     },
     
     // Apply suggestion to form field
@@ -220,6 +127,18 @@ const IdeationUtils = {
     
     // Show toast notification
     showToast: function(message, type = 'success') {
+        // Use the page's own toast when it has one
+        const pageToast = document.getElementById('toast-notification');
+        if (pageToast && document.getElementById('toast-message')) {
+            document.getElementById('toast-message').textContent = message;
+            pageToast.style.background = type === 'success' ? '#28a745' : '#dc3545';
+            pageToast.style.display = 'flex';
+            setTimeout(() => {
+                pageToast.style.display = 'none';
+            }, 3000);
+            return;
+        }
+        
         let toast = document.getElementById('ideation-toast');
         if (!toast) {
             // Create toast if it doesn't exist
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import AITool, ToolUsageStatistics
+from .models import AITool, ToolUsageStatistics, UsageRollupCheckpoint
 
 
 @admin.register(AITool)
@@ -12,6 +12,13 @@ class AIToolAdmin(admin.ModelAdmin):
 
 @admin.register(ToolUsageStatistics)
 class ToolUsageStatisticsAdmin(admin.ModelAdmin):
-    list_display = ('tool', 'date', 'usage_count', 'success_count', 'error_count', 'average_processing_time')
+    list_display = ('tool', 'date', 'usage_count', 'success_count', 'error_count', 'average_processing_time',
+                    'p50_processing_time', 'p95_processing_time', 'p99_processing_time')
     list_filter = ('tool', 'date')
-    date_hierarchy = 'date'
\ No newline at end of file
+    date_hierarchy = 'date'
+    readonly_fields = ('latency_sketch', 'created_at', 'updated_at')
+
+
+@admin.register(UsageRollupCheckpoint)
+class UsageRollupCheckpointAdmin(admin.ModelAdmin):
+    list_display = ('name', 'last_run_at', 'updated_at')
\ No newline at end of file
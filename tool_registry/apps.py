@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ToolRegistryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tool_registry'
+
+    def ready(self):
+        from . import signals  # noqa: F401
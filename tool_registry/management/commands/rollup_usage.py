@@ -0,0 +1,33 @@
+from datetime import datetime, time
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from tool_registry.services import UsageRollupService
+
+
+class Command(BaseCommand):
+    help = 'Aggregate user activity and job outcomes into daily tool usage statistics'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Recompute every day instead of only days changed since the last run',
+        )
+        parser.add_argument(
+            '--since',
+            help='Recompute days with changes after this date (YYYY-MM-DD)',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since_date = datetime.strptime(options['since'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--since must be in YYYY-MM-DD format')
+            since = timezone.make_aware(datetime.combine(since_date, time.min))
+
+        service = UsageRollupService()
+        written = service.run(full=options['full'], since=since)
+
+        self.stdout.write(self.style.SUCCESS(f'Updated {written} daily usage rows'))
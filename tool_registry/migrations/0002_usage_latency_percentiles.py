@@ -0,0 +1,46 @@
+# Generated by Django 4.2.8 on 2026-10-19 02:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tool_registry', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsageRollupCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AddField(
+            model_name='toolusagestatistics',
+            name='latency_sketch',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='toolusagestatistics',
+            name='p50_processing_time',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='toolusagestatistics',
+            name='p95_processing_time',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='toolusagestatistics',
+            name='p99_processing_time',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
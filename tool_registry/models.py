@@ -36,10 +36,26 @@ class ToolUsageStatistics(BaseModel):
     error_count = models.PositiveIntegerField(default=0)
     average_processing_time = models.FloatField(null=True, blank=True)
     
+    # Latency percentiles (seconds) and the mergeable sketch they come from,
+    # so weekly/monthly views can combine daily rows without rescanning jobs
+    p50_processing_time = models.FloatField(null=True, blank=True)
+    p95_processing_time = models.FloatField(null=True, blank=True)
+    p99_processing_time = models.FloatField(null=True, blank=True)
+    latency_sketch = models.JSONField(default=dict, blank=True)
+    
     class Meta:
         verbose_name_plural = "Tool Usage Statistics"
         unique_together = ['tool', 'date']
         ordering = ['-date']
     
     def __str__(self):
-        return f"{self.tool.name} - {self.date}"
\ No newline at end of file
+        return f"{self.tool.name} - {self.date}"
+
+
+class UsageRollupCheckpoint(BaseModel):
+    """High-water mark for incremental usage rollups."""
+    name = models.CharField(max_length=50, unique=True)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.name} - {self.last_run_at}"
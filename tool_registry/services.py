@@ -0,0 +1,395 @@
+import math
+import time
+import logging
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import transaction
+from django.utils import timezone
+from core.caching import CacheNamespace
+from .models import AITool, ToolUsageStatistics, UsageRollupCheckpoint
+
+logger = logging.getLogger(__name__)
+
+
+RECENT_ACTIVITY_FRAGMENT = 'dashboard_recent_activity'
+
+# Shared tier, visible to every worker when CACHE_URL points at Redis
+active_tools_cache = CacheNamespace('tool_registry:active_tools')
+
+# Per-process copy of the active tool list: (expires_at, tools)
+_local_tools = None
+_local_tools_lock = threading.Lock()
+
+
+def load_active_tools():
+    return [
+        {
+            'id': tool.id,
+            'name': tool.name,
+            'slug': tool.slug,
+            'description': tool.description,
+            'icon': tool.icon,
+            'url': tool.get_absolute_url(),
+        }
+        for tool in AITool.objects.filter(is_active=True)
+    ]
+
+
+def get_active_tools():
+    """
+    Return the active tools as dicts with their URLs already resolved.
+
+    Reads go to a per-process copy first, then the shared cache, then the
+    database. post_save/post_delete on AITool clear both tiers in the writing
+    process; other processes pick the change up when their local copy expires.
+    """
+    global _local_tools
+
+    now = time.monotonic()
+    local = _local_tools
+    if local is not None and local[0] > now:
+        return local[1]
+
+    tools = active_tools_cache.get_or_compute(
+        'all',
+        load_active_tools,
+        timeout=getattr(settings, 'TOOL_REGISTRY_CACHE_TIMEOUT', 3600),
+    )
+
+    with _local_tools_lock:
+        _local_tools = (now + getattr(settings, 'TOOL_REGISTRY_LOCAL_CACHE_TIMEOUT', 30), tools)
+    return tools
+
+
+def invalidate_tool_cache():
+    """Drop the cached active tool list in this process and the shared cache."""
+    global _local_tools
+
+    with _local_tools_lock:
+        _local_tools = None
+    active_tools_cache.invalidate_all()
+
+
+def invalidate_recent_activity(user_ids):
+    """Drop the dashboard recent-activity fragment for the given users."""
+    cache.delete_many([
+        make_template_fragment_key(RECENT_ACTIVITY_FRAGMENT, [user_id])
+        for user_id in user_ids
+    ])
+
+
+class LatencySketch:
+    """
+    Mergeable latency sketch with bounded relative error.
+
+    Values are counted in logarithmic buckets (the DDSketch layout), so two
+    sketches merge by adding bucket counts and any quantile is accurate to
+    within `relative_accuracy` of the true value.
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value, count=1):
+        """Add a latency value (seconds)."""
+        if value is None or value < 0:
+            return
+
+        if value == 0:
+            self.zero_count += count
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + count
+
+        self.count += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        """Fold another sketch into this one."""
+        if other.count == 0:
+            return self
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        """Return the approximate q-quantile (0 <= q <= 1), or None if empty."""
+        if self.count == 0:
+            return None
+
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+
+        seen = self.zero_count
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                # Bucket midpoint in log space keeps the error symmetric
+                value = 2 * self.gamma ** key / (1 + self.gamma)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else None
+
+    def to_dict(self):
+        """Serialise for storage in a JSONField."""
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'bins': {str(key): count for key, count in self.bins.items()},
+            'zero_count': self.zero_count,
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min,
+            'max': self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a sketch stored with to_dict()."""
+        sketch = cls(relative_accuracy=data.get('relative_accuracy', 0.01))
+        if not data:
+            return sketch
+        sketch.bins = {int(key): count for key, count in data.get('bins', {}).items()}
+        sketch.zero_count = data.get('zero_count', 0)
+        sketch.count = data.get('count', 0)
+        sketch.sum = data.get('sum', 0.0)
+        sketch.min = data.get('min')
+        sketch.max = data.get('max')
+        return sketch
+
+
+def merge_usage_statistics(rows):
+    """Combine several ToolUsageStatistics rows (e.g. a week) into one summary dict."""
+    sketch = LatencySketch()
+    totals = {'usage_count': 0, 'success_count': 0, 'error_count': 0}
+
+    for row in rows:
+        totals['usage_count'] += row.usage_count
+        totals['success_count'] += row.success_count
+        totals['error_count'] += row.error_count
+        sketch.merge(LatencySketch.from_dict(row.latency_sketch))
+
+    totals.update({
+        'average_processing_time': sketch.mean,
+        'p50_processing_time': sketch.quantile(0.50),
+        'p95_processing_time': sketch.quantile(0.95),
+        'p99_processing_time': sketch.quantile(0.99),
+    })
+    return totals
+
+
+class UsageRollupService:
+    """
+    Aggregate user activity and job outcomes into daily ToolUsageStatistics rows.
+
+    Each run finds the (tool, day) pairs touched since the last checkpoint and
+    recomputes only those rows, so repeated runs are cheap and idempotent.
+    """
+
+    CHECKPOINT_NAME = 'tool_usage_daily'
+
+    # Seconds of extra look-back for job rows committed after a run started
+    CHECKPOINT_SLACK = 60
+
+    # UserActivity.tool_name values that don't match the URL namespace
+    ACTIVITY_ALIASES = {
+        'subtitle_generator': 'transcription',
+    }
+
+    def __init__(self):
+        self.tools = {}
+        for tool in AITool.objects.all():
+            namespace = tool.url_name.split(':')[0] if ':' in tool.url_name else tool.slug
+            self.tools[namespace] = tool
+
+    def get_sources(self, namespace):
+        """
+        Return the job outcome sources for a tool.
+
+        Each source is (queryset, date_field, changed_field, outcome). Jobs are
+        bucketed by date_field, which never changes (created_at), so a job edited
+        later stays on its original day; changed_field (updated_at) only marks
+        that day dirty again. outcome maps a row dict to (status,
+        latency_seconds) with status 'success' or 'error'.
+        """
+        if namespace == 'askme':
+            from askme.models import Question
+            return [(
+                Question.objects.filter(status__in=['completed', 'failed']).values(
+                    'status', 'created_at', 'response__processing_time'
+                ),
+                'created_at',
+                'updated_at',
+                lambda row: (
+                    'success' if row['status'] == 'completed' else 'error',
+                    row['response__processing_time'],
+                ),
+            )]
+        if namespace == 'transcription':
+            from transcription.models import SubtitleProject
+            return [(
+                SubtitleProject.objects.filter(video__status__in=['completed', 'failed']).values(
+                    'video__status', 'created_at', 'processing_time'
+                ),
+                'created_at',
+                # The outcome lives on the video, which a failed run saves without the project
+                'video__updated_at',
+                lambda row: (
+                    'success' if row['video__status'] == 'completed' else 'error',
+                    # SubtitleProject.processing_time is stored in minutes
+                    row['processing_time'] * 60 if row['processing_time'] is not None else None,
+                ),
+            )]
+        if namespace == 'translation':
+            from translation.models import TranslationProject
+            return [(
+                TranslationProject.objects.filter(status__in=['completed', 'failed']).values(
+                    'status', 'created_at', 'processing_time'
+                ),
+                'created_at',
+                'updated_at',
+                lambda row: (
+                    'success' if row['status'] == 'completed' else 'error',
+                    row['processing_time'],
+                ),
+            )]
+        if namespace == 'program_ideation':
+            from program_ideation.models import IdeaNote
+            return [(
+                IdeaNote.objects.filter(status__in=['completed', 'failed']).values(
+                    'status', 'created_at', 'processing_time'
+                ),
+                'created_at',
+                'updated_at',
+                lambda row: (
+                    'success' if row['status'] == 'completed' else 'error',
+                    row['processing_time'],
+                ),
+            )]
+        return []
+
+    def get_activity_names(self, namespace):
+        """UserActivity.tool_name values that belong to a tool."""
+        return [namespace] + [alias for alias, target in self.ACTIVITY_ALIASES.items() if target == namespace]
+
+    def find_dirty_days(self, since):
+        """Return {namespace: set(dates)} for rows changed after `since` (None = everything)."""
+        from core.models import UserActivity
+
+        dirty = {}
+        for namespace in self.tools:
+            days = set()
+
+            activity = UserActivity.objects.filter(tool_name__in=self.get_activity_names(namespace))
+            if since:
+                activity = activity.filter(created_at__gt=since)
+            days.update(activity.dates('created_at', 'day'))
+
+            for queryset, date_field, changed_field, _ in self.get_sources(namespace):
+                if since:
+                    queryset = queryset.filter(**{f'{changed_field}__gt': since})
+                days.update(queryset.dates(date_field, 'day'))
+
+            if days:
+                dirty[namespace] = days
+        return dirty
+
+    def compute_day(self, namespace, day):
+        """Compute the statistics for one tool on one day."""
+        from core.models import UserActivity
+
+        activity_count = UserActivity.objects.filter(
+            tool_name__in=self.get_activity_names(namespace),
+            created_at__date=day,
+        ).count()
+
+        success_count = 0
+        error_count = 0
+        sketch = LatencySketch()
+
+        for queryset, date_field, _, outcome in self.get_sources(namespace):
+            for row in queryset.filter(**{f'{date_field}__date': day}).iterator():
+                status, latency = outcome(row)
+                if status == 'success':
+                    success_count += 1
+                else:
+                    error_count += 1
+                sketch.add(latency)
+
+        return {
+            # Tools without activity logging fall back to their job count
+            'usage_count': activity_count or (success_count + error_count),
+            'success_count': success_count,
+            'error_count': error_count,
+            'average_processing_time': sketch.mean,
+            'p50_processing_time': sketch.quantile(0.50),
+            'p95_processing_time': sketch.quantile(0.95),
+            'p99_processing_time': sketch.quantile(0.99),
+            'latency_sketch': sketch.to_dict(),
+        }
+
+    def get_lookback(self):
+        """
+        How far before the last run to look again.
+
+        Buffered activity keeps the time it was queued but is written up to
+        FLUSH_INTERVAL later, and jobs commit after their timestamps are set,
+        so rows can appear with a created_at/updated_at before the last run.
+        Recomputing a day is idempotent, so the overlap is harmless.
+        """
+        from core.activity import get_buffer_settings
+
+        return timedelta(seconds=get_buffer_settings()['FLUSH_INTERVAL'] + self.CHECKPOINT_SLACK)
+
+    def run(self, full=False, since=None):
+        """Run the rollup and return the number of daily rows written."""
+        checkpoint, _ = UsageRollupCheckpoint.objects.get_or_create(name=self.CHECKPOINT_NAME)
+        started_at = timezone.now()
+
+        if since is None and not full and checkpoint.last_run_at:
+            since = checkpoint.last_run_at - self.get_lookback()
+
+        dirty = self.find_dirty_days(None if full else since)
+        written = 0
+
+        for namespace, days in dirty.items():
+            tool = self.tools[namespace]
+            for day in sorted(days):
+                values = self.compute_day(namespace, day)
+                with transaction.atomic():
+                    ToolUsageStatistics.objects.update_or_create(
+                        tool=tool,
+                        date=day,
+                        defaults=values,
+                    )
+                written += 1
+                logger.info(f"Rolled up {namespace} for {day}: {values['usage_count']} uses")
+
+        checkpoint.last_run_at = started_at
+        checkpoint.save()
+
+        return written
@@ -0,0 +1,26 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.models import UserActivity
+from core.signals import activity_flushed
+from .models import AITool
+from .services import invalidate_tool_cache, invalidate_recent_activity
+
+
+@receiver(post_save, sender=AITool)
+@receiver(post_delete, sender=AITool)
+def clear_tool_cache(sender, **kwargs):
+    """Rebuild the cached tool list after any tool change."""
+    invalidate_tool_cache()
+
+
+@receiver(activity_flushed)
+def clear_recent_activity_after_flush(sender, user_ids, **kwargs):
+    """Refresh the dashboard activity fragment for users with new activity."""
+    invalidate_recent_activity(user_ids)
+
+
+@receiver(post_save, sender=UserActivity)
+def clear_recent_activity_after_save(sender, instance, created, **kwargs):
+    """Same as above when activity buffering is disabled and rows are saved directly."""
+    if created:
+        invalidate_recent_activity([instance.user_id])
@@ -1,3 +1,130 @@
-from django.test import TestCase
+import random
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from core.activity import ActivityBuffer
+from core.models import UserActivity
+from .models import AITool, ToolUsageStatistics
+from .services import LatencySketch, UsageRollupService
+
+
+# TransactionTestCase: ActivityBuffer.flush() closes stale connections, which
+# would drop a TestCase's wrapping transaction
+class UsageRollupCheckpointTests(TransactionTestCase):
+    """Incremental rollups must see rows written after a run with an earlier timestamp."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='rollup', password='x')
+        self.tool = AITool.objects.create(
+            name='Ask Me', slug='askme', description='', icon='bi-chat', url_name='askme:index'
+        )
+        # A long interval keeps the background flusher from writing before the test does
+        self.buffer = ActivityBuffer(flush_interval=3600)
+
+    def queue_activity(self):
+        self.buffer.add(UserActivity(user=self.user, tool_name='askme', action='ask'))
+
+    def test_row_queued_before_run_and_written_after_is_counted(self):
+        UsageRollupService().run()
+
+        self.queue_activity()
+        UsageRollupService().run()
+        self.assertFalse(ToolUsageStatistics.objects.exists())
+
+        self.assertEqual(self.buffer.flush(), 1)
+        UsageRollupService().run()
+
+        stats = ToolUsageStatistics.objects.get(tool=self.tool)
+        self.assertEqual(stats.usage_count, 1)
+
+    def test_repeated_runs_do_not_double_count(self):
+        self.queue_activity()
+        self.queue_activity()
+        self.buffer.flush()
+
+        UsageRollupService().run()
+        UsageRollupService().run()
+
+        stats = ToolUsageStatistics.objects.get(tool=self.tool)
+        self.assertEqual(stats.usage_count, 2)
+
+
+class LatencySketchTests(SimpleTestCase):
+    """Quantiles stay within the relative accuracy, including after merges."""
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.values = [rng.lognormvariate(0, 1.5) for _ in range(2000)]
+
+    def sketch_of(self, values):
+        sketch = LatencySketch()
+        for value in values:
+            sketch.add(value)
+        return sketch
+
+    def assertQuantilesAccurate(self, sketch, values):
+        ordered = sorted(values)
+        for q in (0.0, 0.25, 0.5, 0.9, 0.95, 0.99, 1.0):
+            expected = ordered[int(q * (len(ordered) - 1))]
+            self.assertAlmostEqual(
+                sketch.quantile(q), expected, delta=expected * sketch.relative_accuracy + 1e-12, msg=f'q={q}'
+            )
+
+    def test_quantiles_within_relative_accuracy(self):
+        self.assertQuantilesAccurate(self.sketch_of(self.values), self.values)
+
+    def test_merged_sketch_matches_one_built_from_all_values(self):
+        halves = self.values[:700], self.values[700:]
+        merged = self.sketch_of(halves[0]).merge(self.sketch_of(halves[1]))
+        whole = self.sketch_of(self.values)
+
+        self.assertEqual(merged.bins, whole.bins)
+        self.assertEqual(merged.count, len(self.values))
+        self.assertEqual((merged.min, merged.max), (min(self.values), max(self.values)))
+        self.assertAlmostEqual(merged.mean, sum(self.values) / len(self.values))
+        self.assertQuantilesAccurate(merged, self.values)
+
+    def test_merge_with_empty_sketches(self):
+        sketch = self.sketch_of([0.5, 1.0])
+
+        self.assertIs(sketch.merge(LatencySketch()), sketch)
+        self.assertEqual(sketch.count, 2)
+        merged = LatencySketch().merge(sketch)
+        self.assertEqual((merged.min, merged.max, merged.count), (0.5, 1.0, 2))
+
+    def test_merge_rejects_a_different_accuracy(self):
+        coarse = LatencySketch(relative_accuracy=0.05)
+        coarse.add(1.0)
+
+        with self.assertRaises(ValueError):
+            self.sketch_of([1.0]).merge(coarse)
+
+    def test_zeros_and_empty_sketch(self):
+        self.assertIsNone(LatencySketch().quantile(0.5))
+
+        sketch = self.sketch_of([0.0, 0.0, 0.0, 2.0])
+        self.assertEqual(sketch.quantile(0.5), 0.0)
+        self.assertAlmostEqual(sketch.quantile(1.0), 2.0, delta=2.0 * sketch.relative_accuracy)
+
+    def test_round_trips_through_a_dict(self):
+        sketch = self.sketch_of(self.values)
+        restored = LatencySketch.from_dict(sketch.to_dict())
+
+        self.assertEqual(restored.bins, sketch.bins)
+        self.assertEqual(restored.quantile(0.95), sketch.quantile(0.95))
+
+
+class DashboardRecentActivityTests(TestCase):
+    """The recent-activity fragment is cached, so it must not bake in relative times."""
+
+    def test_activity_times_are_absolute_in_the_cached_fragment(self):
+        user = get_user_model().objects.create_user(username='viewer', password='x')
+        UserActivity.objects.create(user=user, tool_name='askme', action='ask')
+        self.client.force_login(user)
+
+        response = self.client.get(reverse('dashboard'))
+
+        self.assertContains(response, 'data-relative-time')
+        self.assertNotContains(response, ' ago<')
@@ -1,15 +1,22 @@
+from django.conf import settings
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
-from .models import AITool
+from core.models import UserActivity
+from .services import get_active_tools
 
 @login_required
 def dashboard(request):
     """Main dashboard displaying available AI tools."""
-    tools = AITool.objects.filter(is_active=True)
+    tools = get_active_tools()
+    
+    # Lazy queryset: only evaluated when the per-user template fragment misses
+    recent_activity = UserActivity.objects.filter(user=request.user)[:5]
     
     context = {
         'tools': tools,
+        'recent_activity': recent_activity,
+        'activity_cache_timeout': settings.DASHBOARD_ACTIVITY_CACHE_TIMEOUT,
         'title': 'AI Tools Dashboard'
     }
     
-    return render(request, 'dashboard.html', context)
\ No newline at end of file
+    return render(request, 'dashboard.html', context)
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from transcription.models import SubtitleProject, SubtitleSegment
+from transcription.ordering import rebalance_positions
+
+
+class Command(BaseCommand):
+    help = 'Respace subtitle segment positions for projects whose ordering gaps are running out'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, help='Only rebalance this subtitle project')
+        parser.add_argument(
+            '--min-gap',
+            type=int,
+            default=64,
+            help='Rebalance projects with two neighbouring segments closer than this',
+        )
+        parser.add_argument('--all', action='store_true', help='Rebalance every project regardless of gaps')
+
+    def handle(self, *args, **options):
+        projects = SubtitleProject.objects.order_by('id')
+        if options['project']:
+            projects = projects.filter(id=options['project'])
+
+        rebalanced = 0
+        for project_id in projects.values_list('id', flat=True).iterator():
+            if not options['all']:
+                positions = SubtitleSegment.objects.filter(project_id=project_id).order_by(
+                    'position'
+                ).values_list('position', flat=True)
+                previous = None
+                tight = False
+                for position in positions.iterator():
+                    if previous is not None and position - previous < options['min_gap']:
+                        tight = True
+                        break
+                    previous = position
+                if not tight:
+                    continue
+
+            count = rebalance_positions(project_id)
+            rebalanced += 1
+            self.stdout.write(f'Project {project_id}: respaced {count} segments')
+
+        self.stdout.write(self.style.SUCCESS(f'Rebalanced {rebalanced} projects'))
@@ -0,0 +1,59 @@
+from django.db import migrations, models
+from django.db.models import F
+
+# Must match transcription.ordering.ORDER_KEY_GAP at the time of this migration
+ORDER_KEY_GAP = 1 << 16
+
+
+def copy_segment_numbers(apps, schema_editor):
+    SubtitleSegment = apps.get_model('transcription', 'SubtitleSegment')
+    SubtitleSegment.objects.update(position=F('segment_number') * ORDER_KEY_GAP)
+
+
+def restore_segment_numbers(apps, schema_editor):
+    SubtitleSegment = apps.get_model('transcription', 'SubtitleSegment')
+    project_ids = SubtitleSegment.objects.values_list('project_id', flat=True).distinct()
+    for project_id in project_ids:
+        segments = list(SubtitleSegment.objects.filter(project_id=project_id).order_by('position', 'id'))
+        for index, segment in enumerate(segments, 1):
+            segment.segment_number = index
+        SubtitleSegment.objects.bulk_update(segments, ['segment_number'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subtitlesegment',
+            name='position',
+            field=models.BigIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.AlterUniqueTogether(
+            name='subtitlesegment',
+            unique_together=set(),
+        ),
+        migrations.RunPython(copy_segment_numbers, restore_segment_numbers),
+        migrations.AlterModelOptions(
+            name='subtitlesegment',
+            options={'ordering': ['position', 'id']},
+        ),
+        # A default lets the column be re-added when migrating backwards
+        migrations.AlterField(
+            model_name='subtitlesegment',
+            name='segment_number',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RemoveField(
+            model_name='subtitlesegment',
+            name='segment_number',
+        ),
+        migrations.AddIndex(
+            model_name='subtitlesegment',
+            index=models.Index(fields=['project', 'position'], name='transcripti_project_d484d2_idx'),
+        ),
+    ]
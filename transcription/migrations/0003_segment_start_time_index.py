@@ -0,0 +1,17 @@
+# Generated by Django 4.2.8 on 2026-10-19 02:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0002_segment_position'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subtitlesegment',
+            index=models.Index(fields=['project', 'start_time'], name='transcripti_project_4eec81_idx'),
+        ),
+    ]
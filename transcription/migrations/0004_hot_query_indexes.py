@@ -0,0 +1,17 @@
+# Generated by Django 4.2.8 on 2026-10-19 02:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0003_segment_start_time_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='videofile',
+            index=models.Index(fields=['delete_at'], name='transcripti_delete__cb582c_idx'),
+        ),
+    ]
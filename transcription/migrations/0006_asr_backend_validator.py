@@ -0,0 +1,19 @@
+# Generated by Django 4.2.8 on 2026-10-19 03:47
+
+import core.asr
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0005_project_asr_backend'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='subtitleproject',
+            name='asr_backend',
+            field=models.CharField(blank=True, choices=[('whisper', 'Whisper'), ('faster_whisper', 'faster-whisper')], default='', max_length=20, validators=[core.asr.validate_asr_backend]),
+        ),
+    ]
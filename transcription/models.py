@@ -3,6 +3,7 @@ from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta
 from django.contrib.postgres.fields import JSONField
+from core.asr import ASR_BACKEND_CHOICES, validate_asr_backend
 from core.models import BaseModel
 from core.utils import get_file_upload_path
 
@@ -48,6 +49,10 @@ class VideoFile(BaseModel):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Retention cleanup (cleanup_old_videos)
+            models.Index(fields=['delete_at']),
+        ]
     
     def __str__(self):
         return self.original_filename
@@ -70,6 +75,10 @@ class SubtitleProject(BaseModel):
     subtitle_mode = models.CharField(max_length=20, choices=SUBTITLE_MODE_CHOICES)
     target_language = models.CharField(max_length=10, choices=LANGUAGE_CHOICES, null=True, blank=True)
     processing_time = models.FloatField(null=True, blank=True, help_text="Processing time in minutes")
+    # Speech recognition engine (see core.asr); blank uses ASR['BACKEND']
+    asr_backend = models.CharField(
+        max_length=20, choices=ASR_BACKEND_CHOICES, blank=True, default='', validators=[validate_asr_backend]
+    )
     
     # Subtitle files
     srt_file_arabic = models.FileField(upload_to=subtitle_file_path, null=True, blank=True)
@@ -94,7 +103,8 @@ class SubtitleProject(BaseModel):
 class SubtitleSegment(BaseModel):
     """Model for individual subtitle segments."""
     project = models.ForeignKey(SubtitleProject, on_delete=models.CASCADE, related_name='segments')
-    segment_number = models.IntegerField()
+    # Sparse ordering key (see transcription.ordering); not the displayed number
+    position = models.BigIntegerField()
     start_time = models.FloatField(help_text="Start time in seconds")
     end_time = models.FloatField(help_text="End time in seconds")
     original_text = models.TextField()
@@ -103,8 +113,12 @@ class SubtitleSegment(BaseModel):
     is_edited = models.BooleanField(default=False)
     
     class Meta:
-        ordering = ['segment_number']
-        unique_together = ['project', 'segment_number']
+        ordering = ['position', 'id']
+        indexes = [
+            models.Index(fields=['project', 'position']),
+            # Editor time-window and keyset reads (core.cues)
+            models.Index(fields=['project', 'start_time']),
+        ]
     
     def get_display_text(self):
         """Get the text to display (edited if available, otherwise original)."""
@@ -0,0 +1,64 @@
+"""
+Sparse ordering keys for SubtitleSegment.
+
+Segments are ordered by `position`, spaced ORDER_KEY_GAP apart when written.
+Inserting between two cues takes the midpoint of their positions, so an
+insert or delete writes one row instead of renumbering everything after it.
+Only when two neighbours end up adjacent (after ~16 inserts at the same spot)
+is the project rebalanced back to even spacing. Display numbers are never
+stored; exports and the editor number segments by enumerating them in order.
+"""
+from django.db import transaction
+from .models import SubtitleProject, SubtitleSegment
+
+ORDER_KEY_GAP = 1 << 16
+
+
+def initial_position(index):
+    """Position for the index-th (1-based) segment of a freshly generated project."""
+    return index * ORDER_KEY_GAP
+
+
+def rebalance_positions(project_id):
+    """Respace a project's segments ORDER_KEY_GAP apart. Returns the number of rows."""
+    with transaction.atomic():
+        SubtitleProject.objects.select_for_update().filter(pk=project_id).exists()
+        segments = list(
+            SubtitleSegment.objects.filter(project_id=project_id).order_by('position', 'id').only('id', 'position')
+        )
+        for index, segment in enumerate(segments, 1):
+            segment.position = initial_position(index)
+        SubtitleSegment.objects.bulk_update(segments, ['position'], batch_size=500)
+    return len(segments)
+
+
+def position_after(project_id, after_segment=None):
+    """
+    Return a free position right after `after_segment` (or at the start).
+
+    Call inside a transaction that holds the project row lock, so two inserts
+    at the same spot cannot pick the same midpoint.
+    """
+    segments = SubtitleSegment.objects.filter(project_id=project_id).order_by('position')
+
+    for attempt in range(2):
+        if after_segment is None:
+            before = None
+            after = segments.values_list('position', flat=True).first()
+        else:
+            before = after_segment.position
+            after = segments.filter(position__gt=before).values_list('position', flat=True).first()
+
+        if after is None:
+            return ORDER_KEY_GAP if before is None else before + ORDER_KEY_GAP
+        if before is None:
+            return after - ORDER_KEY_GAP
+        if after - before > 1:
+            return (before + after) // 2
+
+        # No room between the neighbours: respace and look again
+        rebalance_positions(project_id)
+        if after_segment is not None:
+            after_segment.refresh_from_db(fields=['position'])
+
+    raise RuntimeError(f"Could not find a free position in project {project_id}")
@@ -1,38 +1,39 @@
 import os
 import time
-import whisper
-from docx import Document
 from datetime import datetime
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
 import tempfile
 from django.conf import settings
 from django.utils import timezone
 import logging
+from core.asr import get_asr_backend
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
 
 class TranscriptionService:
-    """Service for handling video transcription using Whisper."""
+    """Service for handling video transcription (see core.asr for the engines)."""
     
-    def __init__(self, model_name="large-v2"):
-        self.model_name = model_name
-        self.model = None
+    def __init__(self, model_name=None, asr_backend=None):
+        # ASR['MODEL'] and ASR['BACKEND'] unless given
+        self.asr = get_asr_backend(asr_backend, model_name)
+        self.model_name = self.asr.model_name
         self.pause_threshold = 0.5  # Minimum pause (in seconds) to start a new paragraph
     
+    @property
+    def model(self):
+        return self.asr.model
+    
     def load_model(self):
-        """Load the Whisper model."""
-        logger.info(f"Loading Whisper model: {self.model_name}")
-        if self.model is None:
+        """Load the ASR model."""
+        if self.asr.model is None:
             try:
-                self.model = whisper.load_model(self.model_name)
-                logger.info(f"Successfully loaded model: {self.model_name}")
+                self.asr.load()
+                self.model_name = self.asr.model_name
             except Exception as e:
                 logger.error(f"Error loading model: {str(e)}")
                 raise
-        return self.model
+        return self.asr
     
     def transcribe_video(self, video_path, language="ar"):
         """Transcribe video and return result with paragraphs."""
@@ -41,11 +42,11 @@ class TranscriptionService:
         
         try:
             # Load model if not already loaded
-            model = self.load_model()
+            asr = self.load_model()
             
-            # Run transcription
-            logger.info(f"Running transcription with language: {language}")
-            result = model.transcribe(video_path, language=language)
+            # Run transcription; paragraphs only need segment times
+            logger.info(f"Running transcription with {asr.name}, language: {language}")
+            result = asr.transcribe(video_path, language=language, word_timestamps=False)
             
             # Split transcript by pauses
             paragraphs = []
@@ -80,6 +81,10 @@ class TranscriptionService:
     
     def create_docx(self, paragraphs, output_path=None):
         """Create Word document with RTL support."""
+        from docx import Document
+        from docx.oxml.ns import qn
+        from docx.oxml import OxmlElement
+        
         logger.info("Creating Word document with transcription")
         
         try:
@@ -1,15 +1,13 @@
 import os
 import time
-import whisper
-from docx import Document
-from datetime import datetime
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
-import torch
 import warnings
 import tempfile
 from django.conf import settings
 from django.utils import timezone
+from core.asr import get_asr_backend
+from core.inference import InferenceClient, InferenceError, get_inference_client
+from core.ml import torch, get_device
+from core.segmentation import get_subtitle_config, segment_words, wrap_text
 import logging
 import subprocess
 import json
@@ -26,41 +24,57 @@ os.environ["TOKENIZERS_PARALLELISM"] = "false"
 class EnhancedSubtitleService:
     """Enhanced subtitle service with translation and subtitle generation."""
     
-    def __init__(self):
-        self.model = None
+    # NLLB generation settings, also sent to the inference server
+    TRANSLATION_GENERATE_OPTIONS = {
+        'max_length': 512,
+        'num_beams': 6,
+        'length_penalty': 1.0,
+        'early_stopping': True,
+        'temperature': 0.7,
+        'do_sample': False,
+        'repetition_penalty': 1.2,
+        'no_repeat_ngram_size': 3,
+    }
+    
+    def __init__(self, use_inference_server=None, asr_backend=None):
+        # Speech recognition engine, ASR['BACKEND'] unless given (see core.asr)
+        self.asr = get_asr_backend(asr_backend)
         self.translator_model = None
         self.tokenizer = None
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self._device = None
         
-        # Subtitle configuration
-        self.subtitle_config = {
-            "mode": "subtitle",
-            "max_chars_per_line": 42,
-            "max_lines": 2,
-            "min_duration": 1.7,
-            "max_duration": 7.0,
-            "reading_speed": 15,
-            "gap_threshold": 0.5,
-            "min_words": 4,
-            "max_words": 25,
-            "force_merge": True,
-        }
+        # Subtitle configuration (see core.segmentation for the keys)
+        self.subtitle_config = get_subtitle_config()
+        
+        # Client mode: models live in the inference server process
+        if use_inference_server is None:
+            self.inference = get_inference_client()
+        else:
+            self.inference = InferenceClient() if use_inference_server else None
+    
+    @property
+    def model(self):
+        """The loaded ASR model, or None."""
+        return self.asr.model
+    
+    @property
+    def device(self):
+        # Resolved on first use so formatting/export never imports torch
+        if self._device is None:
+            self._device = get_device()
+        return self._device
     
     def load_models(self):
-        """Load Whisper and translation models."""
-        if self.model is None:
-            logger.info("Loading Whisper large-v2 model...")
-            try:
-                self.model = whisper.load_model("large-v2")
-                logger.info("✓ Whisper loaded successfully")
-            except Exception as e:
-                # Try with base model if large-v2 fails
-                logger.warning(f"Could not load large-v2: {e}")
-                logger.info("Loading Whisper base model instead...")
-                self.model = whisper.load_model("base")
-                logger.info("✓ Whisper base model loaded")
+        """Load the ASR and translation models (a no-op in client mode)."""
+        if self.inference:
+            return
         
-        # Try to load translation model (optional)
+        # Falls back to ASR['FALLBACK_MODEL'] if the configured model fails
+        self.asr.load()
+        self.load_translator()
+    
+    def load_translator(self):
+        """Load NLLB if it isn't yet; translation is optional, so failures are only logged."""
         try:
             if self.translator_model is None:
                 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
@@ -81,89 +95,84 @@ class EnhancedSubtitleService:
             logger.warning(f"Could not load translation model: {e}")
             logger.info("Translation will not be available")
     
+    def load_audio(self, video_path):
+        """Decode the video's audio track with ffmpeg (16 kHz mono float32).
+        
+        In client mode the inference server decodes, so the path is returned.
+        """
+        if self.inference:
+            return video_path
+        return self.asr.load_audio(video_path)
+    
+    def get_audio_duration(self, audio):
+        """Duration in seconds of audio returned by load_audio()."""
+        if isinstance(audio, str):
+            return self.get_video_duration(audio)
+        return self.asr.audio_duration(audio)
+    
     def transcribe_video(self, video_path, source_language="ar"):
-        """Transcribe video with word timestamps."""
-        logger.info(f"Starting transcription of video: {video_path}")
+        """Transcribe video with word timestamps.
+        
+        `video_path` may also be audio already decoded with load_audio().
+        """
+        if isinstance(video_path, str):
+            logger.info(f"Starting transcription of video: {video_path}")
+        
+        options = {
+            'language': source_language,
+            'word_timestamps': True,
+            'verbose': False,
+            'task': "transcribe",
+            'beam_size': 5,
+            'best_of': 5,
+            'fp16': False,
+        }
         
         try:
+            if self.inference:
+                return self.inference.transcribe(video_path, backend=self.asr.name, **options)
+            
             # Load models if not loaded
             self.load_models()
             
             # Transcribe with word timestamps
-            result = self.model.transcribe(
-                video_path,
-                language=source_language,
-                word_timestamps=True,
-                verbose=False,
-                task="transcribe",
-                beam_size=5,
-                best_of=5,
-                fp16=False
-            )
-            
-            return result
+            return self.asr.transcribe(video_path, **options)
         except Exception as e:
             logger.error(f"Error during transcription: {str(e)}")
             raise
     
     def create_subtitle_segments(self, segments):
-        """Create subtitle-ready segments with proper timing."""
-        config = self.subtitle_config
-        
-        # First pass - merge very short segments
-        merged_segments = []
-        temp_segment = None
-        
-        for segment in segments:
-            if temp_segment is None:
-                temp_segment = segment.copy()
-            else:
-                gap = segment['start'] - temp_segment['end']
-                combined_text = temp_segment['text'] + " " + segment['text']
-                combined_duration = segment['end'] - temp_segment['start']
-                
-                if (gap < 1.0 and combined_duration <= config['max_duration'] * 1.2 and
-                        len(combined_text) <= config['max_chars_per_line'] * config['max_lines'] * 1.2):
-                    temp_segment['end'] = segment['end']
-                    temp_segment['text'] = combined_text
-                else:
-                    merged_segments.append(temp_segment)
-                    temp_segment = segment.copy()
-        
-        if temp_segment:
-            merged_segments.append(temp_segment)
-        
-        # Second pass - ensure minimum segment length
-        final_segments = []
-        i = 0
-        while i < len(merged_segments):
-            segment = merged_segments[i]
-            duration = segment['end'] - segment['start']
-            word_count = len(segment['text'].split())
-            
-            if duration < config['min_duration'] or word_count < config.get('min_words', 5):
-                if i + 1 < len(merged_segments):
-                    next_segment = merged_segments[i + 1]
-                    combined_text = segment['text'] + " " + next_segment['text']
-                    combined_duration = next_segment['end'] - segment['start']
-                    
-                    if (combined_duration <= config['max_duration'] * 1.2 and
-                            len(combined_text) <= config['max_chars_per_line'] * config['max_lines'] * 1.2):
-                        final_segments.append({
-                            'start': segment['start'],
-                            'end': next_segment['end'],
-                            'text': combined_text
-                        })
-                        i += 2
-                        continue
-            
-            final_segments.append(segment)
-            i += 1
+        """Create subtitle cues from Whisper's word timestamps."""
+        return segment_words(segments, self.subtitle_config)
+    
+    def translate_texts(self, texts, source_lang="ar", target_lang="en"):
+        """Translate a list of cues; in client mode they go to the server in batches."""
+        if not self.inference:
+            return [self.translate_text(text, source_lang, target_lang) for text in texts]
         
-        return final_segments
+        translations = []
+        batch_size = self.inference.translate_batch_size
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            try:
+                # Cues arrive broken into lines; translate the sentences, then re-break
+                results = self.inference.translate(
+                    [' '.join(text.split()) for text in batch],
+                    source_lang,
+                    'en' if source_lang == "ar" else 'ar',
+                    generate=self.TRANSLATION_GENERATE_OPTIONS,
+                )
+                translations.extend(wrap_text(translation, self.subtitle_config) for translation in results)
+            except InferenceError as e:
+                logger.error(f"Translation error: {str(e)}")
+                translations.extend([f"[Translation error: {str(e)[:50]}]"] * len(batch))
+        return translations
     
     def translate_text(self, text, source_lang="ar", target_lang="en"):
         """Translate text using NLLB model or return placeholder."""
+        if self.inference:
+            return self.translate_texts([text], source_lang, target_lang)[0]
+        
         if not self.translator_model:
             return f"[Translation to {target_lang} not available]"
         
@@ -176,8 +185,9 @@ class EnhancedSubtitleService:
                 self.tokenizer.src_lang = "eng_Latn"
                 forced_bos_token_id = self.tokenizer.convert_tokens_to_ids("arb_Arab")
             
+            # Cues arrive broken into lines; translate the sentence, then re-break
             inputs = self.tokenizer(
-                text,
+                ' '.join(text.split()),
                 return_tensors="pt",
                 max_length=512,
                 truncation=True,
@@ -188,18 +198,11 @@ class EnhancedSubtitleService:
                 generated_tokens = self.translator_model.generate(
                     **inputs,
                     forced_bos_token_id=forced_bos_token_id,
-                    max_length=512,
-                    num_beams=6,
-                    length_penalty=1.0,
-                    early_stopping=True,
-                    temperature=0.7,
-                    do_sample=False,
-                    repetition_penalty=1.2,
-                    no_repeat_ngram_size=3
+                    **self.TRANSLATION_GENERATE_OPTIONS
                 )
             
             translation = self.tokenizer.decode(generated_tokens[0], skip_special_tokens=True)
-            return translation.strip()
+            return wrap_text(translation, self.subtitle_config)
             
         except Exception as e:
             logger.error(f"Translation error: {str(e)}")
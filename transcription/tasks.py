@@ -12,6 +12,7 @@ logger = logging.getLogger(__name__)
 def process_subtitle_generation(project_id):
     """Process subtitle generation for a video."""
     from transcription.models import VideoFile, SubtitleProject, SubtitleSegment, SubtitleStyle
+    from transcription.ordering import initial_position
     from transcription.subtitle_services import EnhancedSubtitleService
     from docx import Document
     from docx.oxml.ns import qn
@@ -29,7 +30,7 @@ def process_subtitle_generation(project_id):
         logger.info(f"Starting subtitle generation for project {project_id}")
         
         # Initialize service
-        service = EnhancedSubtitleService()
+        service = EnhancedSubtitleService(asr_backend=project.asr_backend or None)
         
         # Get video path
         video_path = video.file.path
@@ -47,25 +48,27 @@ def process_subtitle_generation(project_id):
             transcription_result['segments']
         )
         
+        original_texts = [segment['text'].strip() for segment in subtitle_segments]
+        
+        # Translate if needed, all cues at once so client mode can batch them
+        translated_texts = [None] * len(original_texts)
+        if project.subtitle_mode == 'translate':
+            logger.info(f"Translating {len(original_texts)} segments")
+            translated_texts = service.translate_texts(
+                original_texts,
+                source_lang=project.source_language,
+                target_lang=project.target_language
+            )
+        
         # Process each segment
         segments_data = []
-        for idx, segment in enumerate(subtitle_segments, 1):
-            original_text = segment['text'].strip()
-            
-            # Translate if needed
-            translated_text = None
-            if project.subtitle_mode == 'translate':
-                logger.info(f"Translating segment {idx}/{len(subtitle_segments)}")
-                translated_text = service.translate_text(
-                    original_text,
-                    source_lang=project.source_language,
-                    target_lang=project.target_language
-                )
-            
+        for idx, (segment, original_text, translated_text) in enumerate(
+            zip(subtitle_segments, original_texts, translated_texts), 1
+        ):
             # Create SubtitleSegment in database
             SubtitleSegment.objects.create(
                 project=project,
-                segment_number=idx,
+                position=initial_position(idx),
                 start_time=segment['start'],
                 end_time=segment['end'],
                 original_text=original_text,
@@ -21,7 +21,7 @@ def process_subtitle_generation(project_id):
         video.save()
         
         # Initialize service
-        service = EnhancedSubtitleService()
+        service = EnhancedSubtitleService(asr_backend=project.asr_backend or None)
         
         # Your existing processing code here...
         # (Copy the main logic from the tasks.py file)
@@ -1,3 +1,98 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from . import ordering
+from .models import SubtitleProject, SubtitleSegment, VideoFile
+from .ordering import ORDER_KEY_GAP, initial_position, position_after, rebalance_positions
+
+
+# Index inline: the background indexer would outlive each test's transaction
+@override_settings(SEARCH_INDEX={'ASYNC': False})
+class SegmentOrderingTests(TestCase):
+    """Sparse position keys for subtitle segments."""
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(username='subtitler', password='x')
+        video = VideoFile.objects.create(
+            user=user, file='videos/clip.mp4', original_filename='clip.mp4', file_size=1
+        )
+        self.project = SubtitleProject.objects.create(video=video, source_language='ar', subtitle_mode='same')
+
+    def add_segment(self, position, text):
+        return SubtitleSegment.objects.create(
+            project=self.project, position=position, start_time=0.0, end_time=1.0, original_text=text
+        )
+
+    def insert_after(self, after_segment, text):
+        return self.add_segment(position_after(self.project.pk, after_segment), text)
+
+    def texts(self):
+        return list(
+            SubtitleSegment.objects.filter(project=self.project).order_by('position', 'id')
+            .values_list('original_text', flat=True)
+        )
+
+    def test_first_segment_of_an_empty_project(self):
+        self.assertEqual(position_after(self.project.pk), ORDER_KEY_GAP)
+
+    def test_append_after_the_last_segment(self):
+        last = self.add_segment(initial_position(3), 'c')
+        self.assertEqual(position_after(self.project.pk, last), last.position + ORDER_KEY_GAP)
+
+    def test_insert_takes_the_midpoint(self):
+        first = self.add_segment(initial_position(1), 'a')
+        self.add_segment(initial_position(2), 'c')
+
+        middle = self.insert_after(first, 'b')
+
+        self.assertEqual(middle.position, (initial_position(1) + initial_position(2)) // 2)
+        self.assertEqual(self.texts(), ['a', 'b', 'c'])
+
+    def test_insert_before_the_first_segment(self):
+        self.add_segment(initial_position(1), 'b')
+        self.add_segment(initial_position(2), 'c')
+
+        self.insert_after(None, 'a')
+
+        self.assertEqual(self.texts(), ['a', 'b', 'c'])
+
+    def test_adjacent_neighbours_trigger_a_rebalance(self):
+        first = self.add_segment(initial_position(1), 'a')
+        self.add_segment(initial_position(1) + 1, 'c')
+
+        with mock.patch.object(ordering, 'rebalance_positions', wraps=rebalance_positions) as rebalance:
+            self.insert_after(first, 'b')
+
+        rebalance.assert_called_once_with(self.project.pk)
+        self.assertEqual(self.texts(), ['a', 'b', 'c'])
+
+    def test_repeated_inserts_at_one_spot_keep_their_order(self):
+        first = self.add_segment(initial_position(1), 'start')
+        self.add_segment(initial_position(2), 'end')
+
+        with mock.patch.object(ordering, 'rebalance_positions', wraps=rebalance_positions) as rebalance:
+            for number in range(40):
+                first.refresh_from_db()
+                self.insert_after(first, f'insert {number}')
+
+        # Each insert lands right after `first`, so the newest comes first
+        expected = ['start'] + [f'insert {number}' for number in reversed(range(40))] + ['end']
+        self.assertEqual(self.texts(), expected)
+        self.assertGreaterEqual(rebalance.call_count, 1)
+        positions = list(SubtitleSegment.objects.filter(project=self.project).values_list('position', flat=True))
+        self.assertEqual(len(positions), len(set(positions)))
+
+    def test_rebalance_respaces_evenly_in_order(self):
+        self.add_segment(5, 'a')
+        self.add_segment(6, 'b')
+        self.add_segment(100, 'c')
+
+        self.assertEqual(rebalance_positions(self.project.pk), 3)
+
+        positions = list(
+            SubtitleSegment.objects.filter(project=self.project).order_by('position').values_list('position', flat=True)
+        )
+        self.assertEqual(positions, [initial_position(1), initial_position(2), initial_position(3)])
+        self.assertEqual(self.texts(), ['a', 'b', 'c'])
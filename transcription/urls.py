@@ -10,6 +10,8 @@ urlpatterns = [
     path('editor/<int:project_id>/', views.subtitle_editor, name='editor'),
     
     # API endpoints for editor
+    path('api/project/<int:project_id>/cues/', 
+         views.segment_cues, name='segment_cues'),
     path('api/project/<int:project_id>/segment/<int:segment_id>/update/', 
          views.update_segment, name='update_segment'),
     path('api/project/<int:project_id>/segment/add/', 
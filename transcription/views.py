@@ -6,11 +6,13 @@ from django.http import JsonResponse, HttpResponse
 from django.views.decorators.http import require_POST, require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
-from django.db import models
+from django.db import transaction
 from .models import VideoFile, SubtitleProject, SubtitleSegment, SubtitleStyle
 from .forms import VideoUploadForm
 from .processing_service import SubtitleProcessor
+from .ordering import position_after
 from .subtitle_services import EnhancedSubtitleService
+from core.cues import cue_page_response
 from core.utils import log_user_activity
 import json
 import os
@@ -125,7 +127,7 @@ def subtitle_editor(request, project_id):
     )
     
     # Get segments
-    segments = project.segments.all().order_by('segment_number')
+    segments = project.segments.all().order_by('position', 'id')
     
     # Get or create style
     style, created = SubtitleStyle.objects.get_or_create(project=project)
@@ -157,6 +159,34 @@ def subtitle_editor(request, project_id):
     return render(request, 'transcription/editor.html', context)
 
 
+def _segment_cue(row):
+    """Shape a SubtitleSegment values() row like the editor expects."""
+    return {
+        'id': row['id'],
+        'start_time': row['start_time'],
+        'end_time': row['end_time'],
+        'text': row['edited_text'] if row['is_edited'] else row['original_text'],
+        'translated_text': row['translated_text'],
+    }
+
+
+@login_required
+def segment_cues(request, project_id):
+    """Editor cues by time window (?start=&end=) or keyset page (?cursor=&limit=)."""
+    project = get_object_or_404(
+        SubtitleProject,
+        id=project_id,
+        video__user=request.user
+    )
+    
+    return cue_page_response(
+        request,
+        SubtitleSegment.objects.filter(project=project),
+        ('id', 'start_time', 'end_time', 'original_text', 'edited_text', 'is_edited', 'translated_text'),
+        transform=_segment_cue,
+    )
+
+
 @login_required
 @require_POST
 def update_segment(request, project_id, segment_id):
@@ -252,41 +282,33 @@ def add_segment(request, project_id):
         # Get the position for the new segment
         after_segment_id = data.get('after_segment_id')
         
-        if after_segment_id:
-            after_segment = SubtitleSegment.objects.get(
-                id=after_segment_id,
-                project=project
-            )
-            segment_number = after_segment.segment_number + 1
+        with transaction.atomic():
+            # Serialise inserts per project so two of them never take the same midpoint
+            SubtitleProject.objects.select_for_update().filter(pk=project.pk).exists()
+            
+            after_segment = None
+            if after_segment_id:
+                after_segment = SubtitleSegment.objects.get(
+                    id=after_segment_id,
+                    project=project
+                )
             
-            # Shift all subsequent segments
-            SubtitleSegment.objects.filter(
+            # Only the new row is written; later segments keep their positions
+            segment = SubtitleSegment.objects.create(
                 project=project,
-                segment_number__gte=segment_number
-            ).update(segment_number=models.F('segment_number') + 1)
-        else:
-            # Add at the beginning
-            segment_number = 1
-            SubtitleSegment.objects.filter(
-                project=project
-            ).update(segment_number=models.F('segment_number') + 1)
-        
-        # Create new segment
-        segment = SubtitleSegment.objects.create(
-            project=project,
-            segment_number=segment_number,
-            start_time=float(data['start_time']),
-            end_time=float(data['end_time']),
-            original_text=data.get('text', ''),
-            edited_text=data.get('text', ''),
-            is_edited=True
-        )
+                position=position_after(project.pk, after_segment),
+                start_time=float(data['start_time']),
+                end_time=float(data['end_time']),
+                original_text=data.get('text', ''),
+                edited_text=data.get('text', ''),
+                is_edited=True
+            )
         
         return JsonResponse({
             'success': True,
             'segment': {
                 'id': segment.id,
-                'segment_number': segment.segment_number,
+                'position': segment.position,
                 'text': segment.get_display_text(),
                 'start_time': segment.start_time,
                 'end_time': segment.end_time,
@@ -313,15 +335,9 @@ def delete_segment(request, project_id, segment_id):
     )
     
     try:
-        segment_number = segment.segment_number
+        # Positions are sparse, so nothing after it needs renumbering
         segment.delete()
         
-        # Re-number subsequent segments
-        SubtitleSegment.objects.filter(
-            project=project,
-            segment_number__gt=segment_number
-        ).update(segment_number=models.F('segment_number') - 1)
-        
         return JsonResponse({'success': True})
         
     except Exception as e:
@@ -337,7 +353,7 @@ def export_subtitles(request, project_id, format_type):
         video__user=request.user
     )
     
-    segments = project.segments.all().order_by('segment_number')
+    segments = project.segments.all().order_by('position', 'id')
     service = EnhancedSubtitleService()
     
     # Prepare segment data
@@ -16,7 +16,7 @@ class OutputInline(admin.TabularInline):
 @admin.register(TranslationProject)
 class TranslationProjectAdmin(admin.ModelAdmin):
     list_display = ('title', 'user', 'source_language', 'translation_mode', 'status', 'created_at')
-    list_filter = ('status', 'source_language', 'translation_mode', 'created_at')
+    list_filter = ('status', 'source_language', 'translation_mode', 'asr_backend', 'created_at')
     search_fields = ('title', 'user__username')
     readonly_fields = ('status', 'processing_time', 'error_message')
     inlines = [SubtitleInline, OutputInline]
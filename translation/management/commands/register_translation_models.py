@@ -1,9 +1,9 @@
 # translation/management/commands/register_translation_models.py
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
 import os
 import torch
-import whisper
+from core.asr import get_asr_backend
 
 class Command(BaseCommand):
     help = 'Downloads and registers translation models for offline use'
@@ -18,13 +18,17 @@ class Command(BaseCommand):
         else:
             self.stdout.write(self.style.WARNING('CUDA not available, using CPU (slower)'))
         
-        # Register Whisper model
-        self.stdout.write('Downloading Whisper large-v2 model...')
+        failed = []
+        
+        # Register the configured ASR model (ASR['BACKEND'] and ASR['MODEL']), without the fallback
+        asr = get_asr_backend()
+        self.stdout.write(f'Downloading {asr.label} {asr.model_name} model...')
         try:
-            whisper.load_model("large-v2")
-            self.stdout.write(self.style.SUCCESS('✓ Whisper model downloaded successfully'))
+            asr.load(fallback=False)
+            self.stdout.write(self.style.SUCCESS(f'✓ {asr.label} {asr.model_name} model downloaded successfully'))
         except Exception as e:
-            self.stdout.write(self.style.ERROR(f'Error downloading Whisper model: {e}'))
+            failed.append(f'{asr.label} {asr.model_name}')
+            self.stdout.write(self.style.ERROR(f'Error downloading {asr.label} {asr.model_name} model: {e}'))
         
         # Register NLLB model
         self.stdout.write('Downloading NLLB-200 translation model...')
@@ -37,6 +41,9 @@ class Command(BaseCommand):
             
             self.stdout.write(self.style.SUCCESS('✓ NLLB-200 model downloaded successfully'))
         except Exception as e:
+            failed.append('NLLB-200')
             self.stdout.write(self.style.ERROR(f'Error downloading translation model: {e}'))
         
+        if failed:
+            raise CommandError(f"Could not register: {', '.join(failed)}")
         self.stdout.write(self.style.SUCCESS('Models registered successfully!'))
\ No newline at end of file
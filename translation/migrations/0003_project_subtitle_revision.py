@@ -0,0 +1,18 @@
+# Generated by Django 4.2.8 on 2026-10-19 02:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('translation', '0002_subtitle_speaker'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='translationproject',
+            name='subtitle_revision',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.8 on 2026-10-19 02:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('translation', '0003_project_subtitle_revision'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subtitle',
+            index=models.Index(fields=['project', 'start_time'], name='translation_project_639e46_idx'),
+        ),
+    ]
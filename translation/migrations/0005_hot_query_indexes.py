@@ -0,0 +1,21 @@
+# Generated by Django 4.2.8 on 2026-10-19 02:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('translation', '0004_subtitle_start_time_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subtitle',
+            index=models.Index(fields=['project', 'sequence'], name='translation_project_a9eecb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='translationoutput',
+            index=models.Index(fields=['project', 'output_type'], name='translation_project_0eac05_idx'),
+        ),
+    ]
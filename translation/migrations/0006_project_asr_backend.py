@@ -0,0 +1,18 @@
+# Generated by Django 4.2.8 on 2026-10-19 03:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('translation', '0005_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='translationproject',
+            name='asr_backend',
+            field=models.CharField(blank=True, choices=[('whisper', 'Whisper'), ('faster_whisper', 'faster-whisper')], default='', max_length=20),
+        ),
+    ]
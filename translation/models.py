@@ -1,6 +1,7 @@
 from django.db import models
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from core.asr import ASR_BACKEND_CHOICES, validate_asr_backend
 from core.models import BaseModel
 from core.utils import get_file_upload_path
 
@@ -33,6 +34,12 @@ class TranslationProject(BaseModel):
     video_file = models.FileField(upload_to=get_file_upload_path)
     processing_time = models.FloatField(null=True, blank=True)
     error_message = models.TextField(blank=True, null=True)
+    # Bumped on every subtitle edit; editors send it back so stale saves are rejected
+    subtitle_revision = models.PositiveIntegerField(default=0)
+    # Speech recognition engine (see core.asr); blank uses ASR['BACKEND']
+    asr_backend = models.CharField(
+        max_length=20, choices=ASR_BACKEND_CHOICES, blank=True, default='', validators=[validate_asr_backend]
+    )
     
     def __str__(self):
         return self.title
@@ -68,6 +75,12 @@ class Subtitle(BaseModel):
     
     class Meta:
         ordering = ['sequence']
+        indexes = [
+            # Editor time-window and keyset reads (core.cues)
+            models.Index(fields=['project', 'start_time']),
+            # Ordered subtitle lists and exports
+            models.Index(fields=['project', 'sequence']),
+        ]
     
     def __str__(self):
         return f"Subtitle {self.sequence} ({self.start_time:.2f}s - {self.end_time:.2f}s)"
@@ -90,5 +103,11 @@ class TranslationOutput(BaseModel):
     output_type = models.CharField(max_length=20, choices=OUTPUT_TYPE_CHOICES)
     file = models.FileField(upload_to=get_file_upload_path)
     
+    class Meta:
+        indexes = [
+            # Download lookups by project and format
+            models.Index(fields=['project', 'output_type']),
+        ]
+    
     def __str__(self):
         return f"{self.get_output_type_display()} for {self.project.title}"
\ No newline at end of file
@@ -1,38 +1,59 @@
 import os
 import time
-import torch
-import whisper
 import tempfile
 import subprocess
 import shutil
-from docx import Document
-from docx.shared import Pt
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
 from datetime import datetime
 from django.conf import settings
 from django.core.files import File
 from django.core.files.base import ContentFile
+from core.asr import get_asr_backend
+from core.inference import InferenceError, get_inference_client
+from core.metrics import StageTimer
+from core.ml import torch, get_device
+from core.segmentation import segment_words, wrap_text
 from .models import TranslationProject, Subtitle, TranslationOutput
 
 
 class TranslationService:
     """Service for handling the translation and subtitle generation process"""
     
+    # NLLB generation settings, also sent to the inference server
+    TRANSLATION_GENERATE_OPTIONS = {
+        'max_length': 512,
+        'num_beams': 6,
+        'length_penalty': 1.0,
+        'early_stopping': True,
+    }
+    
     def __init__(self, project_id):
         self.project = TranslationProject.objects.get(id=project_id)
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.whisper_model = None
+        self._device = None
+        # Speech recognition engine: the project's asr_backend, else ASR['BACKEND']
+        self.asr = get_asr_backend(self.project.asr_backend or None)
         self.translator_model = None
         self.tokenizer = None
         self.translator_loaded = False
-        
+        self.timer = StageTimer('translation', project_id)
+        # Client mode: models live in the inference server process
+        self.inference = get_inference_client()
+        
+    @property
+    def device(self):
+        # Resolved on first use so output generation never imports torch
+        if self._device is None:
+            self._device = get_device()
+        return self._device
+    
     def load_models(self):
         """Load the required AI models"""
+        if self.inference:
+            self.translator_loaded = self.project.translation_mode == 'translate'
+            return True
+        
         try:
-            # Load Whisper model
-            self.whisper_model = whisper.load_model("large-v2")
+            # Load the ASR model; a project must not quietly run on a smaller one
+            self.asr.load(fallback=False)
             
             # Try to load the translation model if needed
             if self.project.translation_mode == 'translate':
@@ -65,14 +86,42 @@ class TranslationService:
             self.project.save()
             return False
     
+    def translate_texts(self, texts, from_lang, to_lang):
+        """translate_text() for a list of cues; in client mode they go to the server in batches."""
+        if not self.inference or not self.translator_loaded:
+            return [self.translate_text(text, from_lang, to_lang) for text in texts]
+        
+        translations = []
+        batch_size = self.inference.translate_batch_size
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            try:
+                # Cues arrive broken into lines; translate the sentences, then re-break
+                results = self.inference.translate(
+                    [' '.join(text.split()) for text in batch],
+                    from_lang,
+                    'ar' if to_lang == 'ar' else 'en',
+                    generate=self.TRANSLATION_GENERATE_OPTIONS,
+                )
+                # The server answers blank cues with ''
+                translations.extend(wrap_text(translation) for translation in results)
+            except InferenceError as e:
+                print(f"Translation error: {str(e)}")
+                translations.extend(["[Translation error]"] * len(batch))
+        return translations
+    
     def translate_text(self, text, from_lang, to_lang):
         """Translate text between languages"""
         if not text.strip() or not self.translator_loaded:
             return ""
         
+        if self.inference:
+            return self.translate_texts([text], from_lang, to_lang)[0]
+        
         try:
+            # Cues arrive broken into lines; translate the sentence, then re-break
             inputs = self.tokenizer(
-                text,
+                ' '.join(text.split()),
                 return_tensors="pt",
                 max_length=512,
                 truncation=True,
@@ -89,86 +138,18 @@ class TranslationService:
                 generated_tokens = self.translator_model.generate(
                     **inputs,
                     forced_bos_token_id=forced_bos_token_id,
-                    max_length=512,
-                    num_beams=6,
-                    length_penalty=1.0,
-                    early_stopping=True
+                    **self.TRANSLATION_GENERATE_OPTIONS
                 )
             
             translation = self.tokenizer.decode(generated_tokens[0], skip_special_tokens=True)
-            return translation.strip()
+            return wrap_text(translation)
         except Exception as e:
             print(f"Translation error: {str(e)}")
             return "[Translation error]"
     
     def create_subtitle_segments(self, whisper_segments):
-        """Create optimized subtitle segments from whisper output"""
-        # Subtitle configuration (from your script)
-        config = {
-            "max_chars_per_line": 42,
-            "max_lines": 2,
-            "min_duration": 1.7,
-            "max_duration": 7.0,
-            "reading_speed": 15,
-            "gap_threshold": 0.5,
-            "min_words": 4,
-            "max_words": 25,
-            "force_merge": True,
-        }
-        
-        # First pass - merge very short segments
-        merged_segments = []
-        temp_segment = None
-        
-        for segment in whisper_segments:
-            if temp_segment is None:
-                temp_segment = segment.copy()
-            else:
-                gap = segment['start'] - temp_segment['end']
-                combined_text = temp_segment['text'] + " " + segment['text']
-                combined_duration = segment['end'] - temp_segment['start']
-                
-                if (gap < 1.0 and combined_duration <= config['max_duration'] * 1.2):
-                    temp_segment['end'] = segment['end']
-                    temp_segment['text'] = combined_text
-                else:
-                    merged_segments.append(temp_segment)
-                    temp_segment = segment.copy()
-        
-        # Add the last segment
-        if temp_segment:
-            merged_segments.append(temp_segment)
-        
-        # Second pass - ensure minimum segment length
-        final_segments = []
-        i = 0
-        while i < len(merged_segments):
-            segment = merged_segments[i]
-            duration = segment['end'] - segment['start']
-            word_count = len(segment['text'].split())
-
-            # Check if this segment is too short
-            if duration < config['min_duration'] or word_count < config.get('min_words', 4):
-                # Try to merge with the next segment if possible
-                if i + 1 < len(merged_segments):
-                    next_segment = merged_segments[i + 1]
-                    combined_text = segment['text'] + " " + next_segment['text']
-                    combined_duration = next_segment['end'] - segment['start']
-
-                    if (combined_duration <= config['max_duration'] * 1.2):
-                        final_segments.append({
-                            'start': segment['start'],
-                            'end': next_segment['end'],
-                            'text': combined_text
-                        })
-                        i += 2  # Skip the next segment since we merged it
-                        continue
-
-            # If we can't merge or there's no next segment, keep it anyway
-            final_segments.append(segment)
-            i += 1
-            
-        return final_segments
+        """Create subtitle cues from Whisper's word timestamps."""
+        return segment_words(whisper_segments)
     
     def process_video(self):
         """Main processing function to generate subtitles from video"""
@@ -180,41 +161,62 @@ class TranslationService:
             start_time = time.time()
             
             # Load required models
-            if not self.load_models():
+            with self.timer.stage('model_load'):
+                models_loaded = self.load_models()
+            if not models_loaded:
+                self.timer.save(success=False)
                 return False
             
-            # Transcribe video with Whisper
+            transcribe_options = {
+                'language': "ar" if self.project.source_language == 'ar' else "en",
+                'word_timestamps': True,
+                'verbose': False,
+            }
             video_path = self.project.video_file.path
-            result = self.whisper_model.transcribe(
-                video_path,
-                language="ar" if self.project.source_language == 'ar' else "en",
-                word_timestamps=True,
-                verbose=False
-            )
+            
+            if self.inference:
+                # The inference server decodes and transcribes in one call
+                with self.timer.stage('asr'):
+                    result = self.inference.transcribe(video_path, backend=self.asr.name, **transcribe_options)
+                self.timer.audio_duration = result['duration']
+            else:
+                # Decode audio once so it is timed apart from ASR
+                with self.timer.stage('decode'):
+                    audio = self.asr.load_audio(video_path)
+                self.timer.audio_duration = self.asr.audio_duration(audio)
+                
+                # Transcribe video
+                with self.timer.stage('asr'):
+                    result = self.asr.transcribe(audio, **transcribe_options)
             
             # Create optimized subtitle segments
-            subtitle_segments = self.create_subtitle_segments(result['segments'])
+            with self.timer.stage('segmentation'):
+                subtitle_segments = self.create_subtitle_segments(result['segments'])
+            
+            original_texts = [segment['text'].strip() for segment in subtitle_segments]
+            
+            # Translate if needed, all cues at once so client mode can batch them
+            translated_texts = [None] * len(original_texts)
+            if self.project.translation_mode == 'translate' and self.translator_loaded:
+                from_lang = self.project.source_language
+                to_lang = 'en' if from_lang == 'ar' else 'ar'
+                with self.timer.stage('translation'):
+                    translated_texts = self.translate_texts(original_texts, from_lang, to_lang)
             
             # Process each segment and save to database
-            for idx, segment in enumerate(subtitle_segments, 1):
-                original_text = segment['text'].strip()
-                
-                # Translate if needed
-                translated_text = None
-                if self.project.translation_mode == 'translate' and self.translator_loaded:
-                    from_lang = self.project.source_language
-                    to_lang = 'en' if from_lang == 'ar' else 'ar'
-                    translated_text = self.translate_text(original_text, from_lang, to_lang)
-                
+            for idx, (segment, original_text, translated_text) in enumerate(
+                zip(subtitle_segments, original_texts, translated_texts), 1
+            ):
                 # Create subtitle object
-                Subtitle.objects.create(
-                    project=self.project,
-                    start_time=segment['start'],
-                    end_time=segment['end'],
-                    original_text=original_text,
-                    translated_text=translated_text,
-                    sequence=idx,
-                )
+                with self.timer.stage('db_write'):
+                    Subtitle.objects.create(
+                        project=self.project,
+                        start_time=segment['start'],
+                        end_time=segment['end'],
+                        original_text=original_text,
+                        translated_text=translated_text,
+                        sequence=idx,
+                    )
             
             # Generate output files
             self.generate_output_files()
@@ -223,9 +225,10 @@ class TranslationService:
             self.project.status = 'completed'
             self.project.processing_time = time.time() - start_time
             self.project.save()
+            self.timer.save(success=True)
             
             # Clean up
-            if torch.cuda.is_available():
+            if not self.inference and torch.cuda.is_available():
                 torch.cuda.empty_cache()
                 
             return True
@@ -235,9 +238,10 @@ class TranslationService:
             self.project.status = 'failed'
             self.project.error_message = str(e)
             self.project.save()
+            self.timer.save(success=False)
             
             # Clean up
-            if torch.cuda.is_available():
+            if not self.inference and torch.cuda.is_available():
                 torch.cuda.empty_cache()
                 
             return False
@@ -246,25 +250,27 @@ class TranslationService:
         """Generate SRT, VTT, and text files for both languages"""
         subtitles = self.project.subtitles.all().order_by('sequence')
         
-        # Generate SRT files
-        self.generate_srt_file(subtitles, 'original')
-        if self.project.translation_mode == 'translate':
-            self.generate_srt_file(subtitles, 'translated')
-        
-        # Generate VTT files
-        self.generate_vtt_file(subtitles, 'original')
-        if self.project.translation_mode == 'translate':
-            self.generate_vtt_file(subtitles, 'translated')
-        
-        # Generate text files
-        self.generate_text_file(subtitles, 'original')
-        if self.project.translation_mode == 'translate':
-            self.generate_text_file(subtitles, 'translated')
+        with self.timer.stage('subtitle_files'):
+            # Generate SRT files
+            self.generate_srt_file(subtitles, 'original')
+            if self.project.translation_mode == 'translate':
+                self.generate_srt_file(subtitles, 'translated')
+            
+            # Generate VTT files
+            self.generate_vtt_file(subtitles, 'original')
+            if self.project.translation_mode == 'translate':
+                self.generate_vtt_file(subtitles, 'translated')
+            
+            # Generate text files
+            self.generate_text_file(subtitles, 'original')
+            if self.project.translation_mode == 'translate':
+                self.generate_text_file(subtitles, 'translated')
             
         # Generate DOCX files
-        self.generate_docx_file(subtitles, 'original')
-        if self.project.translation_mode == 'translate':
-            self.generate_docx_file(subtitles, 'translated')
+        with self.timer.stage('docx'):
+            self.generate_docx_file(subtitles, 'original')
+            if self.project.translation_mode == 'translate':
+                self.generate_docx_file(subtitles, 'translated')
     
     def generate_single_output(self, output_type):
         """Generate a single output file based on the requested type"""
@@ -433,6 +439,10 @@ class TranslationService:
     
     def generate_docx_file(self, subtitles, text_type):
         """Generate Word document with transcript"""
+        from docx import Document
+        from docx.oxml.ns import qn
+        from docx.oxml import OxmlElement
+        
         # Check if we have subtitles
         if not subtitles.exists():
             return None
@@ -0,0 +1,168 @@
+"""
+Delta saves for the subtitle editor.
+
+The editor sends only the fields it changed, plus new and deleted cues, with
+the project's subtitle_revision it last loaded. Everything is applied in one
+transaction with a single bulk_update and bulk_create. If someone else saved
+in between, the revision no longer matches and the save is rejected.
+"""
+from django.db import transaction
+from django.utils import timezone
+from core.signals import subtitles_changed
+from .models import TranslationProject, Subtitle, TranslationOutput
+
+
+def _text(value):
+    return '' if value is None else str(value)
+
+
+def _optional_text(value):
+    return None if value is None else str(value)
+
+
+def _bool(value):
+    # bool("false") is True, so only real JSON booleans are accepted
+    if not isinstance(value, bool):
+        raise ValueError(value)
+    return value
+
+
+# Editable Subtitle fields and how to coerce the JSON values
+SUBTITLE_FIELDS = {
+    'sequence': int,
+    'start_time': float,
+    'end_time': float,
+    'original_text': _text,
+    'translated_text': _optional_text,
+    'speaker': _optional_text,
+    'font_family': _text,
+    'font_size': int,
+    'font_color': _text,
+    'background_color': _text,
+    'background_opacity': float,
+    'is_bold': _bool,
+    'is_italic': _bool,
+    'is_underline': _bool,
+    'alignment': _text,
+}
+
+REQUIRED_NEW_FIELDS = ('sequence', 'start_time', 'end_time')
+
+
+class StaleRevisionError(Exception):
+    """Raised when a save was based on an older subtitle revision."""
+
+    def __init__(self, current_revision):
+        self.current_revision = current_revision
+        super().__init__(f"Subtitles were changed elsewhere (now at revision {current_revision})")
+
+
+def clean_subtitle_fields(data):
+    """Return the editable fields present in `data`, coerced. Raises ValueError on bad values."""
+    values = {}
+    for field, coerce in SUBTITLE_FIELDS.items():
+        if field in data:
+            try:
+                values[field] = coerce(data[field])
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid value for {field}: {data[field]!r}")
+    return values
+
+
+def apply_subtitle_changes(project, changes=(), created=(), deleted=(), base_revision=None):
+    """
+    Apply an editor delta to a project's subtitles.
+
+    changes:  [{'id': 12, 'original_text': ...}, ...] with only the changed fields
+    created:  [{'client_id': -1, 'sequence': ..., 'start_time': ..., ...}, ...]
+    deleted:  [subtitle ids]
+
+    With base_revision set, raises StaleRevisionError unless it matches the
+    project's current subtitle_revision. Returns a summary including the new
+    revision and a {client_id: id} map for created subtitles.
+    """
+    updates = {}
+    for change in changes:
+        if 'id' not in change:
+            raise ValueError("Every change needs an id")
+        values = clean_subtitle_fields(change)
+        if values:
+            updates.setdefault(int(change['id']), {}).update(values)
+
+    new_rows = []
+    for item in created:
+        values = clean_subtitle_fields(item)
+        missing = [field for field in REQUIRED_NEW_FIELDS if field not in values]
+        if missing:
+            raise ValueError(f"New subtitles need {', '.join(missing)}")
+        new_rows.append((item.get('client_id'), values))
+
+    deleted_ids = {int(subtitle_id) for subtitle_id in deleted}
+
+    with transaction.atomic():
+        revision = (
+            TranslationProject.objects.select_for_update()
+            .values_list('subtitle_revision', flat=True)
+            .get(pk=project.pk)
+        )
+        if base_revision is not None and int(base_revision) != revision:
+            raise StaleRevisionError(revision)
+
+        deleted_count = 0
+        if deleted_ids:
+            deleted_count, _ = Subtitle.objects.filter(project=project, id__in=deleted_ids).delete()
+            for subtitle_id in deleted_ids:
+                updates.pop(subtitle_id, None)
+
+        updated_count = 0
+        if updates:
+            now = timezone.now()
+            fields = sorted({field for values in updates.values() for field in values})
+            rows = list(Subtitle.objects.filter(project=project, id__in=updates).only('id', *fields))
+            for row in rows:
+                for field, value in updates[row.id].items():
+                    setattr(row, field, value)
+                row.updated_at = now
+            # bulk_update skips auto_now, hence updated_at is set by hand
+            Subtitle.objects.bulk_update(rows, fields + ['updated_at'], batch_size=500)
+            updated_count = len(rows)
+
+        created_ids = {}
+        if new_rows:
+            objects = Subtitle.objects.bulk_create(
+                [Subtitle(project=project, **values) for _, values in new_rows],
+                batch_size=500,
+            )
+            created_ids = {
+                str(client_id): subtitle.id
+                for (client_id, _), subtitle in zip(new_rows, objects)
+                if client_id is not None
+            }
+
+        if deleted_count or updated_count or new_rows:
+            revision += 1
+            TranslationProject.objects.filter(pk=project.pk).update(subtitle_revision=revision)
+            # Outputs are regenerated from the edited subtitles on next download
+            TranslationOutput.objects.filter(project=project).delete()
+
+    if deleted_count or updated_count or new_rows:
+        subtitles_changed.send(sender=Subtitle, project_id=project.pk)
+
+    return {
+        'revision': revision,
+        'updated': updated_count,
+        'created': created_ids,
+        'deleted': deleted_count,
+    }
+
+
+def bump_subtitle_revision(project):
+    """Record a subtitle edit made outside apply_subtitle_changes()."""
+    with transaction.atomic():
+        revision = (
+            TranslationProject.objects.select_for_update()
+            .values_list('subtitle_revision', flat=True)
+            .get(pk=project.pk)
+        ) + 1
+        TranslationProject.objects.filter(pk=project.pk).update(subtitle_revision=revision)
+    return revision
@@ -1,3 +1,153 @@
-from django.test import TestCase
+import json
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Subtitle, TranslationOutput, TranslationProject
+from .subtitle_sync import StaleRevisionError, apply_subtitle_changes, clean_subtitle_fields
+
+
+# Index inline: the background indexer would outlive each test's transaction
+@override_settings(SEARCH_INDEX={'ASYNC': False})
+class SubtitleSyncTests(TestCase):
+    """apply_subtitle_changes() and the sync endpoint built on it."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='editor', password='x')
+        self.project = TranslationProject.objects.create(
+            user=self.user,
+            title='Episode 1',
+            source_language='ar',
+            translation_mode='translate',
+            video_file='videos/episode.mp4',
+        )
+        self.first = Subtitle.objects.create(
+            project=self.project, sequence=1, start_time=0.0, end_time=2.0, original_text='one'
+        )
+        self.second = Subtitle.objects.create(
+            project=self.project, sequence=2, start_time=2.0, end_time=4.0, original_text='two'
+        )
+
+    def revision(self):
+        self.project.refresh_from_db()
+        return self.project.subtitle_revision
+
+    def test_matching_revision_applies_and_bumps(self):
+        result = apply_subtitle_changes(
+            self.project,
+            changes=[{'id': self.first.id, 'original_text': 'edited'}],
+            base_revision=0,
+        )
+
+        self.assertEqual(result['revision'], 1)
+        self.assertEqual(result['updated'], 1)
+        self.assertEqual(self.revision(), 1)
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.original_text, 'edited')
+
+    def test_stale_revision_is_rejected_without_changes(self):
+        apply_subtitle_changes(self.project, changes=[{'id': self.first.id, 'original_text': 'a'}], base_revision=0)
+
+        with self.assertRaises(StaleRevisionError) as raised:
+            apply_subtitle_changes(self.project, changes=[{'id': self.first.id, 'original_text': 'b'}], base_revision=0)
+
+        self.assertEqual(raised.exception.current_revision, 1)
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.original_text, 'a')
+        self.assertEqual(self.revision(), 1)
+
+    def test_no_op_save_keeps_revision_and_outputs(self):
+        TranslationOutput.objects.create(project=self.project, output_type='srt_original', file='outputs/x.srt')
+
+        result = apply_subtitle_changes(self.project, changes=[{'id': self.first.id}], base_revision=0)
+
+        self.assertEqual(result['revision'], 0)
+        self.assertTrue(TranslationOutput.objects.filter(project=self.project).exists())
+
+    def test_edits_drop_generated_outputs(self):
+        TranslationOutput.objects.create(project=self.project, output_type='srt_original', file='outputs/x.srt')
+
+        apply_subtitle_changes(self.project, changes=[{'id': self.first.id, 'end_time': 1.5}], base_revision=0)
+
+        self.assertFalse(TranslationOutput.objects.filter(project=self.project).exists())
+
+    def test_created_subtitles_map_client_ids_to_new_ids(self):
+        result = apply_subtitle_changes(
+            self.project,
+            created=[
+                {'client_id': -1, 'sequence': 3, 'start_time': 4.0, 'end_time': 5.0, 'original_text': 'three'},
+                {'client_id': -2, 'sequence': 4, 'start_time': 5.0, 'end_time': 6.0, 'original_text': 'four'},
+            ],
+        )
+
+        self.assertEqual(set(result['created']), {'-1', '-2'})
+        self.assertEqual(Subtitle.objects.get(id=result['created']['-1']).original_text, 'three')
+        self.assertEqual(Subtitle.objects.get(id=result['created']['-2']).original_text, 'four')
+
+    def test_created_subtitles_need_timing_and_sequence(self):
+        with self.assertRaises(ValueError):
+            apply_subtitle_changes(self.project, created=[{'client_id': -1, 'original_text': 'x'}])
+        self.assertEqual(Subtitle.objects.filter(project=self.project).count(), 2)
+
+    def test_delete_wins_over_update_of_the_same_subtitle(self):
+        result = apply_subtitle_changes(
+            self.project,
+            changes=[
+                {'id': self.first.id, 'original_text': 'gone anyway'},
+                {'id': self.second.id, 'original_text': 'kept'},
+            ],
+            deleted=[self.first.id],
+        )
+
+        self.assertEqual(result['deleted'], 1)
+        self.assertEqual(result['updated'], 1)
+        self.assertFalse(Subtitle.objects.filter(id=self.first.id).exists())
+        self.second.refresh_from_db()
+        self.assertEqual(self.second.original_text, 'kept')
+
+    def test_bulk_update_sets_updated_at(self):
+        earlier = timezone.now() - timedelta(days=1)
+        Subtitle.objects.filter(id=self.first.id).update(updated_at=earlier)
+
+        apply_subtitle_changes(self.project, changes=[{'id': self.first.id, 'is_bold': True}])
+
+        self.first.refresh_from_db()
+        self.assertTrue(self.first.is_bold)
+        self.assertGreater(self.first.updated_at, earlier)
+
+    def test_booleans_must_be_json_booleans(self):
+        self.assertEqual(clean_subtitle_fields({'is_bold': False}), {'is_bold': False})
+        for value in ('false', 'true', 0, 1, None):
+            with self.assertRaises(ValueError):
+                clean_subtitle_fields({'is_italic': value})
+
+    def test_sync_endpoint_answers_409_on_stale_revision(self):
+        self.client.force_login(self.user)
+        url = reverse('translation:api_sync_subtitles', kwargs={'pk': self.project.pk})
+        apply_subtitle_changes(self.project, changes=[{'id': self.first.id, 'original_text': 'a'}])
+
+        response = self.client.post(
+            url,
+            data=json.dumps({'revision': 0, 'changes': [{'id': self.first.id, 'original_text': 'b'}]}),
+            content_type='application/json',
+        )
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['revision'], 1)
+
+    def test_sync_endpoint_rejects_string_booleans(self):
+        self.client.force_login(self.user)
+        url = reverse('translation:api_sync_subtitles', kwargs={'pk': self.project.pk})
+
+        response = self.client.post(
+            url,
+            data=json.dumps({'revision': 0, 'changes': [{'id': self.first.id, 'is_bold': 'false'}]}),
+            content_type='application/json',
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.first.refresh_from_db()
+        self.assertFalse(self.first.is_bold)
@@ -12,10 +12,12 @@ urlpatterns = [
     path('projects/<int:pk>/export/', views.export_video, name='export_video'),
     path('projects/<int:pk>/download-video/', views.download_video_with_subtitles, name='download_video'),
     path('api/projects/<int:pk>/save-all-subtitles/', views.api_save_all_subtitles, name='api_save_all_subtitles'),
+    path('api/projects/<int:pk>/subtitles/sync/', views.api_sync_subtitles, name='api_sync_subtitles'),
     path('projects/<int:pk>/direct-download/', views.direct_download_video, name='direct_download'),
     
     # API endpoints for the subtitle editor
     path('api/projects/<int:pk>/subtitles/', views.api_subtitle_list, name='api_subtitle_list'),
+    path('api/projects/<int:pk>/cues/', views.api_subtitle_cues, name='api_subtitle_cues'),
     path('api/subtitles/<int:pk>/update/', views.api_subtitle_update, name='api_subtitle_update'),
     path('api/projects/<int:pk>/download/<str:output_type>/', views.download_output, name='download'),
     # Add this line to urlpatterns
@@ -1,7 +1,7 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse, HttpResponse, FileResponse
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_POST, require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.core.exceptions import PermissionDenied
 from django.contrib import messages
@@ -17,6 +17,16 @@ from datetime import datetime
 from .models import TranslationProject, Subtitle, TranslationOutput
 from .forms import TranslationProjectForm, SubtitleEditForm
 from .services import TranslationService, VideoExportService
+from .subtitle_sync import StaleRevisionError, apply_subtitle_changes, bump_subtitle_revision
+from core.cues import cue_page_response
+
+SUBTITLE_TEXT_FIELDS = (
+    'id', 'sequence', 'start_time', 'end_time', 'original_text', 'translated_text', 'speaker',
+)
+SUBTITLE_STYLE_FIELDS = (
+    'font_family', 'font_size', 'font_color', 'background_color', 'background_opacity',
+    'is_bold', 'is_italic', 'is_underline', 'alignment',
+)
 
 @login_required
 def home(request):
@@ -95,30 +105,35 @@ def subtitle_editor(request, pk):
 def api_subtitle_list(request, pk):
     """API endpoint to get all subtitles for a project"""
     project = get_object_or_404(TranslationProject, pk=pk, user=request.user)
-    subtitles = project.subtitles.all()
     
-    data = []
-    for subtitle in subtitles:
-        data.append({
-            'id': subtitle.id,
-            'sequence': subtitle.sequence,
-            'start_time': subtitle.start_time,
-            'end_time': subtitle.end_time,
-            'original_text': subtitle.original_text,
-            'translated_text': subtitle.translated_text,
-            'speaker': subtitle.speaker or "",  # Include speaker field
-            'font_family': subtitle.font_family,
-            'font_size': subtitle.font_size,
-            'font_color': subtitle.font_color,
-            'background_color': subtitle.background_color,
-            'background_opacity': subtitle.background_opacity,
-            'is_bold': subtitle.is_bold,
-            'is_italic': subtitle.is_italic,
-            'is_underline': subtitle.is_underline,
-            'alignment': subtitle.alignment
-        })
+    data = list(project.subtitles.values(*SUBTITLE_TEXT_FIELDS, *SUBTITLE_STYLE_FIELDS))
+    for row in data:
+        row['speaker'] = row['speaker'] or ""
+    
+    response = JsonResponse(data, safe=False)
+    # The editor sends this back with delta saves (api_sync_subtitles)
+    response['X-Subtitle-Revision'] = project.subtitle_revision
+    return response
+
+@login_required
+def api_subtitle_cues(request, pk):
+    """
+    Editor cues by time window (?start=&end=) or keyset page (?cursor=&limit=).
+    
+    Styling columns are only included with ?fields=style.
+    """
+    project = get_object_or_404(TranslationProject, pk=pk, user=request.user)
     
-    return JsonResponse(data, safe=False)
+    fields = SUBTITLE_TEXT_FIELDS
+    if request.GET.get('fields') == 'style':
+        fields = SUBTITLE_TEXT_FIELDS + SUBTITLE_STYLE_FIELDS
+    
+    return cue_page_response(
+        request,
+        Subtitle.objects.filter(project=project),
+        fields,
+        extra={'revision': project.subtitle_revision},
+    )
 
 @require_POST
 @login_required
@@ -169,11 +184,12 @@ def api_subtitle_update(request, pk):
         
         subtitle.save()
         print(f"Subtitle saved. ID: {subtitle.id}, Text: {subtitle.original_text}")
+        revision = bump_subtitle_revision(subtitle.project)
         
         # Invalidate existing output files to force regeneration
         TranslationOutput.objects.filter(project=subtitle.project).delete()
         
-        return JsonResponse({'status': 'success', 'message': 'Subtitle updated successfully'})
+        return JsonResponse({'status': 'success', 'message': 'Subtitle updated successfully', 'revision': revision})
     except json.JSONDecodeError:
         return JsonResponse({'status': 'error', 'message': 'Invalid JSON data'}, status=400)
     except Exception as e:
@@ -308,74 +324,32 @@ def api_save_all_subtitles(request, pk):
     try:
         data = json.loads(request.body)
         subtitles_data = data.get('subtitles', [])
-        deleted_ids = data.get('deleted', [])
-        
-        # Process deletions
-        if deleted_ids:
-            # Filter to only delete subtitles that belong to this project
-            Subtitle.objects.filter(id__in=deleted_ids, project=project).delete()
         
-        # Process updates and new subtitles
+        # Negative IDs are temporary ones given to subtitles added in the editor
+        created = []
+        changes = []
         for subtitle_data in subtitles_data:
             subtitle_id = subtitle_data.get('id')
-            is_new = subtitle_data.get('isNew', False)
-            
-            # Handle new subtitles (negative IDs are temporary)
-            if is_new or (subtitle_id and subtitle_id < 0):
-                # Create new subtitle
-                subtitle = Subtitle(project=project)
+            if subtitle_data.get('isNew', False) or (subtitle_id and subtitle_id < 0):
+                created.append(dict(subtitle_data, client_id=subtitle_id))
             elif subtitle_id:
-                # Update existing subtitle
-                try:
-                    subtitle = Subtitle.objects.get(id=subtitle_id, project=project)
-                except Subtitle.DoesNotExist:
-                    continue
-            else:
-                continue
-            
-            # Update fields
-            if 'sequence' in subtitle_data:
-                subtitle.sequence = subtitle_data['sequence']
-            if 'start_time' in subtitle_data:
-                subtitle.start_time = float(subtitle_data['start_time'])
-            if 'end_time' in subtitle_data:
-                subtitle.end_time = float(subtitle_data['end_time'])
-            if 'original_text' in subtitle_data:
-                subtitle.original_text = subtitle_data['original_text']
-            if 'translated_text' in subtitle_data:
-                subtitle.translated_text = subtitle_data['translated_text']
-            if 'speaker' in subtitle_data:
-                subtitle.speaker = subtitle_data['speaker']
-            
-            # Update styling options
-            if 'font_family' in subtitle_data:
-                subtitle.font_family = subtitle_data['font_family']
-            if 'font_size' in subtitle_data:
-                subtitle.font_size = int(subtitle_data['font_size'])
-            if 'font_color' in subtitle_data:
-                subtitle.font_color = subtitle_data['font_color']
-            if 'background_color' in subtitle_data:
-                subtitle.background_color = subtitle_data['background_color']
-            if 'background_opacity' in subtitle_data:
-                subtitle.background_opacity = float(subtitle_data['background_opacity'])
-            if 'is_bold' in subtitle_data:
-                subtitle.is_bold = bool(subtitle_data['is_bold'])
-            if 'is_italic' in subtitle_data:
-                subtitle.is_italic = bool(subtitle_data['is_italic'])
-            if 'is_underline' in subtitle_data:
-                subtitle.is_underline = bool(subtitle_data['is_underline'])
-            if 'alignment' in subtitle_data:
-                subtitle.alignment = subtitle_data['alignment']
-            
-            subtitle.save()
+                changes.append(subtitle_data)
         
-        # Invalidate existing output files to force regeneration
-        TranslationOutput.objects.filter(project=project).delete()
+        result = apply_subtitle_changes(
+            project,
+            changes=changes,
+            created=created,
+            deleted=data.get('deleted', []),
+            base_revision=data.get('revision'),
+        )
         
         return JsonResponse({
             'status': 'success',
-            'message': f'Successfully updated {len(subtitles_data)} subtitles'
+            'message': f'Successfully updated {len(subtitles_data)} subtitles',
+            'revision': result['revision'],
         })
+    except StaleRevisionError as e:
+        return JsonResponse({'status': 'conflict', 'message': str(e), 'revision': e.current_revision}, status=409)
     except Exception as e:
         print(f"Error saving all subtitles: {str(e)}")
         return JsonResponse({
@@ -383,6 +357,41 @@ def api_save_all_subtitles(request, pk):
             'message': str(e)
         }, status=500)
 
+@require_http_methods(['PATCH', 'POST'])
+@login_required
+def api_sync_subtitles(request, pk):
+    """
+    Apply only the changed subtitle fields in one transaction.
+    
+    Body: {"revision": n, "changes": [{"id": .., <changed fields>}],
+           "created": [{"client_id": -1, ...}], "deleted": [ids]}
+    Answers 409 with the current revision when `revision` is stale.
+    """
+    project = get_object_or_404(TranslationProject, pk=pk, user=request.user)
+    
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid JSON data'}, status=400)
+    
+    if 'revision' not in data:
+        return JsonResponse({'status': 'error', 'message': 'revision is required'}, status=400)
+    
+    try:
+        result = apply_subtitle_changes(
+            project,
+            changes=data.get('changes', []),
+            created=data.get('created', []),
+            deleted=data.get('deleted', []),
+            base_revision=data['revision'],
+        )
+    except StaleRevisionError as e:
+        return JsonResponse({'status': 'conflict', 'message': str(e), 'revision': e.current_revision}, status=409)
+    except (TypeError, ValueError) as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    
+    return JsonResponse(dict(result, status='success'))
+
 @login_required
 def direct_download_video(request, pk):
     """Download video with hard-coded subtitles"""